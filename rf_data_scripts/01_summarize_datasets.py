@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import argparse, csv, json, re
+import argparse, csv, re
 from pathlib import Path
 
+import vendors
+from tolerant_json import load_json
+
 # ИСКЛЮЧАЕМ Ё и Ъ из анализа
 EXCLUDED_LETTERS = {"Ё", "Ъ"}
 
@@ -43,10 +46,6 @@ def size_token_value(num_str: str, unit: str) -> float:
         return float(num_str)  # без единиц, просто число
     return float(num_str) * UNIT[unit.upper()]
 
-def pick_first_vendor(lang_dir: Path) -> Path | None:
-    vendors = sorted([p for p in lang_dir.iterdir() if p.is_dir()])
-    return vendors[0] if vendors else None
-
 def max_corpus_size_token(raw_dir: Path, lang: str) -> tuple[str | None, float | None]:
     """Возвращает (токен, численное значение) для самого большого файла."""
     if not raw_dir.exists():
@@ -63,11 +62,11 @@ def max_corpus_size_token(raw_dir: Path, lang: str) -> tuple[str | None, float |
             best = (val, token)
     return (best[1], best[0]) if best else (None, None)
 
-def read_population(stats_dir: Path, lang: str) -> int | None:
+def read_population(stats_dir: Path, lang: str) -> tuple[int, int] | None:
     """Берём stats/<lang>_population.csv:
        1) группируем по year,
        2) внутри года берём максимум по total_speakers_rf,
-       3) выбираем год = max(year) и возвращаем максимум для него.
+       3) выбираем год = max(year) и возвращаем (год, максимум для него).
     """
     path = stats_dir / f"{lang}_population.csv"
     if not path.exists():
@@ -110,27 +109,30 @@ def read_population(stats_dir: Path, lang: str) -> int | None:
         )
 
     y_max = max(best_by_year.keys())
-    return best_by_year[y_max]
+    return y_max, best_by_year[y_max]
 
-def extract_special_letters_raw(mapping_path: Path) -> list[str]:
+def read_mapping_bases(mapping_path: Path) -> dict[str, set[str]]:
     """
-    Читаем mapping/<lang>_key_mapping.json и возвращаем ВСЕ значения «как есть»:
+    Читаем mapping/<lang>_key_mapping.json и возвращаем ВСЕ значения «как есть»
+    вместе с базами: {ВАРИАНТ: {БАЗА, ...}}:
       - каждое значение приводим к UPPERCASE
       - не разбираем по символам, не фильтруем
       - ИСКЛЮЧАЕМ Ё и Ъ
-      - уникализируем, сохраняя порядок появления
+      - порядок ключей — порядок появления
     Пример формата:
       { "А": ["Ӕ", "Ӓ"], "С": ["Ҫ", "C’", "С̇"], ... }
     """
     if not mapping_path.exists():
-        return []
+        return {}
     try:
-        data = json.loads(mapping_path.read_text(encoding="utf-8"))
-    except Exception:
-        return []
-    seen = set()
-    ordered = []
-    for _base_ru, variants in (data or {}).items():
+        data, recoveries = load_json(mapping_path)
+    except (OSError, ValueError) as e:
+        print(f"  ошибка JSON: {mapping_path} {e}")
+        return {}
+    for r in recoveries:
+        print(f"  JSON исправлен: {mapping_path}:{r}")
+    bases: dict[str, set[str]] = {}
+    for base_ru, variants in (data or {}).items():
         if not isinstance(variants, list):
             continue
         for v in variants:
@@ -140,10 +142,12 @@ def extract_special_letters_raw(mapping_path: Path) -> list[str]:
             # ИСКЛЮЧАЕМ Ё и Ъ
             if up in EXCLUDED_LETTERS:
                 continue
-            if up not in seen:
-                seen.add(up)
-                ordered.append(up)
-    return ordered
+            bases.setdefault(up, set()).add(base_ru.upper())
+    return bases
+
+def extract_special_letters_raw(mapping_path: Path) -> list[str]:
+    """Уникальные значения маппинга (UPPERCASE, без Ё и Ъ) в порядке появления."""
+    return list(read_mapping_bases(mapping_path))
 
 def main():
     args = parse_args()
@@ -158,24 +162,38 @@ def main():
     total_speakers_count = 0
     total_corpus_value_sum = 0.0
     total_corpus_count = 0
+    disagreements: list[tuple[str, str, dict[str, str]]] = []
 
     for lang_dir in sorted([p for p in data_root.iterdir() if p.is_dir()]):
         lang = lang_dir.name
         if lang == "lang":  # игнорируем шаблон
             continue
 
-        vendor_dir = pick_first_vendor(lang_dir)
-        if vendor_dir is None:
+        vendor_dirs = sorted([p for p in lang_dir.iterdir() if p.is_dir()])
+        if not vendor_dirs:
             continue
-        vendor = vendor_dir.name
-
-        raw_dir   = vendor_dir / "raw"
-        stats_dir = vendor_dir / "stats"
-        map_path  = vendor_dir / "mapping" / f"{lang}_key_mapping.json"
-
-        rf_population = read_population(stats_dir, lang)
-        token, token_value = max_corpus_size_token(raw_dir, lang)
-        special_list = extract_special_letters_raw(map_path)
+        vendor = ", ".join(p.name for p in vendor_dirs)
+
+        # по каждому вендору: численность, самый большой корпус, маппинг
+        populations: dict[str, tuple[int, int]] = {}
+        corpora: list[tuple[float, str]] = []
+        mappings: dict[str, dict[str, set[str]]] = {}
+        for vendor_dir in vendor_dirs:
+            rec = read_population(vendor_dir / "stats", lang)
+            if rec is not None:
+                populations[vendor_dir.name] = rec
+            tok, val = max_corpus_size_token(vendor_dir / "raw", lang)
+            if tok is not None:
+                corpora.append((val, tok))
+            map_path = vendor_dir / "mapping" / f"{lang}_key_mapping.json"
+            if map_path.exists():
+                mappings[vendor_dir.name] = read_mapping_bases(map_path)
+
+        rf_population, _ = vendors.pick_population(lang, populations)
+        token_value, token = max(corpora) if corpora else (None, None)
+        # спецбуквы — объединение по вендорам в порядке появления
+        special_list = list(dict.fromkeys(v for m in mappings.values() for v in m))
+        disagreements += [(lang, var, bases) for var, bases in vendors.mapping_disagreements(mappings)]
 
         if rf_population is not None:
             total_speakers_sum += int(rf_population)
@@ -209,11 +227,23 @@ def main():
     lines.append(f"- With corpus data: {total_corpus_count} · Total corpus size (max per language): {human_token_from_value(total_corpus_value_sum)}")
     lines.append(f"\n_Note: Ё and Ъ excluded from analysis_")
 
+    # расхождения маппингов между вендорами одного языка
+    if disagreements:
+        lines.append("\n## Vendor disagreements\n")
+        lines.append("| Language | Variant | Base by vendor |")
+        lines.append("|---|---|---|")
+        for lang, var, bases in disagreements:
+            by_vendor = " · ".join(f"{v}: {b or '—'}" for v, b in bases.items())
+            lines.append(f"| {lang} | {var} | {by_vendor} |")
+
     out_md.write_text("\n".join(lines) + "\n", encoding="utf-8")
     print(f"✓ Wrote {out_md.relative_to(root)} with {len(rows)} rows")
     print(f"   Sum speakers = {human_int(total_speakers_sum)} over {total_speakers_count} languages")
     print(f"   Sum corpus   = {human_token_from_value(total_corpus_value_sum)} over {total_corpus_count} languages")
     print(f"   [Ё and Ъ excluded from Special letters]")
+    if disagreements:
+        print(f"   Vendor mapping disagreements: {len(disagreements)} "
+              f"({', '.join(sorted({d[0] for d in disagreements}))})")
 
 if __name__ == "__main__":
     main()
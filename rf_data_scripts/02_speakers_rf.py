@@ -2,13 +2,16 @@
 # data_scripts/speakers_rf.py
 # → rf_summaries/speakers_rf.csv (lang_code,population)
 # Проходим ТОЛЬКО по папкам языков: data/<lang>/
-# Для каждого языка берём первого по имени вендора: data/<lang>/<vendor>/stats/<lang>_population.csv
+# Для каждого языка читаем всех вендоров: data/<lang>/<vendor>/stats/<lang>_population.csv
+# и сводим их по политике vendors.POPULATION_POLICY (по умолчанию — самый поздний год среди вендоров).
 # Поле: ТОЛЬКО total_speakers_rf (БЕЗ fallback на global). Если есть несколько лет — берём максимальный year.
 
 import csv, glob, os, re, itertools
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 
+import vendors
+
 # Переходим в корень репозитория (скрипт лежит в data_scripts/)
 ROOT = Path(__file__).resolve().parent.parent
 os.chdir(ROOT)
@@ -58,10 +61,11 @@ def _read_csv_flex(path: Path) -> List[dict]:
         f.seek(0)
         return list(csv.DictReader(f, delimiter=delim))
 
-def _pick_population(rows: List[dict]) -> Optional[int]:
-    """Берём ТОЛЬКО total_speakers_rf (БЕЗ fallback на global).
+def _pick_population(rows: List[dict]) -> Optional[Tuple[Optional[int], int]]:
+    """Берём ТОЛЬКО total_speakers_rf (БЕЗ fallback на global) → (year, population).
     Если есть несколько лет — берём максимальный year.
     Если в одном и том же году несколько строк — берём максимум значения для этого года.
+    Если годов нет — первая валидная строка, year=None.
     """
     if not rows:
         return None
@@ -102,36 +106,49 @@ def _pick_population(rows: List[dict]) -> Optional[int]:
     # если есть годы — берём max(year) и максимум для него
     if best_by_year:
         y_max = max(best_by_year.keys())
-        return best_by_year[y_max]
+        return y_max, best_by_year[y_max]
 
     # 2) иначе — первая валидная (только RF)
     for r in norm:
         v = candidate_value(r)
         if v is not None:
-            return v
+            return None, v
             
     # НОВОЕ: Если не удалось найти валидное значение total_speakers_rf, выбрасываем ошибку
     raise ValueError("Required data for 'total_speakers_rf' not found or is invalid in the population data. Cannot continue.")
 
     return None
 
-def _first_vendor_population(lang: str) -> Optional[int]:
-    """Находит первого по имени вендора, читает stats/<lang>_population.csv, возвращает population."""
+def _vendor_populations(lang: str) -> Dict[str, Tuple[Optional[int], int]]:
+    """Читает stats/<lang>_population.csv всех вендоров языка → {vendor: (year, population)}."""
     # кандидаты stats-файлов строго под этим языком
     candidates = sorted(glob.glob(f"data/{lang}/*/stats/{lang}_population.csv"))
     if not candidates:
         # на случай иной вложенности — рекурсивно
         candidates = sorted(glob.glob(f"data/{lang}/**/{lang}_population.csv", recursive=True))
+    records: Dict[str, Tuple[Optional[int], int]] = {}
     for p in candidates:
+        vendor = Path(p).parts[2]
+        if vendor in records:
+            continue
         try:
             rows = _read_csv_flex(Path(p))
-            v = _pick_population(rows)
-            if v is not None and v > 0:
-                return v
+            rec = _pick_population(rows)
+            if rec is not None and rec[1] > 0:
+                records[vendor] = rec
         except Exception:
             # пропускаем битые или неожиданные файлы
             continue
-    return None
+    return records
+
+def _reconciled_population(lang: str) -> Optional[int]:
+    records = _vendor_populations(lang)
+    pop, chosen = vendors.pick_population(lang, records)
+    if len(records) > 1:
+        detail = ", ".join(f"{v}={val} ({y})" for v, (y, val) in sorted(records.items()))
+        flag = "" if len(chosen) == len(records) else "  WARN: вендоры расходятся"
+        print(f"[{lang}] {vendors.population_policy(lang)}: {pop} ← {detail}{flag}")
+    return pop
 
 def main():
     if not DATA_DIR.exists():
@@ -149,7 +166,7 @@ def main():
     missing: List[str] = []
 
     for lang in langs:
-        pop = _first_vendor_population(lang)
+        pop = _reconciled_population(lang)
         if pop is None:
             missing.append(lang)
         else:
@@ -4,38 +4,53 @@ data_scripts/aggregate_mappings.py — сводим маппинги «как е
 
 ИСКЛЮЧАЕМ Ё и Ъ из анализа (фильтрация на входе)
 
-Ищем файлы:
-  data/**/mapping/*_key_mapping.json
-
-Нормализация:
-  • base_letter → UPPERCASE (NFC)  + спец‑правило: 'Ъ' → 'Ь'
-  • variant     → UPPERCASE (NFC)
+Ищем файлы (разбор — vendor_files.parse_mapping, общий с variant_index, alphabets и 16):
+  data/**/mapping/*_key_mapping.json            — mapping   (JSON, терпимый разбор tolerant_json)
+  data/**/mapping/*_key_mapping_ext.json        — extension (тот же JSON)
+  data/**/mapping/*_key_mapping_extension.json  — extension
+  data/**/mapping/*_key_mapping.txt             — txt: «О | Ӧ, Ө, О̄» по строке на базу, # — комментарий
+Пары (язык, база, вариант) дедуплицируются за один проход; откуда пришла пара —
+в столбце provenance («язык:формат», через запятую). Варианты без единой буквы
+(знаки препинания из *_extension.json) в свод не попадают.
+
+Нормализация (правила языка из data/normalization_rules.json, как в 04, но без collapse_variants —
+последовательности с ᵸ сохраняются, ᵸ сводится отдельно в атомном файле):
+  • base_letter → UPPERCASE (NFC) + замены  + спец‑правило: 'Ъ' → 'Ь'
+  • variant     → UPPERCASE (NFC) + замены (Latin I → Ӏ у языков с палочкой, «C’» → «С’», …)
   • has_sequence = 1, если длина NFC(variant) > 1
   • ИСКЛЮЧАЕМ Ё и Ъ
 
 Выход:
   1) rf_summaries/variant_mapping.csv
-     base_letter, variant, source_languages, has_sequence, notes
+     base_letter, variant, source_languages, has_sequence, notes, provenance
   2) rf_summaries/variant_mapping_atomic.csv — ТОЛЬКО одногРАФЕМНЫе варианты + спец-правило для ᵸ:
      если ᵸ встречался лишь внутри последовательностей, добавляем агрегированную строку Н,ᵸ (has_sequence=0).
+  3) rf_summaries/variant_decomposition.csv — разложение каждого варианта на графемы с кратностями
+     (decomposition.DecompositionTable); по нему строится атомный свод здесь и веса символов в 05.
 """
 
 import csv
 import glob
-import json
 import os
 import unicodedata
 from pathlib import Path
 from collections import defaultdict
 from typing import Dict, List, Tuple, Optional
 
+import normalization
+import vendors
+from decomposition import DecompositionTable
+from normalization import has_letter
+from vendor_files import mapping_kind, parse_mapping
+
 # --- корень проекта ---
 ROOT = Path(__file__).resolve().parent.parent
 os.chdir(ROOT)
 
 OUT_CSV_FULL   = "rf_summaries/variant_mapping.csv"
 OUT_CSV_ATOMIC = "rf_summaries/variant_mapping_atomic.csv"
-GLOB_PAT = "data/**/mapping/*_key_mapping.json"
+DECOMP_OUT     = "rf_summaries/variant_decomposition.csv"
+GLOB_PAT = "data/**/mapping/*_key_mapping*"
 VERBOSE  = True
 
 # Исключаем шаблонный язык
@@ -44,11 +59,9 @@ EXCLUDED_LANGS = {"lang"}
 # ИСКЛЮЧАЕМ Ё и Ъ из анализа
 EXCLUDED_LETTERS = {"Ё", "Ъ"}
 
-PREFERRED_VENDOR: Dict[str, str] = {
-    "abk": "Tamaz_Kharchlaa",
-}
-
-MOD_CYR_EN = "\u1D78"  # ᵸ
+# маппинги двух вендоров — разные раскладки long-press, их не смешиваем: у языка из
+# vendors.PREFERRED_VENDOR берём его файлы, расхождения вендоров — в SUMMARY.md (01)
+PREFERRED_VENDOR = vendors.PREFERRED_VENDOR
 
 def vprint(*a) -> None:
     if VERBOSE:
@@ -57,36 +70,9 @@ def vprint(*a) -> None:
 def nfc(s: str) -> str:
     return unicodedata.normalize("NFC", (s or "").strip())
 
-def to_upper(s: str) -> str:
-    return nfc(s).upper()
-
 def is_sequence(s: str) -> bool:
     return len(nfc(s)) > 1
 
-def grapheme_count(s: str) -> int:
-    """Подсчёт графем: новый кластер — символ с combining==0;
-    все последующие combining>0 прилипают к нему."""
-    s = nfc(s)
-    if not s:
-        return 0
-    cnt = 0
-    have_base = False
-    for ch in s:
-        if unicodedata.combining(ch) == 0:
-            cnt += 1
-            have_base = True
-        else:
-            if not have_base:
-                cnt += 1
-                have_base = True
-    return cnt
-
-def lang_from_filename(path: str) -> Optional[str]:
-    name = Path(path).name
-    if name.endswith("_key_mapping.json"):
-        return name[:-len("_key_mapping.json")]
-    return None
-
 def split_lang_vendor(p: str) -> Tuple[Optional[str], Optional[str]]:
     parts = Path(p).parts
     if "data" in parts and "mapping" in parts:
@@ -99,9 +85,9 @@ def split_lang_vendor(p: str) -> Tuple[Optional[str], Optional[str]]:
 def collect_rows() -> List[Dict]:
     rows: List[Dict] = []
 
-    all_paths = sorted(glob.glob(GLOB_PAT, recursive=True))
+    all_paths = sorted(p for p in glob.glob(GLOB_PAT, recursive=True) if mapping_kind(p))
     if not all_paths:
-        vprint("[JSON *_key_mapping] файлов не найдено")
+        vprint("[*_key_mapping] файлов не найдено")
         return rows
 
     # сгруппируем пути по языку
@@ -128,57 +114,53 @@ def collect_rows() -> List[Dict]:
                 vprint(f"[{lang}] WARN: preferred vendor '{pref}' not found; using all vendors")
         paths.extend(path for _, path in lst)
 
-    vprint(f"[JSON *_key_mapping] файлов к чтению: {len(paths)}")
+    vprint(f"[*_key_mapping] файлов к чтению: {len(paths)}")
 
+    # (язык, база, вариант) → индекс строки в rows: дедупликация за один проход
+    seen: Dict[Tuple[str, str, str], int] = {}
     for p in paths:
-        lang = lang_from_filename(p)
+        lang, kind = Path(p).parts[1], mapping_kind(p)   # data/<lang>/<vendor>/mapping/…
         if not lang or lang in EXCLUDED_LANGS:
             vprint("  пропуск (язык исключён или не извлечён):", p)
             continue
 
+        norm = normalization.for_language(lang)
+        added = skipped = 0
         try:
-            with open(p, encoding="utf-8") as f:
-                obj = json.load(f)
-        except Exception as e:
-            vprint("  ошибка JSON:", p, e)
+            pairs = parse_mapping(Path(p))
+        except (OSError, ValueError) as e:
+            print("  ошибка JSON:", p, e)
             continue
-
-        if not isinstance(obj, dict):
-            vprint("  пропуск (ожидали dict):", p)
-            continue
-
-        before = len(rows)
-        for base_raw, arr in obj.items():
-            if not isinstance(arr, list):
-                continue
-
-            base_up = to_upper(base_raw)
+        for base_raw, var_raw, _ in pairs:
+            base_up = norm.variant(base_raw, collapse=False)
             if base_up == "Ъ":
                 base_up = "Ь"
-            if not base_up:
+            var_up = norm.variant(var_raw, collapse=False)
+            if not base_up or not var_up:
                 continue
 
-            # ИСКЛЮЧАЕМ Ё и Ъ как base_letter
-            if base_up in EXCLUDED_LETTERS:
+            # ИСКЛЮЧАЕМ Ё и Ъ как base_letter и как variant
+            if base_up in EXCLUDED_LETTERS or var_up in EXCLUDED_LETTERS:
+                continue
+            if not has_letter(var_up):
+                skipped += 1
                 continue
 
-            for var_raw in arr:
-                var_up = to_upper(var_raw)
-                if not var_up:
-                    continue
-                
-                # ИСКЛЮЧАЕМ Ё и Ъ как variant
-                if var_up in EXCLUDED_LETTERS:
-                    continue
-
-                rows.append({
-                    "language_code": lang,
-                    "base_letter": base_up,
-                    "variant": var_up,
-                    "has_sequence": "1" if is_sequence(var_up) else "0",
-                    "notes": "",
-                })
-        vprint(f"  {p}: +{len(rows) - before} пар")
+            key = (lang, base_up, var_up)
+            if key in seen:
+                rows[seen[key]]["provenance"].add(f"{lang}:{kind}")
+                continue
+            seen[key] = len(rows)
+            rows.append({
+                "language_code": lang,
+                "base_letter": base_up,
+                "variant": var_up,
+                "has_sequence": "1" if is_sequence(var_up) else "0",
+                "notes": "",
+                "provenance": {f"{lang}:{kind}"},
+            })
+            added += 1
+        vprint(f"  {p}: +{added} пар" + (f" (без букв пропущено: {skipped})" if skipped else ""))
 
     return rows
 
@@ -188,12 +170,13 @@ def aggregate_and_save() -> None:
 
     # агрегируем по (base_letter, variant)
     by_key: Dict[Tuple[str, str], Dict] = defaultdict(
-        lambda: {"langs": set(), "seq": False, "notes": []}
+        lambda: {"langs": set(), "seq": False, "notes": [], "provenance": set()}
     )
     for r in raw_rows:
         k = (r["base_letter"], r["variant"])
         by_key[k]["langs"].add(r["language_code"])
         by_key[k]["seq"] = by_key[k]["seq"] or (r["has_sequence"] == "1")
+        by_key[k]["provenance"] |= r["provenance"]
         note = r.get("notes")
         if note:
             by_key[k]["notes"].append(note)
@@ -206,6 +189,7 @@ def aggregate_and_save() -> None:
             "source_languages": ",".join(sorted(agg["langs"])),
             "has_sequence": "1" if agg["seq"] else "0",
             "notes": "; ".join(sorted(set(agg["notes"]))),
+            "provenance": ",".join(sorted(agg["provenance"])),
         })
     rows_out.sort(key=lambda x: (x["base_letter"], x["variant"]))
 
@@ -214,58 +198,63 @@ def aggregate_and_save() -> None:
     with open(OUT_CSV_FULL, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(
             f,
-            fieldnames=["base_letter", "variant", "source_languages", "has_sequence", "notes"]
+            fieldnames=["base_letter", "variant", "source_languages", "has_sequence", "notes", "provenance"]
         )
         w.writeheader()
         w.writerows(rows_out)
     print(f"OK: wrote {OUT_CSV_FULL} (pairs={len(rows_out)}) [Ё and Ъ excluded]")
 
-    # 2) Атомный файл + спец-правило для ᵸ
+    # 2) Таблица разложения — один раз по всем вариантам маппингов
+    table = DecompositionTable.build(r["variant"] for r in rows_out)
+    table.write(Path(DECOMP_OUT))
+    n_seq = sum(1 for v in table.entries if not table.is_atomic(v))
+    print(f"OK: wrote {DECOMP_OUT} (variants={len(table)}, sequences={n_seq})")
+
+    # 3) Атомный файл + спец-правило для ᵸ (decomposition.ATOMIC_RESCUE)
     #    - оставляем строки с 1 графемой
-    #    - все строки, где variant содержит ᵸ (и были бы удалены), агрегируем в (base='Н', variant='ᵸ')
+    #    - составляющие ATOMIC_RESCUE из последовательностей (ᵸ в «Аᵸ») агрегируем в (base='Н', variant='ᵸ')
     atomic_rows: List[Dict] = []
-    # агрегатор для спец-правила ᵸ
-    special_key = ("Н", MOD_CYR_EN)
-    special_langs: set = set()
-    special_notes: set = set()
+    # (база, составляющая) → языки/ноты/provenance последовательностей, где она встретилась
+    special: Dict[Tuple[str, str], Dict[str, set]] = defaultdict(
+        lambda: {"langs": set(), "notes": set(), "provenance": set()}
+    )
 
     for r in rows_out:
         var = r["variant"]
-        if grapheme_count(var) == 1:
+        if table.is_atomic(var):
             # уже однографемные — оставляем как есть, но has_sequence=0
             atomic_rows.append({
                 **r,
                 "has_sequence": "0",
             })
-        else:
-            if MOD_CYR_EN in var:
-                # копим языки/ноты для агрегированной строки Н,ᵸ
-                for lg in r.get("source_languages", "").split(","):
-                    lg = lg.strip()
-                    if lg:
-                        special_langs.add(lg)
-                note = r.get("notes", "").strip()
-                if note:
-                    special_notes.add(note)
-
-    # если ᵸ встречался только в последовательностях — добавим агрегированную строку Н,ᵸ
-    already_has_special = any(r["base_letter"] == special_key[0] and r["variant"] == special_key[1]
-                              for r in atomic_rows)
-    if (special_langs or special_notes) and not already_has_special:
-        atomic_rows.append({
-            "base_letter": special_key[0],
-            "variant": special_key[1],
-            "source_languages": ",".join(sorted(special_langs)),
-            "has_sequence": "0",
-            "notes": "; ".join(sorted(special_notes)),
-        })
+            continue
+        for key in table.rescued(var):
+            agg = special[key]
+            agg["langs"].update(lg.strip() for lg in r.get("source_languages", "").split(",") if lg.strip())
+            note = r.get("notes", "").strip()
+            if note:
+                agg["notes"].add(note)
+            agg["provenance"].update(x for x in r.get("provenance", "").split(",") if x)
+
+    # если составляющая встречалась только в последовательностях — добавим агрегированную строку
+    present = {(r["base_letter"], r["variant"]) for r in atomic_rows}
+    for (base, comp), agg in sorted(special.items()):
+        if (agg["langs"] or agg["notes"]) and (base, comp) not in present:
+            atomic_rows.append({
+                "base_letter": base,
+                "variant": comp,
+                "source_languages": ",".join(sorted(agg["langs"])),
+                "has_sequence": "0",
+                "notes": "; ".join(sorted(agg["notes"])),
+                "provenance": ",".join(sorted(agg["provenance"])),
+            })
 
     # сортировка и запись
     atomic_rows.sort(key=lambda x: (x["base_letter"], x["variant"]))
     with open(OUT_CSV_ATOMIC, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(
             f,
-            fieldnames=["base_letter", "variant", "source_languages", "has_sequence", "notes"]
+            fieldnames=["base_letter", "variant", "source_languages", "has_sequence", "notes", "provenance"]
         )
         w.writeheader()
         w.writerows(atomic_rows)
@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 # data_scripts/collect_language_frequencies.py → rf_summaries/frequencies_by_language.csv
-# Собирает частоты по ПЕРВОМУ (или заданному) вендору каждого языка и нормализует варианты:
-#  - всё в NFC+UPPERCASE,
-#  - любые строки, содержащие ᵸ / ᴴ / ʰ, сводит к единому варианту 'ᵸ'.
+# Собирает частоты по ВСЕМ вендорам каждого языка и нормализует варианты по
+# data/normalization_rules.json (normalization.for_language(lang).variant):
+#  - всё в NFC+UPPERCASE, замены chars/sequences/homoglyphs языка,
+#  - любые строки, содержащие ᵸ / ᴴ / ʰ, сводит к единому варианту 'ᵸ' (collapse_variants).
+#  - C_i и M_i вендоров суммируются (vendors.merge_counts): f_i взвешена размером корпуса,
+#    в столбце vendor — вендоры через «+»; варианты, которые есть лишь у части вендоров, печатаются.
 # ИСКЛЮЧАЕМ Ё и Ъ из анализа (фильтрация на входе)
-import csv, glob, os, unicodedata
+import csv, glob, os
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+
+import normalization
+import vendors
 
 # ——— корень проекта ———
 ROOT = Path(__file__).resolve().parent.parent
@@ -22,21 +28,11 @@ EXCLUDED_LANGS = {"lang", "ru", "rus"}
 # ИСКЛЮЧАЕМ Ё и Ъ из анализа
 EXCLUDED_LETTERS = {"Ё", "Ъ"}
 
-# если для языка нужно жёстко выбрать вендора — укажи здесь
-PREFERRED_VENDOR: Dict[str, str] = {
-    "abk": "Tamaz_Kharchlaa",
-}
-
 # возможные имена колонок (регистронезависимо)
 VAR_KEYS = ["variant", "letter", "symbol", "char"]
 C_KEYS   = ["c_i", "c", "count", "freq", "frequency"]
 M_KEYS   = ["m_i", "m", "total", "sum", "size"]
 
-# модификаторы, которые канонизируем в 'ᵸ'
-SUP_H_CAP  = "\u1D34"  # ᴴ  MODIFIER LETTER CAPITAL H
-SUP_h_SM   = "\u02B0"  # ʰ  MODIFIER LETTER SMALL H
-SUP_CYR_EN = "\u1D78"  # ᵸ  MODIFIER LETTER CYRILLIC EN
-
 def vprint(*a):
     if VERBOSE:
         print(*a)
@@ -60,7 +56,8 @@ def _pick_first_present(row: dict, keys: List[str]) -> Optional[str]:
             return k
     return None
 
-def _first_vendor_freq_path(lang: str) -> Optional[str]:
+def _vendor_freq_paths(lang: str) -> Dict[str, str]:
+    """{vendor: первый по имени CSV частот вендора} для всех вендоров языка."""
     patterns = [
         f"data/{lang}/*/frequencies/*.csv",
         f"data/{lang}/*/frequences/*.csv",
@@ -70,17 +67,10 @@ def _first_vendor_freq_path(lang: str) -> Optional[str]:
     candidates: List[str] = []
     for pat in patterns:
         candidates += glob.glob(pat, recursive=True)
-    if not candidates:
-        return None
-    candidates = sorted(set(candidates))
-
-    pref = PREFERRED_VENDOR.get(lang)
-    if pref:
-        pref_only = [p for p in candidates if f"/{lang}/{pref}/" in p]
-        if pref_only:
-            return pref_only[0]
-
-    return candidates[0]
+    paths: Dict[str, str] = {}
+    for p in sorted(set(candidates)):
+        paths.setdefault(_vendor_from_path(p), p)
+    return paths
 
 def _vendor_from_path(p: str) -> str:
     parts = Path(p).parts
@@ -95,89 +85,103 @@ def _vendor_from_path(p: str) -> str:
                 return parts[j - 1]
     return ""
 
-def canonicalize_variant(s: str) -> str:
+def canonicalize_variant(s: str, lang: str) -> str:
     """
-    Канонизация варианта для подсчётов:
-    - если строка содержит ᵸ / ᴴ / ʰ в любом месте → вернуть ровно 'ᵸ'
-    - иначе: NFC + UPPERCASE.
+    Канонизация варианта для подсчётов — правила языка из data/normalization_rules.json:
+    - NFC + UPPERCASE и замены (I → Ӏ у языков с палочкой, ᴴ / ʰ → ᵸ, …),
+    - если строка содержит ᵸ в любом месте → вернуть ровно 'ᵸ'.
     """
-    n = unicodedata.normalize("NFC", s or "")
-    if (SUP_CYR_EN in n) or (SUP_H_CAP in n) or (SUP_h_SM in n):
-        return SUP_CYR_EN
-    return unicodedata.normalize("NFC", n).upper()
+    return normalization.for_language(lang).variant(s)
 
-def main():
-    rows_out: List[dict] = []
+def _read_vendor_counts(freq_path: str, lang: str) -> Tuple[Dict[str, float], float]:
+    """CSV частот одного вендора → ({вариант: C_i}, M). M — максимум столбца M_i или ΣC_i."""
+    raw_rows = _read_csv_flex(Path(freq_path))
 
-    if not DATA_DIR.exists():
-        print("ERR: нет папки data/")
-        return
+    Csum: Dict[str, float] = {}
+    M_seen: float = 0.0
 
-    langs = sorted([d.name for d in DATA_DIR.iterdir() if d.is_dir()])
-    langs = [lg for lg in langs if lg not in EXCLUDED_LANGS]
+    for raw in raw_rows:
+        row = _norm_keys(raw)
 
-    for lang in langs:
-        freq_path = _first_vendor_freq_path(lang)
-        if not freq_path:
-            vprint(f"[{lang}] нет frequencies/*.csv — пропуск")
+        v_key = _pick_first_present(row, VAR_KEYS)
+        c_key = _pick_first_present(row, C_KEYS)
+        m_key = _pick_first_present(row, M_KEYS)
+
+        if not v_key or not c_key:
             continue
 
-        vendor = _vendor_from_path(freq_path)
-        try:
-            raw_rows = _read_csv_flex(Path(freq_path))
-        except Exception as e:
-            vprint(f"[{lang}] ошибка чтения {freq_path}: {e}")
+        variant_raw = str(row[v_key]).strip()
+        if not variant_raw:
             continue
 
-        if not raw_rows:
-            vprint(f"[{lang}] пустой файл частот: {freq_path}")
+        variant = canonicalize_variant(variant_raw, lang)
+
+        # ИСКЛЮЧАЕМ Ё и Ъ
+        if variant in EXCLUDED_LETTERS:
             continue
 
-        Csum: Dict[str, float] = {}
-        M_seen: float = 0.0
+        try:
+            Ci = float(str(row[c_key]).strip())
+        except Exception:
+            continue
 
-        for raw in raw_rows:
-            row = _norm_keys(raw)
+        Csum[variant] = Csum.get(variant, 0.0) + Ci
 
-            v_key = _pick_first_present(row, VAR_KEYS)
-            c_key = _pick_first_present(row, C_KEYS)
-            m_key = _pick_first_present(row, M_KEYS)
+        if m_key:
+            try:
+                Mi = float(str(row[m_key]).strip())
+                if Mi > M_seen:
+                    M_seen = Mi
+            except Exception:
+                pass
 
-            if not v_key or not c_key:
-                continue
+    if M_seen <= 0.0:
+        M_seen = sum(Csum.values())
 
-            variant_raw = str(row[v_key]).strip()
-            if not variant_raw:
-                continue
+    return Csum, M_seen
 
-            variant = canonicalize_variant(variant_raw)
-            
-            # ИСКЛЮЧАЕМ Ё и Ъ
-            if variant in EXCLUDED_LETTERS:
-                continue
+def main():
+    rows_out: List[dict] = []
 
-            try:
-                Ci = float(str(row[c_key]).strip())
-            except Exception:
-                continue
+    if not DATA_DIR.exists():
+        print("ERR: нет папки data/")
+        return
 
-            Csum[variant] = Csum.get(variant, 0.0) + Ci
+    langs = sorted([d.name for d in DATA_DIR.iterdir() if d.is_dir()])
+    langs = [lg for lg in langs if lg not in EXCLUDED_LANGS]
 
-            if m_key:
-                try:
-                    Mi = float(str(row[m_key]).strip())
-                    if Mi > M_seen:
-                        M_seen = Mi
-                except Exception:
-                    pass
+    for lang in langs:
+        freq_paths = _vendor_freq_paths(lang)
+        if not freq_paths:
+            vprint(f"[{lang}] нет frequencies/*.csv — пропуск")
+            continue
 
-        if M_seen <= 0.0:
-            M_seen = sum(Csum.values())
+        # векторы счётчиков по вендорам → сумма, взвешенная размером корпуса
+        per_vendor: Dict[str, Tuple[Dict[str, float], float]] = {}
+        for vendor, freq_path in freq_paths.items():
+            try:
+                counts, M_v = _read_vendor_counts(freq_path, lang)
+            except Exception as e:
+                vprint(f"[{lang}] ошибка чтения {freq_path}: {e}")
+                continue
+            if M_v <= 0.0 or not counts:
+                vprint(f"[{lang}] {vendor}: не удалось вычислить M_i / C_i — пропуск {freq_path}")
+                continue
+            per_vendor[vendor] = (counts, M_v)
 
-        if M_seen <= 0.0 or not Csum:
+        if not per_vendor:
             vprint(f"[{lang}] не удалось вычислить M_i / C_i — пропуск")
             continue
 
+        Csum, M_seen, weights = vendors.merge_counts(per_vendor)
+        vendor = "+".join(per_vendor)
+        if len(per_vendor) > 1:
+            vprint(f"[{lang}] веса вендоров: " + ", ".join(f"{v}={w:.4f}" for v, w in weights.items()))
+            for v, (counts, _) in per_vendor.items():
+                only = sorted(x for x in counts if all(x not in c for u, (c, _) in per_vendor.items() if u != v))
+                if only:
+                    vprint(f"[{lang}]   только у {v}: {' '.join(only)}")
+
         added = 0
         for variant, Ci in sorted(Csum.items()):
             fi = Ci / M_seen if M_seen > 0 else 0.0
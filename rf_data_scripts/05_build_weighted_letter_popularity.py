@@ -5,16 +5,18 @@
 # Источники:
 #   rf_summaries/frequencies_by_language.csv  (lang_code, variant, C_i, M_i, f_i)
 #   rf_summaries/speakers_rf.csv          (lang_code, population)
+#   rf_summaries/variant_decomposition.csv (variant, grapheme_count, component, multiplicity) — из 03
 #
 # Выход:
 #   rf_summaries/rf_letter_popularity_weighted.csv   (по variant)
 #   rf_summaries/rf_symbol_popularity_weighted.csv   (по символам/графемам)
 #
-# Правило для символов:
+# Правило для символов (разложение — из таблицы 03, decomposition.symbol_weights):
 #   • variant длиной 1 графему → +w этой графеме.
-#   • variant длиной 2..4 графем → разбиваем на графемы и КАЖДОЙ графеме добавляем +w
-#     (повторы учитываются). Пример: "ЛЛЪ" при w=10 → Л += 20, Ъ += 10.
-#   • Длины >4 игнорируем.
+#   • variant длиной 2..4 графем → КАЖДОЙ составляющей добавляем w × кратность.
+#     Пример: "ЛЛЪ" при w=10 → Л += 20, Ъ += 10.
+#   • Длины >4 (decomposition.MAX_GRAPHEMES) игнорируем.
+# Варианты частот, которых нет в маппингах, раскладываются по тем же правилам на месте (NOTE в выводе).
 #
 # Все варианты считаются в NFC + UPPERCASE.
 # 'share' оставляем; 'cum_share' не считаем.
@@ -25,6 +27,8 @@ import unicodedata
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from decomposition import DECOMP_CSV, DecompositionTable
+
 ROOT = Path(__file__).resolve().parent.parent
 os.chdir(ROOT)
 
@@ -63,27 +67,6 @@ def _to_float(x) -> float:
 def _nfc_upper(s: str) -> str:
     return unicodedata.normalize("NFC", s or "").upper()
 
-def _graphemes(s: str) -> List[str]:
-    """
-    Простейший сегментатор графем: новая графема начинается на символе
-    с combining==0; все последующие combining>0 цепляются к ней.
-    Этого достаточно для кириллицы с диакритикой (например 'А̄').
-    """
-    out: List[str] = []
-    cur = ""
-    for ch in s:
-        if not cur:
-            cur = ch
-        else:
-            if unicodedata.combining(ch) > 0:
-                cur += ch
-            else:
-                out.append(cur)
-                cur = ch
-    if cur:
-        out.append(cur)
-    return out
-
 def _rank_and_share(items: List[Tuple[str, float]], langs_map: Dict[str, set]):
     grand_total = sum(v for _, v in items) or 1.0
     out_rows = []
@@ -118,6 +101,9 @@ def main():
             pop_by_lang[lang] = pop
 
     missing_pop = set()
+    table = DecompositionTable.read(DECOMP_CSV)
+    if not len(table):
+        vprint(f"NOTE: no {DECOMP_CSV.relative_to(ROOT)} (run 03) → decomposing variants on the fly")
 
     # 1) Взвешенная популярность ВАРИАНТОВ (как есть)
     weight_by_variant: Dict[str, float] = {}
@@ -164,21 +150,10 @@ def main():
         if fi <= 0.0: continue
 
         w = fi * pop
-        clusters = _graphemes(variant)        # <-- разбиваем на графемы
-        L = len(clusters)
-
-        if L == 1:
-            s = clusters[0]
-            weight_by_symbol[s] = weight_by_symbol.get(s, 0.0) + w
+        # каждой составляющей — w × кратность; длины > MAX_GRAPHEMES дают пустой список
+        for s, k in table.symbol_weights(variant):
+            weight_by_symbol[s] = weight_by_symbol.get(s, 0.0) + w * k
             langs_per_symbol.setdefault(s, set()).add(lang)
-        elif 2 <= L <= 4:
-            # каждому кластеру начисляем полный w (повторы учитываются)
-            for s in clusters:
-                weight_by_symbol[s] = weight_by_symbol.get(s, 0.0) + w
-                langs_per_symbol.setdefault(s, set()).add(lang)
-        else:
-            # длины >4 игнорируем
-            continue
 
     # вывод 1: по вариантам
     items_var = sorted(weight_by_variant.items(), key=lambda t: t[1], reverse=True)
@@ -215,6 +190,9 @@ def main():
 
     print(f"OK: wrote {OUT_LETTERS} (variants={len(rows_var)}, grand_total_weight={grand_w_var:.2f})")
     print(f"OK: wrote {OUT_SYMBOLS} (symbols={len(rows_sym)},  grand_total_weight={grand_w_sym:.2f})")
+    seq_added = [v for v in table.added if not table.is_atomic(v)]
+    if seq_added and len(table) > len(table.added):
+        vprint(f"NOTE: {len(seq_added)} sequence variants not in mappings, decomposed on the fly: {', '.join(sorted(seq_added))}")
     if missing_pop:
         vprint(f"NOTE: no population for {len(missing_pop)} languages → skipped: {', '.join(sorted(missing_pop))}")
 
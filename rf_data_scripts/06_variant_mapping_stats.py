@@ -15,7 +15,21 @@
 #   - в stats: 2 знака; <1% → "<1%"; если в группе >1 и топ ≥99.5% → ">99%"
 #   - в apple: 1 знак; <1% → "<1%"; если в группе >1 и топ ≥99.5% → ">99%"
 #   - в unicode-выводе только коды в скобках.
+#
+# Бутстрэп (--bootstrap N, нужен numpy):
+#   пересэмплируем счётчики букв каждого языка (multinomial(M_i, C_i/M_i)) N раз,
+#   пересчитываем веса символов по правилам 05 и доли внутри групп base_letter.
+#   В stats добавляются колонки ci_low, ci_high (доверительный интервал доли),
+#   rank_stability (доля реплик, где ранг совпал с точечным) и rank_stable (0/1).
+#   Дополнительный вход: rf_summaries/frequencies_by_language.csv
+#
+# Анализ чувствительности (--sensitivity N, нужен numpy):
+#   N сценариев с ошибкой ±pop_error в носителях и ±freq_error в частотах,
+#   все считаются одним батчем массивов (без цикла по сценариям).
+#   Выход: rf_summaries/variant_mapping_sensitivity.csv —
+#   вероятность каждого ранга для каждого варианта внутри base_letter.
 
+import argparse
 import csv
 import os
 import unicodedata
@@ -23,20 +37,52 @@ from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
 from typing import Dict, List, Set
 
+from decomposition import DECOMP_CSV, DecompositionTable
+
 ROOT = Path(__file__).resolve().parent.parent
 os.chdir(ROOT)
 
 MAP_ATOMIC = Path("rf_summaries/variant_mapping_atomic.csv")
 SPEAKERS   = Path("rf_summaries/speakers_rf.csv")
 SYMBOL_POP = Path("rf_summaries/rf_symbol_popularity_weighted.csv")
+FREQS      = Path("rf_summaries/frequencies_by_language.csv")
 
 OUT_STATS   = Path("rf_summaries/variant_mapping_stats.csv")
 OUT_APPLE   = Path("rf_summaries/variant_mapping_priorities_apple.csv")
 OUT_UNICODE = Path("rf_summaries/variant_mapping_priorities_unicode.csv")  # ← новое
+OUT_SENS    = Path("rf_summaries/variant_mapping_sensitivity.csv")
 
 ALMOST_ONE = Decimal("0.995")  # ≥99.5% считаем почти 100% (для правила >99%)
 LT_ONE     = Decimal("0.01")   # всё <1% отображаем как "<1%"
 
+SENS_CHUNK    = 1024  # реплик/сценариев в одном блоке массивов N × R × R (ограничение памяти)
+
+def _relative_error(s: str) -> float:
+    """Относительная ошибка для --pop-error / --freq-error: число из [0, 1) (множитель 1 ± x > 0)."""
+    try:
+        x = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"не число: {s!r}")
+    if not 0.0 <= x < 1.0:
+        raise argparse.ArgumentTypeError(f"ожидается значение из [0, 1), получено {s}")
+    return x
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bootstrap", type=int, default=0,
+                    help="Число бутстрэп-реплик для доверительных интервалов (0 — выключено)")
+    ap.add_argument("--ci", type=float, default=0.95, help="Уровень доверительного интервала")
+    ap.add_argument("--stable-threshold", type=float, default=0.95,
+                    help="Минимальная доля реплик с тем же рангом, чтобы считать ранг стабильным")
+    ap.add_argument("--sensitivity", type=int, default=0,
+                    help="Число сценариев для анализа чувствительности (0 — выключено)")
+    ap.add_argument("--pop-error", type=_relative_error, default=0.10,
+                    help="Относительная ошибка численности носителей (±x, 0 ≤ x < 1)")
+    ap.add_argument("--freq-error", type=_relative_error, default=0.05,
+                    help="Относительная ошибка частот символов (±x, 0 ≤ x < 1)")
+    ap.add_argument("--seed", type=int, default=0, help="Seed генератора случайных чисел")
+    return ap.parse_args()
+
 def nfc_upper(s: str) -> str:
     return unicodedata.normalize("NFC", (s or "").strip()).upper()
 
@@ -77,11 +123,182 @@ def _codes(s: str) -> str:
     """Вернуть строку вида 'U+0410 U+0304' для переданной строки."""
     return " ".join(f"U+{ord(ch):04X}" for ch in s)
 
+def _lang_tables(freq_rows: List[dict], pop_by_lang: Dict[str, Decimal],
+                 sym_idx: Dict[str, int]) -> List[dict]:
+    """
+    Для каждого языка с носителями: счётчики C_i, объём M_i и матрица кратностей
+    P[вариант, символ] по правилу 05 — decomposition.symbol_weights по таблице 03
+    (только символы из sym_idx).
+    Языки, не дающие вклада ни в один символ, отбрасываются.
+    """
+    import numpy as np
+
+    per_lang: Dict[str, dict] = {}
+    for r in freq_rows:
+        lang = (r.get("lang_code") or "").strip()
+        if not lang or pop_by_lang.get(lang, Decimal("0")) <= 0: continue
+        var = nfc_upper(r.get("variant", ""))
+        c = float(_to_dec(r.get("C_i")))
+        if not var or c <= 0: continue
+        d = per_lang.setdefault(lang, {"vars": [], "counts": [], "M": 0.0})
+        d["vars"].append(var)
+        d["counts"].append(c)
+        d["M"] = max(d["M"], float(_to_dec(r.get("M_i"))))
+
+    decomp = DecompositionTable.read(DECOMP_CSV)
+    tables: List[dict] = []
+    for lang, d in sorted(per_lang.items()):
+        P = np.zeros((len(d["vars"]), len(sym_idx)))
+        for i, var in enumerate(d["vars"]):
+            for g, k in decomp.symbol_weights(var):
+                j = sym_idx.get(g)
+                if j is not None: P[i, j] += k
+        if not P.any(): continue
+        counts = np.asarray(d["counts"])
+        tables.append({
+            "lang": lang,
+            "counts": counts,
+            "M": max(d["M"], counts.sum()),
+            "P": P,
+            "pop": float(pop_by_lang[lang]),
+        })
+    return tables
+
+def _group_layout(out_rows: List[dict], sym_idx: Dict[str, int]):
+    """Ключи строк, номер группы, точечный ранг и колонка символа для каждой строки stats."""
+    import numpy as np
+
+    keys = [(r["base_letter"], r["variant"]) for r in out_rows]
+    bases = sorted({b for b, _ in keys})
+    gid = np.array([bases.index(b) for b, _ in keys])
+    point_rank = np.array([r["_rank"] for r in out_rows])
+    cols = [sym_idx[v] for _, v in keys]
+    return keys, gid, point_rank, cols
+
+def _group_ranks(Wr, gid, point_rank):
+    """
+    Ранг каждой строки внутри своей base_letter для пачки реплик Wr[N, R]:
+    1 + число соседей по группе с бо́льшим весом (при равенстве — тот, кто выше
+    в точечном порядке). Считается одной broadcast-операцией N × R × R.
+    """
+    same = gid[:, None] == gid[None, :]
+    beats = (Wr[:, None, :] > Wr[:, :, None]) | (
+        (Wr[:, None, :] == Wr[:, :, None]) & (point_rank[None, :] < point_rank[:, None])[None, :, :]
+    )
+    return 1 + (beats & same[None, :, :]).sum(axis=2)
+
+def _bootstrap_columns(out_rows: List[dict], freq_rows: List[dict],
+                       pop_by_lang: Dict[str, Decimal], args) -> Dict[tuple, dict]:
+    """
+    Мультиномиальный бутстрэп долей внутри групп base_letter.
+    Для каждого языка одна векторная выборка rng.multinomial(M_i, p, size=B);
+    частоты вариантов проецируются на символы матрицей кратностей (правило 05),
+    взвешиваются носителями и суммируются по языкам → W[B, S].
+    Возвращает {(base_letter, variant): {ci_low, ci_high, rank_stability, rank_stable}}.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(args.seed)
+    B = args.bootstrap
+
+    symbols = sorted({r["variant"] for r in out_rows})
+    sym_idx = {s: i for i, s in enumerate(symbols)}
+
+    W = np.zeros((B, len(symbols)))
+    for t in _lang_tables(freq_rows, pop_by_lang, sym_idx):
+        counts, M = t["counts"], t["M"]
+        # остаток (M_i − ΣC_i) — отдельная категория, чтобы сохранить объём выборки
+        p = np.append(counts, M - counts.sum()) / M
+        draws = rng.multinomial(int(round(M)), p, size=B)[:, :-1]
+        W += (draws / M) @ t["P"] * t["pop"]
+
+    keys, gid, point_rank, cols = _group_layout(out_rows, sym_idx)
+    Wr = W[:, cols]                                               # B × R
+
+    G = np.zeros((len(keys), gid.max() + 1)); G[np.arange(len(keys)), gid] = 1.0
+    denom = (Wr @ G)[:, gid]                                      # сумма группы для каждой строки
+    shares = np.divide(Wr, denom, out=np.zeros_like(Wr), where=denom > 0)
+
+    alpha = (1.0 - args.ci) / 2.0
+    lo, hi = np.quantile(shares, [alpha, 1.0 - alpha], axis=0)
+
+    # сравнение рангов — B × R × R, поэтому реплики идут блоками по SENS_CHUNK (как в чувствительности)
+    same_rank = np.zeros(len(keys))
+    for start in range(0, B, SENS_CHUNK):
+        ranks = _group_ranks(Wr[start:start + SENS_CHUNK], gid, point_rank)
+        same_rank += (ranks == point_rank[None, :]).sum(axis=0)
+    stability = same_rank / B
+
+    out: Dict[tuple, dict] = {}
+    for k, key in enumerate(keys):
+        out[key] = {
+            "ci_low": f"{lo[k] * 100:.2f}%",
+            "ci_high": f"{hi[k] * 100:.2f}%",
+            "rank_stability": f"{stability[k]:.3f}",
+            "rank_stable": "1" if stability[k] >= args.stable_threshold else "0",
+        }
+    return out
+
+def _sensitivity_rows(out_rows: List[dict], freq_rows: List[dict],
+                      pop_by_lang: Dict[str, Decimal], args) -> tuple:
+    """
+    Анализ чувствительности порядка вариантов к ошибкам во входных данных.
+    Генерируем N сценариев сразу массивами:
+      • численность носителей каждого языка × U(1 − pop_error, 1 + pop_error),
+      • частота каждого символа в каждом языке × U(1 − freq_error, 1 + freq_error),
+    и считаем веса всех сценариев одним einsum: W[n, s] = Σ_l pop'[n, l] · F'[n, l, s].
+    Сценарии обрабатываются блоками по SENS_CHUNK только ради памяти.
+    Возвращает (строки отчёта, максимальный размер группы).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(args.seed)
+    N = args.sensitivity
+
+    symbols = sorted({r["variant"] for r in out_rows})
+    sym_idx = {s: i for i, s in enumerate(symbols)}
+    tables = _lang_tables(freq_rows, pop_by_lang, sym_idx)
+
+    # F[l, s] — доля символа s в языке l; pop[l] — носители
+    F = np.stack([(t["counts"] / t["M"]) @ t["P"] for t in tables])
+    pop = np.array([t["pop"] for t in tables])
+
+    keys, gid, point_rank, cols = _group_layout(out_rows, sym_idx)
+    max_rank = int(np.bincount(gid).max())
+    hist = np.zeros((len(keys), max_rank))
+
+    for start in range(0, N, SENS_CHUNK):
+        n = min(SENS_CHUNK, N - start)
+        pop_n = pop[None, :] * rng.uniform(1 - args.pop_error, 1 + args.pop_error, size=(n, len(pop)))
+        F_n = F[None, :, :] * rng.uniform(1 - args.freq_error, 1 + args.freq_error, size=(n,) + F.shape)
+        Wr = np.einsum("nl,nls->ns", pop_n, F_n)[:, cols]
+        ranks = _group_ranks(Wr, gid, point_rank)
+        # гистограмма рангов: hist[k, r-1] += число сценариев с рангом r
+        np.add.at(hist, (np.broadcast_to(np.arange(len(keys)), ranks.shape), ranks - 1), 1)
+
+    probs = hist / N
+    rows: List[dict] = []
+    for k, (base, var) in enumerate(keys):
+        row = {
+            "base_letter": base,
+            "variant": var,
+            "point_rank": int(point_rank[k]),
+            "p_point_rank": f"{probs[k, point_rank[k] - 1]:.4f}",
+        }
+        for r in range(max_rank):
+            row[f"p_rank_{r + 1}"] = f"{probs[k, r]:.4f}"
+        rows.append(row)
+    return rows, max_rank
+
 def main():
+    args = parse_args()
+
     # входы
     if not MAP_ATOMIC.exists(): print(f"ERR: not found {MAP_ATOMIC}"); return
     if not SPEAKERS.exists():   print(f"ERR: not found {SPEAKERS}"); return
     if not SYMBOL_POP.exists(): print(f"ERR: not found {SYMBOL_POP}"); return
+    if (args.bootstrap > 0 or args.sensitivity > 0) and not FREQS.exists():
+        print(f"ERR: not found {FREQS}"); return
 
     map_rows   = _read_csv_flex(MAP_ATOMIC)
     speak_rows = _read_csv_flex(SPEAKERS)
@@ -176,10 +393,17 @@ def main():
     out_rows.sort(key=lambda r: (r["base_letter"], r["_rank"]))
     OUT_STATS.parent.mkdir(parents=True, exist_ok=True)
 
+    fieldnames = ["base_letter","variant","source_languages","rf_speakers","relative_freq_in_group"]
+    if args.bootstrap > 0:
+        boot = _bootstrap_columns(out_rows, _read_csv_flex(FREQS), pop_by_lang, args)
+        for r in out_rows:
+            r.update(boot[(r["base_letter"], r["variant"])])
+        fieldnames += ["ci_low", "ci_high", "rank_stability", "rank_stable"]
+        unstable = sum(1 for r in out_rows if r["rank_stable"] == "0")
+        print(f"Bootstrap: {args.bootstrap} replicas, CI={args.ci:g}, unstable ranks: {unstable} of {len(out_rows)}")
+
     with OUT_STATS.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=[
-            "base_letter","variant","source_languages","rf_speakers","relative_freq_in_group"
-        ])
+        w = csv.DictWriter(f, fieldnames=fieldnames)
         w.writeheader()
         for r in out_rows:
             r = {k: v for k, v in r.items() if k != "_rank"}
@@ -201,5 +425,17 @@ def main():
     print(f"OK: wrote {OUT_APPLE}")
     print(f"OK: wrote {OUT_UNICODE}")
 
+    if args.sensitivity > 0:
+        sens_rows, max_rank = _sensitivity_rows(out_rows, _read_csv_flex(FREQS), pop_by_lang, args)
+        with OUT_SENS.open("w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=[
+                "base_letter", "variant", "point_rank", "p_point_rank"
+            ] + [f"p_rank_{r + 1}" for r in range(max_rank)])
+            w.writeheader()
+            w.writerows(sens_rows)
+        fragile = sum(1 for r in sens_rows if float(r["p_point_rank"]) < args.stable_threshold)
+        print(f"OK: wrote {OUT_SENS} (scenarios={args.sensitivity}, "
+              f"pop±{args.pop_error:g}, freq±{args.freq_error:g}, fragile ranks: {fragile})")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+# data_scripts/07_export_sqlite.py
+#
+# Экспорт всех сводок в одну SQLite-базу для ad-hoc анализа.
+#
+# Вход (для каждой области):
+#   rf     → rf_summaries/     speakers_rf.csv, frequencies_by_language.csv,
+#                              variant_mapping.csv, variant_mapping_atomic.csv,
+#                              rf_letter_popularity_weighted.csv, rf_symbol_popularity_weighted.csv,
+#                              variant_mapping_stats.csv
+#   global → world_summaries/  те же таблицы с префиксом global_ / speakers_global.csv
+#
+# Выход:
+#   rf_summaries/summaries.sqlite
+#
+# Таблицы (у всех колонка scope = rf | global):
+#   speakers, frequencies, mappings (provenance — «язык:формат» через запятую, как в 03;
+#   NULL, если во входном CSV нет столбца), mapping_languages,
+#   letter_popularity, symbol_popularity, mapping_stats
+# Представления:
+#   v_variant_reach            — вариант → число языков и суммарные носители
+#   v_base_priorities          — порядок вариантов под базовой буквой
+#   v_language_special_letters — спец-буквы языка с частотами и носителями
+#
+# Пример: варианты, общие для >3 языков с >1M носителей
+#   SELECT * FROM v_variant_reach
+#   WHERE scope='rf' AND n_languages > 3 AND total_speakers > 1000000;
+#
+# База собирается во временный файл одной транзакцией (executemany) и
+# атомарно подменяет прежнюю.
+
+import csv
+import os
+import sqlite3
+import unicodedata
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+OUT_DB = Path("rf_summaries/summaries.sqlite")
+
+SCOPES: Dict[str, Dict[str, Path]] = {
+    "rf": {
+        "speakers":    Path("rf_summaries/speakers_rf.csv"),
+        "frequencies": Path("rf_summaries/frequencies_by_language.csv"),
+        "mapping":     Path("rf_summaries/variant_mapping.csv"),
+        "atomic":      Path("rf_summaries/variant_mapping_atomic.csv"),
+        "letters":     Path("rf_summaries/rf_letter_popularity_weighted.csv"),
+        "symbols":     Path("rf_summaries/rf_symbol_popularity_weighted.csv"),
+        "stats":       Path("rf_summaries/variant_mapping_stats.csv"),
+    },
+    "global": {
+        "speakers":    Path("world_summaries/speakers_global.csv"),
+        "frequencies": Path("world_summaries/frequencies_by_language.csv"),
+        "mapping":     Path("world_summaries/variant_mapping.csv"),
+        "atomic":      Path("world_summaries/variant_mapping_atomic.csv"),
+        "letters":     Path("world_summaries/global_letter_popularity_weighted.csv"),
+        "symbols":     Path("world_summaries/global_symbol_popularity_weighted.csv"),
+        "stats":       Path("world_summaries/variant_mapping_stats.csv"),
+    },
+}
+
+SCHEMA = """
+CREATE TABLE speakers (
+    scope       TEXT NOT NULL,
+    lang_code   TEXT NOT NULL,
+    population  INTEGER NOT NULL,
+    PRIMARY KEY (scope, lang_code)
+);
+CREATE TABLE frequencies (
+    scope       TEXT NOT NULL,
+    lang_code   TEXT NOT NULL,
+    vendor      TEXT,
+    variant     TEXT NOT NULL,
+    c_i         REAL,
+    m_i         REAL,
+    f_i         REAL,
+    PRIMARY KEY (scope, lang_code, variant)
+);
+CREATE TABLE mappings (
+    scope        TEXT NOT NULL,
+    base_letter  TEXT NOT NULL,
+    variant      TEXT NOT NULL,
+    has_sequence INTEGER NOT NULL,
+    is_atomic    INTEGER NOT NULL,
+    notes        TEXT,
+    provenance   TEXT,
+    PRIMARY KEY (scope, base_letter, variant)
+);
+CREATE TABLE mapping_languages (
+    scope        TEXT NOT NULL,
+    base_letter  TEXT NOT NULL,
+    variant      TEXT NOT NULL,
+    lang_code    TEXT NOT NULL,
+    PRIMARY KEY (scope, base_letter, variant, lang_code),
+    FOREIGN KEY (scope, base_letter, variant) REFERENCES mappings (scope, base_letter, variant)
+);
+CREATE TABLE letter_popularity (
+    scope               TEXT NOT NULL,
+    variant             TEXT NOT NULL,
+    rank                INTEGER NOT NULL,
+    weighted_population REAL,
+    share               REAL,
+    langs_count         INTEGER,
+    PRIMARY KEY (scope, variant)
+);
+CREATE TABLE symbol_popularity (
+    scope               TEXT NOT NULL,
+    symbol              TEXT NOT NULL,
+    rank                INTEGER NOT NULL,
+    weighted_population REAL,
+    share               REAL,
+    langs_count         INTEGER,
+    PRIMARY KEY (scope, symbol)
+);
+CREATE TABLE mapping_stats (
+    scope                  TEXT NOT NULL,
+    base_letter            TEXT NOT NULL,
+    variant                TEXT NOT NULL,
+    rank_in_group          INTEGER NOT NULL,
+    speakers               INTEGER,
+    relative_freq_in_group TEXT,
+    PRIMARY KEY (scope, base_letter, variant)
+);
+
+CREATE INDEX idx_speakers_lang       ON speakers (lang_code);
+CREATE INDEX idx_freq_lang           ON frequencies (lang_code);
+CREATE INDEX idx_freq_variant        ON frequencies (variant);
+CREATE INDEX idx_mappings_variant    ON mappings (variant);
+CREATE INDEX idx_mappings_base       ON mappings (base_letter);
+CREATE INDEX idx_maplang_lang        ON mapping_languages (lang_code);
+CREATE INDEX idx_maplang_variant     ON mapping_languages (variant);
+CREATE INDEX idx_maplang_base        ON mapping_languages (base_letter);
+CREATE INDEX idx_letters_rank        ON letter_popularity (scope, rank);
+CREATE INDEX idx_symbols_rank        ON symbol_popularity (scope, rank);
+CREATE INDEX idx_stats_variant       ON mapping_stats (variant);
+CREATE INDEX idx_stats_base          ON mapping_stats (base_letter);
+
+CREATE VIEW v_variant_reach AS
+SELECT ml.scope,
+       ml.variant,
+       COUNT(DISTINCT ml.lang_code)             AS n_languages,
+       GROUP_CONCAT(DISTINCT ml.lang_code)      AS languages,
+       COALESCE(SUM(s.population), 0)           AS total_speakers
+FROM (SELECT DISTINCT scope, variant, lang_code FROM mapping_languages) AS ml
+LEFT JOIN speakers AS s ON s.scope = ml.scope AND s.lang_code = ml.lang_code
+GROUP BY ml.scope, ml.variant;
+
+CREATE VIEW v_base_priorities AS
+SELECT st.scope, st.base_letter, st.rank_in_group, st.variant,
+       st.relative_freq_in_group, st.speakers, sp.weighted_population
+FROM mapping_stats AS st
+LEFT JOIN symbol_popularity AS sp ON sp.scope = st.scope AND sp.symbol = st.variant
+ORDER BY st.scope, st.base_letter, st.rank_in_group;
+
+CREATE VIEW v_language_special_letters AS
+SELECT ml.scope, ml.lang_code, s.population, ml.base_letter, ml.variant, m.has_sequence,
+       f.f_i, f.f_i * s.population AS weighted_population
+FROM mapping_languages AS ml
+JOIN mappings AS m ON m.scope = ml.scope AND m.base_letter = ml.base_letter AND m.variant = ml.variant
+LEFT JOIN speakers AS s ON s.scope = ml.scope AND s.lang_code = ml.lang_code
+LEFT JOIN frequencies AS f ON f.scope = ml.scope AND f.lang_code = ml.lang_code AND f.variant = ml.variant;
+"""
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+def _split_langs(s: str) -> List[str]:
+    return [lg.strip() for lg in (s or "").split(",") if lg.strip()]
+
+def scope_rows(scope: str, paths: Dict[str, Path]) -> Dict[str, List[tuple]]:
+    """Все строки одной области, уже в виде кортежей под executemany."""
+    out: Dict[str, List[tuple]] = {k: [] for k in (
+        "speakers", "frequencies", "mappings", "mapping_languages",
+        "letter_popularity", "symbol_popularity", "mapping_stats")}
+
+    for r in _read_csv_flex(paths["speakers"]):
+        lang = (r.get("lang_code") or "").strip()
+        if lang:
+            out["speakers"].append((scope, lang, int(_to_float(r.get("population")))))
+
+    seen_freq = set()
+    for r in _read_csv_flex(paths["frequencies"]):
+        lang, var = (r.get("lang_code") or "").strip(), nfc_upper(r.get("variant", ""))
+        if not lang or not var or (lang, var) in seen_freq: continue
+        seen_freq.add((lang, var))
+        out["frequencies"].append((scope, lang, r.get("vendor", ""), var,
+                                   _to_float(r.get("C_i")), _to_float(r.get("M_i")), _to_float(r.get("f_i"))))
+
+    atomic = {(nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", "")))
+              for r in _read_csv_flex(paths["atomic"])}
+    mapped = {}
+    for r in _read_csv_flex(paths["mapping"]) + _read_csv_flex(paths["atomic"]):
+        key = (nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", "")))
+        if not all(key): continue
+        # строка из полного маппинга приходит первой и задаёт has_sequence
+        if key not in mapped:
+            mapped[key] = (r.get("has_sequence", "0"), r.get("notes", ""), set(), set())
+        mapped[key][2].update(_split_langs(r.get("source_languages")))
+        mapped[key][3].update(_split_langs(r.get("provenance")))
+    for (base, var), (seq, notes, langs, prov) in sorted(mapped.items()):
+        # provenance нет в старых сводках (world_summaries) — NULL, а не пустая строка
+        out["mappings"].append((scope, base, var, int(seq == "1"), int((base, var) in atomic), notes,
+                                ",".join(sorted(prov)) or None))
+        out["mapping_languages"].extend((scope, base, var, lg) for lg in sorted(langs))
+
+    for key, table, col in (("letters", "letter_popularity", "variant"),
+                            ("symbols", "symbol_popularity", "symbol")):
+        for r in _read_csv_flex(paths[key]):
+            sym = nfc_upper(r.get(col, ""))
+            if not sym: continue
+            out[table].append((scope, sym, int(_to_float(r.get("rank"))),
+                               _to_float(r.get("weighted_population")), _to_float(r.get("share")),
+                               int(_to_float(r.get("langs_count")))))
+
+    rank_in_base: Dict[str, int] = {}
+    for r in _read_csv_flex(paths["stats"]):
+        base, var = nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", ""))
+        if not base or not var: continue
+        rank_in_base[base] = rank_in_base.get(base, 0) + 1
+        sp = r.get("rf_speakers") or r.get("total_speakers") or "0"
+        out["mapping_stats"].append((scope, base, var, rank_in_base[base], int(_to_float(sp)),
+                                     r.get("relative_freq_in_group", "")))
+    return out
+
+INSERTS = {
+    "speakers":          "INSERT INTO speakers VALUES (?,?,?)",
+    "frequencies":       "INSERT INTO frequencies VALUES (?,?,?,?,?,?,?)",
+    "mappings":          "INSERT INTO mappings VALUES (?,?,?,?,?,?,?)",
+    "mapping_languages": "INSERT INTO mapping_languages VALUES (?,?,?,?)",
+    "letter_popularity": "INSERT INTO letter_popularity VALUES (?,?,?,?,?,?)",
+    "symbol_popularity": "INSERT INTO symbol_popularity VALUES (?,?,?,?,?,?)",
+    "mapping_stats":     "INSERT INTO mapping_stats VALUES (?,?,?,?,?,?)",
+}
+
+def main():
+    tmp = OUT_DB.with_suffix(".sqlite.tmp")
+    OUT_DB.parent.mkdir(parents=True, exist_ok=True)
+    if tmp.exists():
+        tmp.unlink()
+
+    con = sqlite3.connect(tmp)
+    try:
+        # временный файл: журнал и fsync не нужны, атомарность даёт os.replace
+        con.execute("PRAGMA journal_mode = OFF")
+        con.execute("PRAGMA synchronous = OFF")
+        con.executescript(SCHEMA)
+        totals: Dict[str, int] = {k: 0 for k in INSERTS}
+        with con:  # одна транзакция на всю загрузку
+            for scope, paths in SCOPES.items():
+                rows = scope_rows(scope, paths)
+                if not rows["speakers"] and not rows["frequencies"]:
+                    print(f"WARN: scope '{scope}' has no inputs — skipped")
+                    continue
+                for table, sql in INSERTS.items():
+                    con.executemany(sql, rows[table])
+                    totals[table] += len(rows[table])
+        con.execute("ANALYZE")
+    finally:
+        con.close()
+    os.replace(tmp, OUT_DB)
+
+    print(f"OK: wrote {OUT_DB} (" + ", ".join(f"{k}={v}" for k, v in totals.items()) + ")")
+
+if __name__ == "__main__":
+    main()
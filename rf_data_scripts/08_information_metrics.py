@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+# data_scripts/08_information_metrics.py
+#
+# Информационные метрики по языкам на основе распределения букв (нужен numpy).
+#
+# Вход (для каждой области):
+#   rf     → rf_summaries/frequencies_by_language.csv, rf_summaries/variant_mapping.csv,
+#            rf_summaries/variant_mapping_stats.csv
+#   global → world_summaries/ те же файлы
+#   data/<lang>/*/frequencies/*bigram*.csv — если есть (bigram,frequency); все вендоры, суммируются
+#
+# Выход:
+#   rf_summaries/information_metrics.csv
+#     scope, lang_code, n_letters,
+#     entropy_bits            — H(X), энтропия Шеннона распределения букв
+#     max_entropy_bits        — log2(n_letters)
+#     efficiency              — H / Hmax
+#     perplexity              — 2^H
+#     key_entropy_bits        — H(K), K — клавиша русской раскладки (база для long-press)
+#     cond_entropy_key_bits   — H(X|K) = H(X) − H(K): что остаётся выбрать во всплывающем меню
+#     bigram_cond_entropy_bits— H(X2|X1) по биграммам (пусто, если биграмм нет)
+#     nonrus_share            — доля букв вне русского алфавита
+#     expected_cost           — ожидаемая стоимость набора одной буквы (тап = 1)
+#     longpress_cost_share    — доля ожидаемой стоимости, приходящаяся на нерусские буквы
+#
+# Модель стоимости (константы keyboard_layout): русская буква — TAP_COST; нерусская буква под
+# базой в маппинге — TAP_COST + LONG_PRESS_COST + SLOT_COST × (позиция во всплывающем меню − 1); последовательности
+# (КЪ, ДЖ) — сумма стоимостей графем. Немаппированная нерусская буква — UNMAPPED_COST.
+#
+# Все языки всех областей считаются одним батчем: матрица P[(scope, lang), буква].
+
+import csv
+import os
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from keyboard_layout import LONG_PRESS_COST, SLOT_COST, TAP_COST
+from segmentation import graphemes
+import vendors
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+SCOPES: Dict[str, Dict[str, Path]] = {
+    "rf": {
+        "frequencies": Path("rf_summaries/frequencies_by_language.csv"),
+        "mapping":     Path("rf_summaries/variant_mapping.csv"),
+        "stats":       Path("rf_summaries/variant_mapping_stats.csv"),
+    },
+    "global": {
+        "frequencies": Path("world_summaries/frequencies_by_language.csv"),
+        "mapping":     Path("world_summaries/variant_mapping.csv"),
+        "stats":       Path("world_summaries/variant_mapping_stats.csv"),
+    },
+}
+OUT_CSV = Path("rf_summaries/information_metrics.csv")
+
+RUSSIAN = set("АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ")
+
+UNMAPPED_COST   = 3.0   # буквы без места в раскладке (переключение/ввод иначе)
+
+BIGRAM_KEYS = ["bigram", "pair", "unit", "letters"]
+COUNT_KEYS  = ["frequency", "count", "c", "freq"]
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+def _graphemes(s: str) -> List[str]:
+    """Графемы UAX #29 (как в 05, модуль segmentation)."""
+    return graphemes(s)
+
+def _entropy_rows(P: np.ndarray) -> np.ndarray:
+    """Энтропия (бит) каждой строки матрицы вероятностей; 0·log0 = 0."""
+    logs = np.log2(P, out=np.zeros_like(P), where=P > 0)
+    return -(P * logs).sum(axis=1)
+
+def _mapping_positions(scope: Dict[str, Path]) -> Dict[Tuple[str, str], Tuple[str, int]]:
+    """(lang, variant) → (base_letter, слот во всплывающем меню, 1-based)."""
+    slot: Dict[Tuple[str, str], int] = {}
+    rank_in_base: Dict[str, int] = {}
+    for r in _read_csv_flex(scope["stats"]):
+        base, var = nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", ""))
+        rank_in_base[base] = rank_in_base.get(base, 0) + 1
+        slot[(base, var)] = rank_in_base[base]
+
+    out: Dict[Tuple[str, str], Tuple[str, int]] = {}
+    for r in _read_csv_flex(scope["mapping"]):
+        base, var = nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", ""))
+        if not base or not var: continue
+        # варианты вне stats (последовательности) ставим в конец меню базы
+        pos = slot.get((base, var), rank_in_base.get(base, 0) + 1)
+        for lg in (r.get("source_languages") or "").split(","):
+            lg = lg.strip()
+            if lg and (lg, var) not in out:
+                out[(lg, var)] = (base, pos)
+    return out
+
+def _grapheme_cost(g: str, lang: str, positions: Dict[Tuple[str, str], Tuple[str, int]]) -> float:
+    if g in RUSSIAN:
+        return TAP_COST
+    hit = positions.get((lang, g))
+    if hit:
+        return TAP_COST + LONG_PRESS_COST + SLOT_COST * (hit[1] - 1)
+    return UNMAPPED_COST
+
+def _bigram_cond_entropy(lang: str) -> Optional[float]:
+    """H(X2|X1) = H(X1,X2) − H(X1) по файлам биграмм всех вендоров (счётчики пар суммируются, как в 09)."""
+    paths = vendors.vendor_paths(lang, "frequencies/*bigram*.csv")
+    if not paths:
+        return None
+    counts: Dict[Tuple[str, str], float] = {}
+    for r in (r for path in paths for r in _read_csv_flex(path)):
+        row = {(k or "").strip().lower(): v for k, v in r.items()}
+        bk = next((k for k in BIGRAM_KEYS if row.get(k)), None)
+        ck = next((k for k in COUNT_KEYS if row.get(k)), None)
+        if not bk or not ck: continue
+        g = _graphemes(nfc_upper(row[bk]))
+        c = _to_float(row[ck])
+        if len(g) != 2 or c <= 0: continue
+        counts[(g[0], g[1])] = counts.get((g[0], g[1]), 0.0) + c
+    if not counts:
+        return None
+    firsts = sorted({a for a, _ in counts})
+    seconds = sorted({b for _, b in counts})
+    fi = {a: i for i, a in enumerate(firsts)}; si = {b: j for j, b in enumerate(seconds)}
+    J = np.zeros((1, len(firsts) * len(seconds)))
+    for (a, b), c in counts.items():
+        J[0, fi[a] * len(seconds) + si[b]] = c
+    J /= J.sum()
+    marg = J.reshape(len(firsts), len(seconds)).sum(axis=1)[None, :]
+    return float(_entropy_rows(J)[0] - _entropy_rows(marg)[0])
+
+def main():
+    # 1) строки (scope, lang) и столбцы — объединённый алфавит
+    row_keys: List[Tuple[str, str]] = []
+    cells: List[Tuple[int, str, float]] = []
+    positions_by_scope = {}
+    for scope, paths in SCOPES.items():
+        rows = _read_csv_flex(paths["frequencies"])
+        if not rows:
+            vprint(f"[{scope}] нет {paths['frequencies']} — пропуск")
+            continue
+        positions_by_scope[scope] = _mapping_positions(paths)
+        row_of: Dict[str, int] = {}
+        for r in rows:
+            lang, var = (r.get("lang_code") or "").strip(), nfc_upper(r.get("variant", ""))
+            c = _to_float(r.get("C_i"))
+            if not lang or not var or c <= 0: continue
+            if lang not in row_of:
+                row_of[lang] = len(row_keys); row_keys.append((scope, lang))
+            cells.append((row_of[lang], var, c))
+
+    if not row_keys:
+        print("ERR: no frequency inputs"); return
+
+    alphabet = sorted({v for _, v, _ in cells})
+    col = {v: j for j, v in enumerate(alphabet)}
+    R, V = len(row_keys), len(alphabet)
+
+    C = np.zeros((R, V))
+    cost = np.zeros((R, V))
+    key_of = np.zeros((R, V), dtype=np.int64)   # id клавиши-базы для каждой буквы
+    keys: Dict[str, int] = {}
+    for i, var, c in cells:
+        scope, lang = row_keys[i]
+        j = col[var]
+        C[i, j] += c
+        pos = positions_by_scope[scope]
+        cost[i, j] = sum(_grapheme_cost(g, lang, pos) for g in _graphemes(var))
+        base = pos[(lang, var)][0] if (lang, var) in pos else var
+        key_of[i, j] = keys.setdefault(base, len(keys))
+
+    # 2) все метрики — векторно по строкам
+    P = C / C.sum(axis=1, keepdims=True)
+    n_letters = (C > 0).sum(axis=1)
+    H = _entropy_rows(P)
+    Hmax = np.log2(np.maximum(n_letters, 1))
+    efficiency = np.divide(H, Hmax, out=np.zeros_like(H), where=Hmax > 0)
+    perplexity = np.exp2(H)
+
+    PK = np.zeros((R, len(keys)))
+    np.add.at(PK, (np.repeat(np.arange(R), V), key_of.ravel()), P.ravel())
+    HK = _entropy_rows(PK)
+
+    nonrus = np.array([not all(g in RUSSIAN for g in _graphemes(v)) for v in alphabet])
+    nonrus_share = P[:, nonrus].sum(axis=1)
+    expected_cost = (P * cost).sum(axis=1)
+    lp_share = (P[:, nonrus] * cost[:, nonrus]).sum(axis=1) / expected_cost
+
+    bigram_cache: Dict[str, Optional[float]] = {}
+
+    out_rows: List[dict] = []
+    for i, (scope, lang) in enumerate(row_keys):
+        if lang not in bigram_cache:
+            bigram_cache[lang] = _bigram_cond_entropy(lang)
+        hb = bigram_cache[lang]
+        out_rows.append({
+            "scope": scope,
+            "lang_code": lang,
+            "n_letters": int(n_letters[i]),
+            "entropy_bits": f"{H[i]:.6f}",
+            "max_entropy_bits": f"{Hmax[i]:.6f}",
+            "efficiency": f"{efficiency[i]:.6f}",
+            "perplexity": f"{perplexity[i]:.4f}",
+            "key_entropy_bits": f"{HK[i]:.6f}",
+            "cond_entropy_key_bits": f"{H[i] - HK[i]:.6f}",
+            "bigram_cond_entropy_bits": "" if hb is None else f"{hb:.6f}",
+            "nonrus_share": f"{nonrus_share[i]:.6f}",
+            "expected_cost": f"{expected_cost[i]:.6f}",
+            "longpress_cost_share": f"{lp_share[i]:.6f}",
+        })
+
+    out_rows.sort(key=lambda r: (r["scope"] != "rf", r["scope"], r["lang_code"]))
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
+        w.writeheader()
+        w.writerows(out_rows)
+
+    with_bigrams = sum(1 for v in bigram_cache.values() if v is not None)
+    print(f"OK: wrote {OUT_CSV} (rows={len(out_rows)}, alphabet={V}, with bigrams={with_bigrams})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# data_scripts/09_score_layouts.py
+#
+# Оценка раскладок keyboard/<lang>_key_default.json по частотам языка (нужен numpy).
+#
+# Вход:
+#   rf_summaries/frequencies_by_language.csv
+#   data/<lang>/<vendor>/keyboard/<lang>_key_default.json     — раскладка вендора (vendors.vendor_file)
+#   data/<lang>/<vendor>/mapping/<lang>_key_mapping.json       — доп. long-press того же вендора
+#   data/lang/vendor/keyboard/rf_key_default_wise.json         — единая клавиатура РФ
+#   data/<lang>/*/frequencies/*bigram*.csv                     — если есть (bigram,frequency); все вендоры, суммируются
+#
+# Выход:
+#   rf_summaries/layout_scores.csv
+#     lang_code, layout, source (vendor | rf_unified), keys, coverage,
+#     keystrokes_per_letter, longpress_rate, longpress_overhead, travel_per_letter, cost_per_letter,
+#     time_ms_per_letter (закон Фиттса по геометрии iOS_keyboard.html, см. keyboard_layout.TimingModel)
+#
+# Раскладки вендоров берутся из кэша компиляции (keyboard_layout.compile_cached).
+# Раскладка компилируется один раз в массивы (keyboard_layout.CostTable), дальше оценка —
+# скалярные произведения; единая раскладка оценивается для всех языков одним вызовом.
+
+import csv
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from keyboard_layout import (BASE_LAYOUT, UNIFIED_LAYOUT, CostTable, compile_cached, compile_layout,
+                             load_layout)
+from segmentation import graphemes
+import vendors
+from vendor_files import load_mapping
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+FREQ_CSV = Path("rf_summaries/frequencies_by_language.csv")
+OUT_CSV  = Path("rf_summaries/layout_scores.csv")
+
+EXCLUDED_LANGS = {"lang", "ru", "rus"}
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+def _bigram_matrix(lang: str, col: Dict[str, int]) -> Optional[np.ndarray]:
+    B = np.zeros((len(col), len(col)))
+    rows = [r for path in vendors.vendor_paths(lang, "frequencies/*bigram*.csv") for r in _read_csv_flex(path)]
+    for r in rows:
+        row = {(k or "").strip().lower(): v for k, v in r.items()}
+        pair = graphemes(nfc_upper(row.get("bigram") or row.get("pair") or ""))
+        c = _to_float(row.get("frequency") or row.get("count"))
+        if len(pair) == 2 and c > 0 and pair[0] in col and pair[1] in col:
+            B[col[pair[0]], col[pair[1]]] += c
+    return B if B.any() else None
+
+def _fmt(row: dict, lang: str, layout: str, source: str, keys: int) -> dict:
+    return {
+        "lang_code": lang,
+        "layout": layout,
+        "source": source,
+        "keys": keys,
+        "coverage": f"{row['coverage']:.6f}",
+        "keystrokes_per_letter": f"{row['keystrokes']:.6f}",
+        "longpress_rate": f"{row['longpress_rate']:.6f}",
+        "longpress_overhead": f"{row['longpress_overhead']:.6f}",
+        "travel_per_letter": f"{row['travel']:.6f}",
+        "cost_per_letter": f"{row['cost']:.6f}",
+        "time_ms_per_letter": f"{row['time_ms']:.3f}",
+    }
+
+def main():
+    if not FREQ_CSV.exists():
+        print(f"ERR: not found {FREQ_CSV}"); return
+
+    # частоты → P[L, V]
+    cells: Dict[str, Dict[str, float]] = {}
+    for r in _read_csv_flex(FREQ_CSV):
+        lang, var = (r.get("lang_code") or "").strip(), nfc_upper(r.get("variant", ""))
+        c = _to_float(r.get("C_i"))
+        if lang and var and c > 0 and lang not in EXCLUDED_LANGS:
+            cells.setdefault(lang, {})[var] = cells.get(lang, {}).get(var, 0.0) + c
+    langs = sorted(cells)
+    alphabet = sorted({v for d in cells.values() for v in d})
+    col = {v: j for j, v in enumerate(alphabet)}
+    P = np.zeros((len(langs), len(alphabet)))
+    for i, lang in enumerate(langs):
+        for var, c in cells[lang].items():
+            P[i, col[var]] = c
+    P /= P.sum(axis=1, keepdims=True)
+
+    base = load_layout(BASE_LAYOUT)
+    out_rows: List[dict] = []
+
+    # 1) единая клавиатура РФ — все языки одним вызовом
+    t0 = time.perf_counter()
+    unified = CostTable(compile_layout(load_layout(UNIFIED_LAYOUT), "rf_unified", base=base), alphabet)
+    t_compile = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    scores = unified.score(P)
+    t_score = time.perf_counter() - t0
+    unified_name = str(UNIFIED_LAYOUT.relative_to(ROOT))
+    for i, lang in enumerate(langs):
+        out_rows.append(_fmt({k: v[i] for k, v in scores.items()}, lang, unified_name,
+                             "rf_unified", unified.layout.n_keys))
+
+    # 2) раскладки вендоров — каждая по своему языку
+    n_vendor = 0
+    for i, lang in enumerate(langs):
+        path = vendors.vendor_file(lang, f"keyboard/{lang}_key_default.json")
+        if path is None:
+            continue
+        extra = load_mapping(vendors.layout_mapping(lang, path))
+        t0 = time.perf_counter()
+        try:
+            layout = compile_cached(path, lang, extra_long_press=extra)
+        except Exception as e:
+            vprint(f"[{lang}] ошибка раскладки {path}: {e}")
+            continue
+        table = CostTable(layout, alphabet)
+        t_compile += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        s = table.score(P[i], _bigram_matrix(lang, col))
+        t_score += time.perf_counter() - t0
+        out_rows.append(_fmt({k: v[0] for k, v in s.items()}, lang, str(path), "vendor",
+                             table.layout.n_keys))
+        n_vendor += 1
+
+    out_rows.sort(key=lambda r: (r["lang_code"], r["source"] != "vendor"))
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
+        w.writeheader()
+        w.writerows(out_rows)
+
+    print(f"OK: wrote {OUT_CSV} (vendor layouts={n_vendor}, languages={len(langs)})")
+    print(f"   compile={t_compile * 1000:.1f} ms, score={t_score * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
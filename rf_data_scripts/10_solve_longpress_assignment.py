@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# data_scripts/10_solve_longpress_assignment.py
+#
+# Оптимальное размещение атомарных вариантов во всплывающих меню единой клавиатуры РФ
+# как задача о назначениях (нужен numpy).
+#
+# Вход:
+#   rf_summaries/variant_mapping_atomic.csv          — варианты и их текущая база
+#   rf_summaries/rf_symbol_popularity_weighted.csv   — вес символа (носители × частота, как в 06)
+#   data/*/*/mapping/*_key_mapping*.json             — где вендоры уже держат вариант
+#
+# Выход:
+#   rf_summaries/rf_key_mapping_optimal.json         — {база: [варианты по слотам]}, формат *_key_mapping.json
+#   rf_summaries/rf_key_mapping_optimal.csv          — base_letter, slot, variant, weight, cost, current_base
+#
+# Модель:
+#   столбец — (клавиша русской буквы, слот 1..CAPACITY), строка — вариант;
+#   cost(v, b, s) = w_v × (LONG_PRESS_COST + SLOT_COST × (s − 1) + ALT_BASE_COST × [b ≠ текущая база]),
+#   LONG_PRESS_COST и SLOT_COST — из keyboard_layout (та же модель, что в 08, 09 и optimize_layout).
+#   Вариант можно поставить только под «похожую» базу:
+#     - базовая буква NFD-разложения (Ӑ → А);
+#     - буква из имени Unicode (… LETTER EN WITH DESCENDER → Н, LIGATURE A IE → А, Е);
+#     - база, под которой вариант держит хотя бы один вендор;
+#     - текущая база из variant_mapping_atomic.csv (так решение всегда существует).
+#   Остальные клетки — запрещены (INFEASIBLE).
+#
+# Решение — венгерский алгоритм (кратчайшие увеличивающие пути с потенциалами, O(n²·m)),
+# внутренний цикл по столбцам векторизован.
+
+import argparse
+import csv
+import glob
+import json
+import os
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from keyboard_layout import LONG_PRESS_COST, SLOT_COST
+from vendor_files import load_mapping
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+MAP_ATOMIC = Path("rf_summaries/variant_mapping_atomic.csv")
+SYMBOL_POP = Path("rf_summaries/rf_symbol_popularity_weighted.csv")
+MAPPING_GLOB = "data/*/*/mapping/*_key_mapping*.json"
+
+OUT_JSON = Path("rf_summaries/rf_key_mapping_optimal.json")
+OUT_CSV  = Path("rf_summaries/rf_key_mapping_optimal.csv")
+
+RUSSIAN = "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+
+CAPACITY        = 6     # слотов во всплывающем меню одной клавиши
+ALT_BASE_COST   = 0.1   # небольшая плата за перенос варианта под другую похожую базу
+MIN_WEIGHT      = 1.0   # вес вариантов без данных о популярности
+INFEASIBLE      = 1e18
+
+NAME_PREFIXES = ("CYRILLIC CAPITAL LETTER ", "CYRILLIC CAPITAL LIGATURE ",
+                 "MODIFIER LETTER CYRILLIC ", "CYRILLIC LETTER ")
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--capacity", type=int, default=CAPACITY, help="Слотов во всплывающем меню одной клавиши")
+    ap.add_argument("--alt-base-cost", type=float, default=ALT_BASE_COST,
+                    help="Доплата за перенос варианта под другую похожую базу (доля тапа)")
+    return ap.parse_args()
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+# ----------------------------- похожие базы -----------------------------
+
+def _name_core(ch: str) -> str:
+    name = unicodedata.name(ch, "")
+    for p in NAME_PREFIXES:
+        if name.startswith(p):
+            name = name[len(p):]
+            break
+    else:
+        return ""
+    return name.split(" WITH ")[0]
+
+RUSSIAN_BY_NAME = {_name_core(ch): ch for ch in RUSSIAN}
+
+def similar_by_form(variant: str) -> Set[str]:
+    """Базы по NFD и по имени Unicode."""
+    out: Set[str] = set()
+    first = unicodedata.normalize("NFD", variant)[:1]
+    if first in RUSSIAN:
+        out.add(first)
+    if len(variant) == 1:
+        for token in _name_core(variant).split():
+            if token in RUSSIAN_BY_NAME:
+                out.add(RUSSIAN_BY_NAME[token])
+    return out
+
+def vendor_bases() -> Dict[str, Set[str]]:
+    """вариант → базы, под которыми его держат вендоры."""
+    out: Dict[str, Set[str]] = {}
+    for p in sorted(glob.glob(MAPPING_GLOB)):
+        for base, alts in load_mapping(Path(p)).items():
+            base = nfc_upper(base)
+            if base not in RUSSIAN: continue
+            for a in alts:
+                if nfc_upper(a):
+                    out.setdefault(nfc_upper(a), set()).add(base)
+    return out
+
+# ----------------------------- венгерский алгоритм -----------------------------
+
+def hungarian(cost: np.ndarray) -> np.ndarray:
+    """
+    Минимальное назначение для прямоугольной матрицы n × m (n ≤ m):
+    возвращает col[i] — столбец строки i. Кратчайшие увеличивающие пути с потенциалами.
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("строк больше, чем столбцов")
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)     # p[j] — строка (1-based) в столбце j, 0 — свободен
+    way = np.zeros(m + 1, dtype=np.int64)
+    C = np.zeros((n + 1, m + 1)); C[1:, 1:] = cost
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            cur = C[i0] - u[i0] - v
+            better = ~used & (cur < minv)
+            minv[better] = cur[better]
+            way[better] = j0
+            free = np.flatnonzero(~used)
+            j1 = free[np.argmin(minv[free])]
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    col = np.empty(n, dtype=np.int64)
+    for j in range(1, m + 1):
+        if p[j]:
+            col[p[j] - 1] = j - 1
+    return col
+
+# ----------------------------- main -----------------------------
+
+def main():
+    args = parse_args()
+    if not MAP_ATOMIC.exists():
+        print(f"ERR: not found {MAP_ATOMIC}"); return
+
+    current: Dict[str, str] = {}
+    for r in _read_csv_flex(MAP_ATOMIC):
+        base, var = nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", ""))
+        if base and var and var not in current:
+            current[var] = base
+    variants = sorted(current)
+
+    weight: Dict[str, float] = {}
+    if SYMBOL_POP.exists():
+        for r in _read_csv_flex(SYMBOL_POP):
+            weight[nfc_upper(r.get("symbol", ""))] = _to_float(r.get("weighted_population"))
+    w = np.array([max(weight.get(v, 0.0), MIN_WEIGHT) for v in variants])
+
+    by_vendor = vendor_bases()
+    allowed: List[Set[str]] = []
+    for v in variants:
+        bases = similar_by_form(v) | by_vendor.get(v, set()) | {current[v]}
+        allowed.append({b for b in bases if b in RUSSIAN})
+
+    # столбцы — (база, слот)
+    cap = max(1, args.capacity)
+    columns = [(b, s) for b in RUSSIAN for s in range(1, cap + 1)]
+    base_idx = np.array([RUSSIAN.index(b) for b, _ in columns])
+    slot = np.array([s for _, s in columns], dtype=np.float64)
+
+    n, m = len(variants), len(columns)
+    ok = np.zeros((n, len(RUSSIAN)), dtype=bool)
+    alt = np.ones((n, len(RUSSIAN)))
+    for i, v in enumerate(variants):
+        for b in allowed[i]:
+            ok[i, RUSSIAN.index(b)] = True
+        alt[i, RUSSIAN.index(current[v])] = 0.0
+    unit = LONG_PRESS_COST + SLOT_COST * (slot - 1)[None, :] + args.alt_base_cost * alt[:, base_idx]
+    cost = np.where(ok[:, base_idx], w[:, None] * unit, INFEASIBLE)
+
+    col = hungarian(cost)
+    if (cost[np.arange(n), col] >= INFEASIBLE).any():
+        tight = {}
+        for i, v in enumerate(variants):
+            if len(allowed[i]) == 1:
+                b = next(iter(allowed[i])); tight[b] = tight.get(b, 0) + 1
+        over = ", ".join(f"{b}={k}" for b, k in sorted(tight.items()) if k > cap)
+        print(f"ERR: no feasible assignment with capacity={cap} (only one base allowed: {over or '—'})"); return
+
+    # текущее размещение в той же модели: по убыванию веса внутри базы
+    cur_cost = 0.0
+    for b in RUSSIAN:
+        group = sorted((i for i, v in enumerate(variants) if current[v] == b), key=lambda i: -w[i])
+        for s, i in enumerate(group, 1):
+            cur_cost += w[i] * (LONG_PRESS_COST + SLOT_COST * (s - 1))
+
+    # слоты внутри базы после решения идут подряд (переносим пустые в конец)
+    placed: Dict[str, List[Tuple[int, int]]] = {}
+    for i, j in enumerate(col):
+        b, s = columns[j]
+        placed.setdefault(b, []).append((s, i))
+    mapping: Dict[str, List[str]] = {}
+    out_rows: List[dict] = []
+    for b in RUSSIAN:
+        if b not in placed: continue
+        group = [i for _, i in sorted(placed[b])]
+        mapping[b] = [variants[i] for i in group]
+        for s, i in enumerate(group, 1):
+            out_rows.append({
+                "base_letter": b,
+                "slot": s,
+                "variant": variants[i],
+                "weight": f"{w[i]:.6f}",
+                "cost": f"{cost[i, col[i]]:.6f}",
+                "current_base": current[variants[i]],
+            })
+
+    OUT_JSON.parent.mkdir(parents=True, exist_ok=True)
+    OUT_JSON.write_text(json.dumps(mapping, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        wr = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
+        wr.writeheader()
+        wr.writerows(out_rows)
+
+    total = float(cost[np.arange(n), col].sum())
+    moved = sum(1 for r in out_rows if r["base_letter"] != r["current_base"])
+    print(f"OK: wrote {OUT_JSON} and {OUT_CSV} (variants={n}, slots={m}, moved={moved})")
+    print(f"   cost: optimal={total:.1f}, current={cur_cost:.1f} ({(total / cur_cost - 1) * 100:+.2f}%)")
+
+if __name__ == "__main__":
+    main()
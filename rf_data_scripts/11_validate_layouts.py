@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# data_scripts/11_validate_layouts.py
+#
+# Проверка и компиляция всех keyboard/*.json (нужен numpy, см. keyboard_layout).
+#
+# Вход:
+#   data/*/*/keyboard/*.json                          — key_default, key_default_wise, *_long_press.json, …
+#   data/<lang>/<vendor>/mapping/<lang>_key_mapping*.json / .txt — варианты, которые должны набираться
+#                                                     (все маппинги вендора, vendor_files.load_mappings)
+#   alphabets.for_language(lang)                      — алфавит языка (реестр: частоты и маппинги вендоров;
+#                                                       Ё и Ъ исключены)
+#
+# Выход:
+#   rf_summaries/layout_validation.csv — file, level, code, message
+#     level info, code overlay_displaced — буквы, которые шаблон (< MIN_FULL_KEYS клавиш) вытеснил
+#     с базовой ЙЦУКЕН при наложении: следствие наложения, а не дефект файла
+#   .cache/layouts/<hash>.json         — скомпилированный индекс (label → row, column, slot)
+#
+# Код возврата 1, если есть ошибки уровня error (схема, дубликаты позиций).
+
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import alphabets
+from keyboard_layout import BASE_LAYOUT, compile_cached, load_layout, validate_layout
+from vendor_files import load_mappings, mapping_paths
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+OUT_CSV  = Path("rf_summaries/layout_validation.csv")
+LAYOUT_GLOB = "data/*/*/keyboard/*.json"
+
+VERBOSE = True
+
+# ИСКЛЮЧАЕМ Ё и Ъ из анализа (в раскладках их может не быть)
+EXCLUDED_LETTERS = {"Ё", "Ъ"}
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def main() -> int:
+    alpha = {lang: a.units - EXCLUDED_LETTERS for lang, a in alphabets.all_alphabets().items()}
+    base = load_layout(BASE_LAYOUT)
+    out_rows: List[dict] = []
+    n_files = n_err = n_warn = n_info = 0
+    t_compile = 0.0
+
+    for p in sorted(glob.glob(LAYOUT_GLOB)):
+        path = Path(p)
+        lang = path.parts[1]
+        n_files += 1
+        mapping = load_mappings(mapping_paths(path.parent.parent / "mapping", lang))
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8")) if path.stat().st_size else {}
+        except ValueError as e:
+            issues = [("error", "bad_json", str(e))]
+        else:
+            issues = validate_layout(obj, sorted(alpha.get(lang, ())), mapping, base=base)
+        if not any(level == "error" for level, _, _ in issues):
+            t0 = time.perf_counter()
+            compile_cached(path, lang, extra_long_press=mapping)
+            t_compile += time.perf_counter() - t0
+        for level, code, msg in issues:
+            out_rows.append({"file": p, "level": level, "code": code, "message": msg})
+            n_err += level == "error"; n_warn += level == "warning"; n_info += level == "info"
+            if level == "error":
+                vprint(f"[{lang}] ERROR {p}: {code} {msg}")
+
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["file", "level", "code", "message"])
+        w.writeheader()
+        w.writerows(out_rows)
+
+    print(f"OK: wrote {OUT_CSV} (files={n_files}, errors={n_err}, warnings={n_warn}, info={n_info})")
+    print(f"   compile (cached)={t_compile * 1000:.1f} ms")
+    return 1 if n_err else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# data_scripts/12_simulate_typing.py
+#
+# Потоковая симуляция набора корпусов raw/<lang>_mono_*.txt на раскладке вендора
+# и на единой клавиатуре РФ (нужен numpy).
+#
+# Вход:
+#   data/<lang>/<vendor>/raw/<lang>_mono_*.txt              — самый большой файл языка
+#   data/<lang>/<vendor>/keyboard/<lang>_key_default.json   — раскладка вендора (vendors.vendor_file)
+#   data/<lang>/<vendor>/mapping/<lang>_key_mapping.json    — доп. long-press того же вендора (vendors.layout_mapping)
+#   data/lang/vendor/keyboard/rf_key_default_wise.json      — единая клавиатура РФ
+#
+# Выход:
+#   rf_summaries/typing_simulation.csv
+#     lang_code, layout, source (vendor | rf_unified), corpus, letters, coverage,
+#     keystrokes_per_letter, longpress_rate, popup_popup_rate, same_key_rate,
+#     travel_per_letter, time_ms_per_letter
+#
+# Корпус читается блоками по CHUNK_CHARS символов и переводится в массив кодовых точек.
+# Для каждой раскладки буквы получают компактные id (лениво, по мере появления) с таблицей:
+# число нажатий, long-press, доплата за слоты, перемещение внутри символа, первая/последняя
+# клавиша и их слоты. Блок — это одна индексация, bincount букв и np.unique соседних пар
+# (код пары prev << 32 | id; копится в словаре только для встретившихся пар, без матрицы N×N),
+# метрики считаются в конце скалярными произведениями со счётчиками.
+#
+# Пары соседних букв (без пробела/знака между ними) дают перемещение между клавишами,
+# повторы одной клавиши и «меню за меню» (обе буквы через long-press).
+# Набор — по кодовым точкам после NFC, upper() (регистр не моделируется) и правил
+# data/normalization_rules.json.
+#
+# Оценка времени (мс) — keyboard_layout.TimingModel, как в 09: внутри символа strokes_ms
+# (переходы между его нажатиями и long-press), между соседними буквами — T[последняя, первая]
+# (повтор клавиши — T[i, i]), буква без набранной предшественницы — FITTS_A_MS.
+
+import glob
+import csv
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import normalization
+from keyboard_layout import FITTS_A_MS, UNIFIED_LAYOUT, CompiledLayout, TimingModel, compile_cached
+import vendors
+from vendor_files import load_mapping
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+OUT_CSV = Path("rf_summaries/typing_simulation.csv")
+RAW_GLOB = "data/{lang}/*/raw/{lang}_mono_*.txt"
+
+EXCLUDED_LANGS = {"lang", "ru", "rus"}
+
+CHUNK_CHARS = 1 << 20
+
+MAX_CP = 0x10000   # BMP; кодовые точки выше сводятся к U+FFFF (не буква)
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def largest_corpus(lang: str) -> Optional[Path]:
+    files = [Path(p) for p in glob.glob(RAW_GLOB.format(lang=lang))]
+    files = [p for p in files if p.stat().st_size > 0]
+    return max(files, key=lambda p: (p.stat().st_size, str(p))) if files else None
+
+def iter_codepoints(path: Path, lang: str):
+    """
+    Блоки кодовых точек (uint32) после NFC, upper() и правил нормализации языка.
+    Блок режется по последнему пробелу (как в 13): хвост слова уходит в следующий блок,
+    чтобы правила последовательностей/контекста (К1 → КӀ) и кластеры не рвались на границе.
+    """
+    norm = normalization.for_language(lang)
+    tail = ""
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(CHUNK_CHARS)
+            text = tail + block
+            if not text:
+                break
+            if block:
+                cut = len(text) - 1
+                while cut > 0 and not text[cut - 1].isspace():
+                    cut -= 1
+                cut = cut or len(text) - 1
+                text, tail = text[:cut], text[cut:]
+            else:
+                tail = ""
+            text = norm.text(text)
+            cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            yield np.minimum(cps, MAX_CP - 1)
+
+class TypingSim:
+    """
+    Накопитель статистики набора одного потока текста на одной раскладке.
+    Буквы получают компактные id (0 — не буква); блок сводится к bincount букв и
+    np.unique кодов соседних пар, а метрики — к скалярным произведениям.
+    """
+
+    def __init__(self, layout: CompiledLayout):
+        self.layout = layout
+        self.D = layout.distances()
+        self.timing = TimingModel(layout)
+        self.known = np.zeros(MAX_CP, dtype=bool)
+        self.cid = np.zeros(MAX_CP, dtype=np.int32)
+        self.chars: List[Optional[list]] = [None]       # id → [n, lp, slots, intra, first, last, first_lp, last_lp, ms]
+        self.counts = np.zeros(1, dtype=np.int64)
+        self.pairs: Dict[int, int] = {}                 # prev << 32 | id → число пар
+        self.carry = 0                                  # id последней позиции предыдущего блока
+
+    def _learn(self, cps: np.ndarray) -> None:
+        new = cps[~self.known[cps]]
+        if not len(new):
+            return
+        for c in np.unique(new).tolist():
+            ch = chr(c)
+            self.known[c] = True
+            if not unicodedata.category(ch).startswith(("L", "M")):
+                continue
+            self.cid[c] = len(self.chars)
+            seq = self.layout.strokes(ch)
+            if not seq:
+                self.chars.append(None)
+                continue
+            self.chars.append([
+                len(seq),
+                sum(1 for _, s in seq if s > 0),
+                sum(s - 1 for _, s in seq if s > 0),
+                sum(self.D[a[0], b[0]] for a, b in zip(seq, seq[1:])),
+                seq[0][0], seq[-1][0], seq[0][1] > 0, seq[-1][1] > 0,
+                self.timing.strokes_ms(seq),
+            ])
+        N = len(self.chars)
+        if N > len(self.counts):
+            counts = np.zeros(N, dtype=np.int64); counts[:len(self.counts)] = self.counts
+            self.counts = counts
+
+    def feed(self, cps: np.ndarray) -> None:
+        if not len(cps):
+            return
+        self._learn(cps)
+        N = len(self.chars)
+        ids = self.cid[cps]
+        self.counts += np.bincount(ids, minlength=N)
+        prev = np.concatenate(([self.carry], ids[:-1])).astype(np.int64)
+        both = (prev > 0) & (ids > 0)
+        codes, n = np.unique((prev[both] << 32) | ids[both], return_counts=True)
+        for code, k in zip(codes.tolist(), n.tolist()):
+            self.pairs[code] = self.pairs.get(code, 0) + k
+        self.carry = int(ids[-1])
+
+    def totals(self) -> dict:
+        N = len(self.chars)
+        ok = np.array([c is not None for c in self.chars])
+        col = lambda j: np.array([c[j] if c is not None else 0 for c in self.chars], dtype=np.float64)
+        n, lp, slots, intra, ms = col(0), col(1), col(2), col(3), col(8)
+        first, last = col(4).astype(np.int64), col(5).astype(np.int64)
+        first_lp, last_lp = col(6) > 0, col(7) > 0
+        cnt = self.counts[:N].astype(np.float64)
+        codes = np.fromiter(self.pairs.keys(), dtype=np.int64, count=len(self.pairs))
+        k = np.fromiter(self.pairs.values(), dtype=np.int64, count=len(self.pairs))
+        src, dst = codes >> 32, codes & 0xFFFFFFFF
+        keep = ok[src] & ok[dst]
+        src, dst, k = src[keep], dst[keep], k[keep]
+        a, b = last[src], first[dst]                    # клавиши перехода между буквами пары
+        n_pairs = int(k.sum())
+        return dict(
+            letters=int(cnt[1:].sum()), typed=int(cnt @ ok), keystrokes=cnt @ n,
+            longpresses=cnt @ lp, slot_steps=cnt @ slots,
+            travel=cnt @ intra + float(k @ self.D[a, b]),
+            pairs=n_pairs,
+            same_key=int(k[a == b].sum()),
+            popup_popup=int(k[last_lp[src] & first_lp[dst]].sum()),
+            time_ms=cnt @ ms + float(k @ self.timing.T[a, b]) + FITTS_A_MS * (int(cnt @ ok) - n_pairs),
+        )
+
+    def report(self) -> dict:
+        t = self.totals()
+        typed = t["typed"] or 1
+        return {
+            "letters": t["letters"],
+            "coverage": f"{t['typed'] / (t['letters'] or 1):.6f}",
+            "keystrokes_per_letter": f"{t['keystrokes'] / typed:.6f}",
+            "longpress_rate": f"{t['longpresses'] / typed:.6f}",
+            "popup_popup_rate": f"{t['popup_popup'] / (t['pairs'] or 1):.6f}",
+            "same_key_rate": f"{t['same_key'] / (t['pairs'] or 1):.6f}",
+            "travel_per_letter": f"{t['travel'] / typed:.6f}",
+            "time_ms_per_letter": f"{t['time_ms'] / typed:.3f}",
+        }
+
+def main():
+    langs = sorted({Path(p).parts[1] for p in glob.glob("data/*/*/raw/*_mono_*.txt")} - EXCLUDED_LANGS)
+    unified = compile_cached(UNIFIED_LAYOUT, "rf_unified")
+    unified_name = str(UNIFIED_LAYOUT.relative_to(ROOT))
+
+    out_rows: List[dict] = []
+    total_bytes = 0
+    t0 = time.perf_counter()
+    for lang in langs:
+        corpus = largest_corpus(lang)
+        if corpus is None:
+            continue
+        sims = [("rf_unified", unified_name, TypingSim(unified))]
+        kb = vendors.vendor_file(lang, f"keyboard/{lang}_key_default.json")
+        if kb is not None:
+            extra = load_mapping(vendors.layout_mapping(lang, kb))
+            try:
+                sims.insert(0, ("vendor", str(kb), TypingSim(compile_cached(kb, lang, extra_long_press=extra))))
+            except Exception as e:
+                vprint(f"[{lang}] ошибка раскладки {kb}: {e}")
+
+        for cps in iter_codepoints(corpus, lang):
+            for _, _, sim in sims:
+                sim.feed(cps)
+        total_bytes += corpus.stat().st_size
+
+        for source, name, sim in sims:
+            out_rows.append({"lang_code": lang, "layout": name, "source": source,
+                             "corpus": str(corpus), **sim.report()})
+    elapsed = time.perf_counter() - t0
+
+    if not out_rows:
+        print("ERR: no corpora found"); return
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
+        w.writeheader()
+        w.writerows(out_rows)
+
+    rate = total_bytes / elapsed / 1e6 if elapsed > 0 else float("inf")
+    print(f"OK: wrote {OUT_CSV} (rows={len(out_rows)}, corpora={total_bytes / 1e6:.2f} MB, {rate:.1f} MB/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# data_scripts/13_check_coverage.py
+#
+# Покрытие корпуса раскладкой: какие символы корпуса нельзя набрать (нужен numpy).
+#
+# Вход:
+#   data/<lang>/*/raw/<lang>_mono_*.txt                      — все корпуса языка
+#   data/<lang>/<vendor>/keyboard/<lang>_key_default.json    — раскладка (vendors.vendor_file; иначе базовая ЙЦУКЕН)
+#   data/<lang>/<vendor>/mapping/<lang>_key_mapping.json     — доп. long-press того же вендора
+#
+# Выход:
+#   rf_summaries/coverage_report.csv
+#     lang_code, layout, corpus_files, units, distinct, coverage, unreachable_units,
+#     distinct_unreachable, top_unreachable ("Ӏ U+04C0 ×123; …", до TOP_N штук), latin_units,
+#     outside_alphabet_units — единицы, чья первая кодовая точка не входит в алфавит языка
+#                              (alphabets.for_language, векторная проверка по битовой карте)
+#
+# Единица — буква или графемный кластер UAX #29 с буквой во главе (категории L*/M*), после NFC,
+# upper() и правил data/normalization_rules.json (normalization.for_language); цифры, пробелы и пунктуация не учитываются. Латиница (имя Unicode LATIN …)
+# набирается на другой раскладке: в покрытие не входит, считается отдельно в latin_units.
+# Кластеры из нескольких кодовых точек выдаёт segmentation.complex_clusters (автомат
+# проходит только по участкам с не-ASCII/не-кириллическими символами), остальное
+# считается по кодовым точкам через np.unique на блоке (только встретившиеся кодовые точки).
+#
+# Кэш: .cache/coverage/index.json — счётчики единиц каждого корпуса с подписью
+# (mtime_ns, size, подпись правил нормализации языка, версия Unicode и GCB_VERSION сегментатора,
+# COUNT_VERSION правил подсчёта); пересчитываются только изменившиеся файлы, записи удалённых
+# корпусов выбрасываются при сохранении.
+
+import csv
+import glob
+import json
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+import alphabets
+import normalization
+from keyboard_layout import BASE_LAYOUT, compile_cached
+import vendors
+from vendor_files import load_mapping
+from segmentation import GCB_VERSION, complex_clusters
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+OUT_CSV = Path("rf_summaries/coverage_report.csv")
+CACHE_INDEX = Path(".cache/coverage/index.json")
+RAW_GLOB = "data/{lang}/*/raw/{lang}_mono_*.txt"
+
+EXCLUDED_LANGS = {"lang", "ru", "rus"}
+
+CHUNK_CHARS = 1 << 20
+TOP_N = 10
+COUNT_VERSION = 1   # менять при изменении _is_unit / count_units
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def _is_unit(u: str) -> bool:
+    return unicodedata.category(u[0]).startswith(("L", "M"))
+
+def count_units(path: Path, lang: str) -> Dict[str, int]:
+    """Потоково: счётчики букв/кластеров корпуса (после правил нормализации языка)."""
+    norm = normalization.for_language(lang)
+    cps: Dict[int, int] = {}
+    clusters: Dict[str, int] = {}
+    tail = ""
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        while True:
+            block = f.read(CHUNK_CHARS)
+            text = tail + block
+            if not text:
+                break
+            if block:
+                # последний кластер может продолжиться в следующем блоке
+                cut = len(text) - 1
+                while cut > 0 and not text[cut - 1].isspace():
+                    cut -= 1
+                cut = cut or len(text) - 1
+                text, tail = text[:cut], text[cut:]
+            else:
+                tail = ""
+            text = norm.text(text)
+            arr = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            codes, n = np.unique(arr, return_counts=True)
+            for c, k in zip(codes.tolist(), n.tolist()):
+                cps[c] = cps.get(c, 0) + k
+            for m in complex_clusters(text):
+                clusters[m] = clusters.get(m, 0) + 1
+                for ch in m:                       # кластер считается одной единицей
+                    cps[ord(ch)] -= 1
+            if not block:
+                break
+
+    out: Dict[str, int] = {}
+    for c, k in sorted(cps.items()):
+        ch = chr(c)
+        if k and _is_unit(ch):
+            out[ch] = k
+    for m, k in clusters.items():
+        if _is_unit(m):
+            out[m] = out.get(m, 0) + k
+    return out
+
+def load_cache() -> Dict[str, dict]:
+    try:
+        return json.loads(CACHE_INDEX.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_cache(cache: Dict[str, dict]) -> None:
+    cache = {p: v for p, v in cache.items() if Path(p).exists()}
+    CACHE_INDEX.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_INDEX.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(cache, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, CACHE_INDEX)
+
+def corpus_units(path: Path, lang: str, cache: Dict[str, dict]) -> Dict[str, int]:
+    st = path.stat()
+    sig = [st.st_mtime_ns, st.st_size, normalization.for_language(lang).signature,
+           unicodedata.unidata_version, GCB_VERSION, COUNT_VERSION]
+    hit = cache.get(str(path))
+    if hit and hit.get("sig") == sig:
+        return hit["units"]
+    units = count_units(path, lang)
+    cache[str(path)] = {"sig": sig, "units": units}
+    return units
+
+def _fmt_unit(u: str, k: int) -> str:
+    codes = " ".join(f"U+{ord(ch):04X}" for ch in u)
+    return f"{u} {codes} ×{k}"
+
+def main():
+    langs = sorted({Path(p).parts[1] for p in glob.glob("data/*/*/raw/*_mono_*.txt")} - EXCLUDED_LANGS)
+    cache = load_cache()
+    t0 = time.perf_counter()
+    n_scanned = sum(1 for _ in cache)
+
+    out_rows: List[dict] = []
+    for lang in langs:
+        files = sorted(Path(p) for p in glob.glob(RAW_GLOB.format(lang=lang)))
+        totals: Dict[str, int] = {}
+        for p in files:
+            for u, k in corpus_units(p, lang, cache).items():
+                totals[u] = totals.get(u, 0) + k
+        if not totals:
+            continue
+
+        kb = vendors.vendor_file(lang, f"keyboard/{lang}_key_default.json") or BASE_LAYOUT.relative_to(ROOT)
+        extra = load_mapping(vendors.layout_mapping(lang, kb))
+        try:
+            layout = compile_cached(kb, lang, extra_long_press=extra)
+        except Exception as e:
+            vprint(f"[{lang}] ошибка раскладки {kb}: {e}")
+            continue
+
+        latin = sum(k for u, k in totals.items() if unicodedata.name(u[0], "").startswith("LATIN"))
+        totals = {u: k for u, k in totals.items() if not unicodedata.name(u[0], "").startswith("LATIN")}
+        unreachable = {u: k for u, k in totals.items() if layout.strokes(u) is None}
+        keys = list(totals)
+        inside = alphabets.for_language(lang).contains(
+            np.fromiter((ord(u[0]) for u in keys), dtype=np.int64, count=len(keys)))
+        outside = sum(totals[u] for u, ok in zip(keys, inside.tolist()) if not ok)
+        units = sum(totals.values())
+        lost = sum(unreachable.values())
+        top = sorted(unreachable.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_N]
+        out_rows.append({
+            "lang_code": lang,
+            "layout": str(kb),
+            "corpus_files": len(files),
+            "units": units,
+            "distinct": len(totals),
+            "coverage": f"{1 - lost / units:.6f}" if units else "",
+            "unreachable_units": lost,
+            "distinct_unreachable": len(unreachable),
+            "top_unreachable": "; ".join(_fmt_unit(u, k) for u, k in top),
+            "latin_units": latin,
+            "outside_alphabet_units": outside,
+        })
+
+    save_cache(cache)
+    if not out_rows:
+        print("ERR: no corpora found"); return
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
+        w.writeheader()
+        w.writerows(out_rows)
+
+    below = sum(1 for r in out_rows if r["coverage"] and float(r["coverage"]) < 1.0)
+    print(f"OK: wrote {OUT_CSV} (languages={len(out_rows)}, with unreachable characters={below})")
+    print(f"   corpora cached before run={n_scanned}, elapsed={time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# data_scripts/14_export_keyboard_bundles.py
+#
+# Экспорт готовых к загрузке описаний клавиатур для всех языков (нужен numpy, см. keyboard_layout).
+#
+# Вход:
+#   data/<lang>/<vendor>/keyboard/<lang>_key_default.json   — раскладка (неполные — поверх базовой ЙЦУКЕН)
+#   data/<lang>/<vendor>/mapping/<lang>_key_mapping*.json / .txt — доп. long-press: все маппинги вендора
+#                                                             (vendor_files.MAPPING_SUFFIXES), в хэше входов
+#   rf_summaries/variant_mapping_stats.csv                  — порядок вариантов внутри базы
+#   data/lang/vendor/keyboard/rf_key_default_wise.json      — единая клавиатура РФ
+#   rf_summaries/variant_mapping_priorities_apple.csv       — long-press единой клавиатуры
+#
+# Выход (rf_results/bundles/<lang>/<vendor>/, для единой — rf_results/bundles/rf_unified/):
+#   keyboard.json   — iOS-стиль: ряды клавиш с alternates
+#   keyboard.plist  — то же в plist (plistlib)
+#   keyboard.xml    — Android-стиль: <Keyboard><Row><Key android:codes … android:popupCharacters>
+#                     (popupCharacters — по одному символу, поэтому составные варианты вроде Е̄
+#                      остаются только в JSON/plist)
+#   rf_results/bundles/manifest.json — хэш входов каждого бандла
+#
+# Альтернативы клавиши: сначала по рангу из variant_mapping_stats.csv (порядок строк внутри
+# base_letter), затем остальные в исходном порядке.
+# Бандлы собираются параллельно (ProcessPoolExecutor); бандл с тем же хэшем входов
+# и на месте лежащими файлами пропускается.
+
+import csv
+import glob
+import hashlib
+import json
+import os
+import plistlib
+import re
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from keyboard_layout import BASE_LAYOUT, UNIFIED_LAYOUT, CompiledLayout, compile_cached
+from vendor_files import load_mappings, mapping_paths
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+STATS_CSV = Path("rf_summaries/variant_mapping_stats.csv")
+APPLE_CSV = Path("rf_summaries/variant_mapping_priorities_apple.csv")
+OUT_DIR   = Path("rf_results/bundles")
+MANIFEST  = OUT_DIR / "manifest.json"
+
+EXPORT_VERSION = 1  # менять при изменении формата бандлов
+OUTPUTS = ("keyboard.json", "keyboard.plist", "keyboard.xml")
+ANDROID_NS = "http://schemas.android.com/apk/res/android"
+
+EXCLUDED_LANGS = {"lang", "ru", "rus"}
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def stats_ranks() -> Dict[Tuple[str, str], int]:
+    ranks: Dict[Tuple[str, str], int] = {}
+    per_base: Dict[str, int] = {}
+    for r in _read_csv_flex(STATS_CSV):
+        base, var = nfc_upper(r.get("base_letter", "")), nfc_upper(r.get("variant", ""))
+        if base and var:
+            per_base[base] = per_base.get(base, 0) + 1
+            ranks[(base, var)] = per_base[base]
+    return ranks
+
+PRIORITY_RE = re.compile(r"^(.*?)\s*\([^)]*\)\s*$")
+
+def apple_priorities() -> Dict[str, List[str]]:
+    """«А (9.9%)» → [«Ӕ», «Ӑ», …] из variant_mapping_priorities_apple.csv."""
+    out: Dict[str, List[str]] = {}
+    if not APPLE_CSV.exists():
+        return out
+    with APPLE_CSV.open("r", encoding="utf-8") as f:  # ';' внутри priorities — разделитель всегда ','
+        rows = list(csv.DictReader(f))
+    for r in rows:
+        m = PRIORITY_RE.match(r.get("base_letter", "") or "")
+        base = nfc_upper(m.group(1) if m else r.get("base_letter", ""))
+        alts = []
+        for item in (r.get("priorities") or "").split(";"):
+            m = PRIORITY_RE.match(item.strip())
+            v = nfc_upper(m.group(1) if m else item)
+            if v: alts.append(v)
+        if base:
+            out[base] = alts
+    return out
+
+def _inputs_hash(paths: List[Optional[Path]]) -> str:
+    h = hashlib.sha256(f"v{EXPORT_VERSION}".encode("ascii"))
+    for p in paths:
+        h.update(b"\0")
+        if p is not None and Path(p).exists():
+            h.update(Path(p).read_bytes())
+    return h.hexdigest()
+
+# ----------------------------- форматы -----------------------------
+
+def _rows(layout: CompiledLayout, ranks: Dict[Tuple[str, str], int]) -> List[List[dict]]:
+    rows: Dict[int, List[dict]] = {}
+    for k, lab in enumerate(layout.labels):
+        alts = layout.popups.get(k, [])
+        order = sorted(range(len(alts)), key=lambda i: (ranks.get((lab, alts[i]), len(ranks) + 1), i))
+        rows.setdefault(int(layout.rows[k]), []).append(
+            {"label": lab, "column": int(layout.cols[k]), "alternates": [alts[i] for i in order]})
+    return [rows[r] for r in sorted(rows)]
+
+def ios_bundle(name: str, vendor: str, locale: str, rows: List[List[dict]]) -> dict:
+    return {
+        "version": "1.0",
+        "layout_name": name,
+        "vendor": vendor,
+        "locale": locale,
+        "rows": [[{"label": k["label"], "alternates": k["alternates"]} for k in row] for row in rows],
+    }
+
+def android_xml(rows: List[List[dict]]) -> bytes:
+    ET.register_namespace("android", ANDROID_NS)
+    a = lambda attr: f"{{{ANDROID_NS}}}{attr}"
+    width = max(len(r) for r in rows) if rows else 1
+    kb = ET.Element("Keyboard", {a("keyWidth"): f"{100 / width:.2f}%p", a("keyHeight"): "52dp",
+                                 a("horizontalGap"): "0px", a("verticalGap"): "0px"})
+    for row in rows:
+        el = ET.SubElement(kb, "Row")
+        for i, key in enumerate(row):
+            low = key["label"].lower()
+            attrs = {a("keyLabel"): low}
+            if len(low) == 1:
+                attrs[a("codes")] = str(ord(low))
+            else:
+                attrs[a("keyOutputText")] = low
+            popup = [x.lower() for x in key["alternates"] if len(x) == 1]
+            if popup:
+                attrs[a("popupCharacters")] = "".join(popup)
+                attrs[a("popupKeyboard")] = "@xml/popup_template"
+            if i == 0:
+                attrs[a("keyEdgeFlags")] = "left"
+            elif i == len(row) - 1:
+                attrs[a("keyEdgeFlags")] = "right"
+            ET.SubElement(el, "Key", attrs)
+    ET.indent(kb)
+    return ET.tostring(kb, encoding="utf-8", xml_declaration=True) + b"\n"
+
+def export_bundle(job: dict) -> Tuple[str, str]:
+    """Один бандл (выполняется в отдельном процессе). → (id, статус)."""
+    extra = dict(job["extra"])
+    layout = compile_cached(Path(job["layout"]), job["locale"], extra_long_press=extra)
+    ranks = {tuple(k.split("\t")): v for k, v in job["ranks"].items()}
+    rows = _rows(layout, ranks)
+    out = Path(job["out_dir"])
+    out.mkdir(parents=True, exist_ok=True)
+    bundle = ios_bundle(job["name"], job["vendor"], job["locale"], rows)
+    (out / "keyboard.json").write_text(json.dumps(bundle, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    (out / "keyboard.plist").write_bytes(plistlib.dumps(bundle))
+    (out / "keyboard.xml").write_bytes(android_xml(rows))
+    return job["id"], "written"
+
+# ----------------------------- main -----------------------------
+
+def main():
+    ranks = stats_ranks()
+    ranks_payload = {f"{b}\t{v}": r for (b, v), r in ranks.items()}
+    jobs: List[dict] = []
+
+    for p in sorted(glob.glob("data/*/*/keyboard/*_key_default.json")):
+        path = Path(p)
+        lang, vendor = path.parts[1], path.parts[2]
+        if lang in EXCLUDED_LANGS or path.name != f"{lang}_key_default.json": continue
+        mappings = mapping_paths(path.parent.parent / "mapping", lang)
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8")) if path.stat().st_size else {}
+        except ValueError as e:
+            vprint(f"[{lang}] ошибка JSON {path}: {e}")
+            continue
+        jobs.append({
+            "id": f"{lang}/{vendor}",
+            "layout": str(path),
+            "extra": load_mappings(mappings),
+            "ranks": ranks_payload,
+            "locale": lang,
+            "name": str(obj.get("layout_name") or lang) if isinstance(obj, dict) else lang,
+            "vendor": str(obj.get("vendor") or vendor) if isinstance(obj, dict) else vendor,
+            "out_dir": str(OUT_DIR / lang / vendor),
+            "hash": _inputs_hash([path, *mappings, BASE_LAYOUT, STATS_CSV]),
+        })
+
+    # единая клавиатура РФ: long-press и их порядок — из priorities_apple
+    unified = json.loads(UNIFIED_LAYOUT.read_text(encoding="utf-8"))
+    apple = apple_priorities()
+    jobs.append({
+        "id": "rf_unified",
+        "layout": str(UNIFIED_LAYOUT),
+        "extra": apple,
+        "ranks": {f"{b}\t{v}": i for b, alts in apple.items() for i, v in enumerate(alts, 1)},
+        "locale": "ru-RF",
+        "name": str(unified.get("layout_name") or "Russian Federation"),
+        "vendor": str(unified.get("vendor") or ""),
+        "out_dir": str(OUT_DIR / "rf_unified"),
+        "hash": _inputs_hash([UNIFIED_LAYOUT, BASE_LAYOUT, APPLE_CSV]),
+    })
+
+    try:
+        manifest = json.loads(MANIFEST.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    todo = [j for j in jobs
+            if manifest.get(j["id"]) != j["hash"]
+            or not all((Path(j["out_dir"]) / f).exists() for f in OUTPUTS)]
+
+    t0 = time.perf_counter()
+    failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(len(todo), os.cpu_count() or 1)) as ex:
+            futures = {j["id"]: ex.submit(export_bundle, j) for j in todo}
+            for j in todo:
+                try:
+                    futures[j["id"]].result()
+                    manifest[j["id"]] = j["hash"]
+                except Exception as e:
+                    failed += 1
+                    manifest.pop(j["id"], None)
+                    vprint(f"[{j['id']}] ошибка экспорта: {e}")
+
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+    MANIFEST.write_text(json.dumps(dict(sorted(manifest.items())), ensure_ascii=False, indent=2) + "\n",
+                        encoding="utf-8")
+    print(f"OK: bundles in {OUT_DIR} (total={len(jobs)}, rebuilt={len(todo) - failed}, "
+          f"skipped={len(jobs) - len(todo)}, failed={failed}) in {time.perf_counter() - t0:.2f}s")
+
+if __name__ == "__main__":
+    main()
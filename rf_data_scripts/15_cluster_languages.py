@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+# data_scripts/15_cluster_languages.py
+#
+# Кластеризация языков по частотам букв и цена общей раскладки на кластер (нужен numpy).
+#
+# Вход:
+#   rf_summaries/frequencies_by_language.csv
+#   data/lang/vendor/keyboard/rf_key_default_wise.json   — единая клавиатура РФ (набор клавиш и long-press)
+#   data/<lang>/*/frequencies/*bigram*.csv               — если есть (bigram,frequency)
+#
+# Выход:
+#   rf_summaries/language_distances.csv — lang_a, lang_b, cosine, jensen_shannon
+#   rf_summaries/language_linkage.csv   — step, cluster_a, cluster_b, distance, size (порядок слияний)
+#   rf_summaries/language_clusters.csv
+#     cluster, lang_code, cluster_size, own_cost, shared_cost, penalty, penalty_pct
+#
+# Вектор языка — доли вариантов на объединённом алфавите (строки P[L, V], сумма 1).
+# Расстояния считаются сразу матрицей L × L:
+#   cosine         = 1 − p̂ᵢ·p̂ⱼ (p̂ — нормированные на длину строки);
+#   jensen_shannon = √JS(pᵢ, pⱼ) в битах, JS = H(m) − (H(pᵢ) + H(pⱼ))/2, m = (pᵢ + pⱼ)/2 —
+#                    одной операцией над тензором L × L × V.
+# Иерархическая кластеризация — агломеративная со средней связью (UPGMA), без scipy:
+# на каждом шаге сливаются два ближайших кластера, строка расстояний нового кластера —
+# взвешенное по размерам среднее строк слитых. Дерево режется по --max-distance.
+#
+# Цена общей раскладки: клавиши единой клавиатуры переставляются отжигом
+# (optimize_layout.anneal, та же цель f в «тапах» на букву). Для языка l — своя лучшая
+# перестановка pₗ; для кластера — одна перестановка p_C по средней цели его языков
+# (цель линейна по потокам, поэтому средняя задача — это средние a и u).
+#   penalty(l) = fₗ(p_C) − fₗ(pₗ) ≥ 0 (с точностью до качества отжига).
+
+import argparse
+import csv
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from keyboard_layout import BASE_LAYOUT, UNIFIED_LAYOUT, compile_layout, load_layout
+from optimize_layout import SwapProblem, anneal, build_problem, free_keys, language_bigrams
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+FREQ_CSV     = Path("rf_summaries/frequencies_by_language.csv")
+OUT_DIST     = Path("rf_summaries/language_distances.csv")
+OUT_LINKAGE  = Path("rf_summaries/language_linkage.csv")
+OUT_CLUSTERS = Path("rf_summaries/language_clusters.csv")
+
+EXCLUDED_LANGS = {"lang", "ru", "rus"}
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--metric", choices=["jensen_shannon", "cosine"], default="jensen_shannon",
+                    help="Расстояние для кластеризации")
+    ap.add_argument("--max-distance", type=float, default=0.35,
+                    help="Порог среднего расстояния, до которого кластеры сливаются")
+    ap.add_argument("--iters", type=int, default=200_000, help="Кандидатов-обменов отжига на одну задачу")
+    ap.add_argument("--t0", type=float, default=0.01)
+    ap.add_argument("--t1", type=float, default=1e-5)
+    ap.add_argument("--pin-russian", action="store_true", help="Не двигать буквы русского алфавита")
+    ap.add_argument("--seed", type=int, default=0)
+    return ap.parse_args()
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+# ----------------------------- расстояния -----------------------------
+
+def cosine_distances(P: np.ndarray) -> np.ndarray:
+    N = P / np.linalg.norm(P, axis=1, keepdims=True)
+    D = 1.0 - N @ N.T
+    np.fill_diagonal(D, 0.0)
+    return np.clip(D, 0.0, None)
+
+def _entropy(X: np.ndarray) -> np.ndarray:
+    """H по последней оси, в битах (0·log 0 = 0)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -np.where(X > 0, X * np.log2(X), 0.0).sum(axis=-1)
+
+def jensen_shannon_distances(P: np.ndarray) -> np.ndarray:
+    M = (P[:, None, :] + P[None, :, :]) / 2.0          # L × L × V
+    H = _entropy(P)
+    JS = _entropy(M) - (H[:, None] + H[None, :]) / 2.0
+    np.fill_diagonal(JS, 0.0)
+    return np.sqrt(np.clip(JS, 0.0, None))
+
+# ----------------------------- кластеризация -----------------------------
+
+def average_linkage(D: np.ndarray) -> List[Tuple[int, int, float, int]]:
+    """
+    UPGMA: список слияний (a, b, расстояние, размер), как в scipy.cluster.hierarchy.linkage —
+    исходные объекты 0..n−1, кластер слияния k получает номер n + k.
+    """
+    n = len(D)
+    D = D.astype(np.float64).copy()
+    np.fill_diagonal(D, np.inf)
+    alive = np.ones(n, dtype=bool)
+    ids = list(range(n))
+    size = np.ones(n)
+    merges: List[Tuple[int, int, float, int]] = []
+    for k in range(n - 1):
+        masked = np.where(alive[:, None] & alive[None, :], D, np.inf)
+        i, j = divmod(int(np.argmin(masked)), n)
+        if i > j: i, j = j, i
+        d = float(D[i, j])
+        merges.append((ids[i], ids[j], d, int(size[i] + size[j])))
+        row = (size[i] * D[i] + size[j] * D[j]) / (size[i] + size[j])
+        D[i, :] = row; D[:, i] = row; D[i, i] = np.inf
+        alive[j] = False
+        size[i] += size[j]
+        ids[i] = n + k
+    return merges
+
+def cut_tree(merges: List[Tuple[int, int, float, int]], n: int, max_distance: float) -> np.ndarray:
+    """Номер кластера каждого объекта после слияний с расстоянием ≤ max_distance."""
+    members: Dict[int, List[int]] = {i: [i] for i in range(n)}
+    for k, (a, b, d, _) in enumerate(merges):
+        if d > max_distance:
+            break
+        members[n + k] = members.pop(a) + members.pop(b)
+    labels = np.empty(n, dtype=np.int64)
+    groups = sorted(members.values(), key=lambda g: (-len(g), min(g)))
+    for c, g in enumerate(groups, 1):
+        labels[g] = c
+    return labels
+
+# ----------------------------- цена общей раскладки -----------------------------
+
+def optimise(prob: SwapProblem, free: np.ndarray, args, seed: int) -> np.ndarray:
+    return anneal(prob, free, args.iters, args.t0, args.t1, np.random.default_rng([args.seed, seed]))
+
+def main():
+    args = parse_args()
+    if not FREQ_CSV.exists():
+        print(f"ERR: not found {FREQ_CSV}"); return
+
+    cells: Dict[str, Dict[str, float]] = {}
+    for r in _read_csv_flex(FREQ_CSV):
+        lang, var = (r.get("lang_code") or "").strip(), nfc_upper(r.get("variant", ""))
+        c = _to_float(r.get("C_i"))
+        if lang and var and c > 0 and lang not in EXCLUDED_LANGS:
+            cells.setdefault(lang, {})[var] = cells.get(lang, {}).get(var, 0.0) + c
+    langs = sorted(cells)
+    alphabet = sorted({v for d in cells.values() for v in d})
+    col = {v: j for j, v in enumerate(alphabet)}
+    P = np.zeros((len(langs), len(alphabet)))
+    for i, lang in enumerate(langs):
+        for var, c in cells[lang].items():
+            P[i, col[var]] = c
+    P /= P.sum(axis=1, keepdims=True)
+
+    t0 = time.perf_counter()
+    dist = {"cosine": cosine_distances(P), "jensen_shannon": jensen_shannon_distances(P)}
+    t_dist = time.perf_counter() - t0
+    merges = average_linkage(dist[args.metric])
+    labels = cut_tree(merges, len(langs), args.max_distance)
+
+    # цены: своя перестановка на язык, общая — на кластер
+    layout = compile_layout(load_layout(UNIFIED_LAYOUT), "rf_unified", base=load_layout(BASE_LAYOUT))
+    free = free_keys(layout, "", args.pin_russian)
+    probs = [build_problem(layout, cells[lang], language_bigrams(lang)) for lang in langs]
+    t0 = time.perf_counter()
+    own = np.array([p.objective(optimise(p, free, args, i)) for i, p in enumerate(probs)])
+    shared = np.empty(len(langs))
+    for c in np.unique(labels).tolist():
+        idx = np.flatnonzero(labels == c)
+        if len(idx) == 1:
+            shared[idx] = own[idx]
+            continue
+        mix = SwapProblem(np.mean([probs[i].a for i in idx], axis=0), probs[0].b,
+                          np.mean([probs[i].u for i in idx], axis=0), probs[0].c)
+        p_c = optimise(mix, free, args, len(langs) + c)
+        shared[idx] = [probs[i].objective(p_c) for i in idx]
+    t_anneal = time.perf_counter() - t0
+
+    OUT_DIST.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_DIST.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["lang_a", "lang_b", "cosine", "jensen_shannon"])
+        for i in range(len(langs)):
+            for j in range(i + 1, len(langs)):
+                w.writerow([langs[i], langs[j], f"{dist['cosine'][i, j]:.6f}",
+                            f"{dist['jensen_shannon'][i, j]:.6f}"])
+
+    name = lambda k: langs[k] if k < len(langs) else f"#{k - len(langs) + 1}"
+    with OUT_LINKAGE.open("w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["step", "cluster_a", "cluster_b", "distance", "size"])
+        for k, (a, b, d, s) in enumerate(merges, 1):
+            w.writerow([k, name(a), name(b), f"{d:.6f}", s])
+
+    out_rows: List[dict] = []
+    for i in sorted(range(len(langs)), key=lambda i: (labels[i], langs[i])):
+        penalty = shared[i] - own[i]
+        out_rows.append({
+            "cluster": int(labels[i]),
+            "lang_code": langs[i],
+            "cluster_size": int((labels == labels[i]).sum()),
+            "own_cost": f"{own[i]:.6f}",
+            "shared_cost": f"{shared[i]:.6f}",
+            "penalty": f"{penalty:.6f}",
+            "penalty_pct": f"{penalty / own[i] * 100:.3f}" if own[i] > 0 else "",
+        })
+    with OUT_CLUSTERS.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(out_rows[0].keys()))
+        w.writeheader()
+        w.writerows(out_rows)
+
+    n_clusters = len(np.unique(labels))
+    print(f"OK: wrote {OUT_DIST}, {OUT_LINKAGE} and {OUT_CLUSTERS} "
+          f"(languages={len(langs)}, alphabet={len(alphabet)}, clusters={n_clusters})")
+    for c in range(1, n_clusters + 1):
+        idx = np.flatnonzero(labels == c)
+        if len(idx) > 1:
+            vprint(f"   #{c}: {' '.join(langs[i] for i in idx)} — "
+                   f"mean penalty {np.mean(shared[idx] - own[idx]):.4f} "
+                   f"({np.mean((shared[idx] - own[idx]) / own[idx]) * 100:+.2f}%)")
+    print(f"   distances={t_dist * 1000:.1f} ms, anneal={t_anneal:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+# data_scripts/16_lint_mappings.py
+#
+# Линтер маппингов: каждый файл mapping/ сверяется с частотами, алфавитом и правилами
+# нормализации языка, плюс перекрёстные проверки по всем языкам (нужен numpy).
+#
+# Вход:
+#   data/<lang>/<vendor>/mapping/*_key_mapping*        — JSON (tolerant_json) и TXT, как в 03
+#   data/<lang>/*/frequencies/*.csv                    — частоты всех вендоров языка (C_i > 0)
+#   alphabets.for_language(lang)                       — алфавит языка (битовая карта кодовых точек)
+#   data/normalization_rules.json                      — normalization.for_language(lang)
+#
+# Выход:
+#   rf_summaries/mapping_lint.csv — file, level, code, lang_code, base, variant, message
+#
+# Проверки (уровень, код):
+#   error   bad_json            файл не разбирается
+#   warning json_repaired       tolerant_json починил файл (комментарии, висячие запятые, BOM)
+#   error   latin_lookalike     латинская буква вместо кириллической (после правил латиницы нет: «C’»)
+#   error   latin               латиница остаётся и после правил
+#   warning not_normalised      запись меняется правилами нормализации (I → Ӏ, К1 → КӀ, Аᴴ → Аᵸ)
+#   warning excluded_letter     Ё или Ъ в маппинге (стадии их отбрасывают)
+#   warning base_not_russian    база — не буква русского алфавита
+#   warning variant_is_base     вариант совпадает с базой
+#   error   duplicate_variant   один вариант под разными базами у одного вендора (по всем его файлам)
+#   warning repeated_variant    вариант повторяется под той же базой
+#   warning not_in_frequencies  вариант (после collapse_variants) не встречается в частотах языка, и
+#                               не все его кодовые точки встречаются; языки без частот не проверяются
+#   warning not_in_alphabet     кодовые точки варианта вне алфавита языка
+#   info    base_disagrees      другие языки (большинство, ≥ 2) ставят этот вариант под другую базу
+# Варианты без букв (знаки препинания из *_extension.json) проверяются только на разбор и дубликаты.
+#
+# Перекрёстные проверки — один проход по массивам: строки кодируются целыми id, записи —
+# массивами (язык, вендор, база, вариант); членство в частотах/алфавитах — np.isin по ключам
+# lang·V + id и lang·0x110000 + кодовая точка, «все кодовые точки варианта» — np.minimum.reduceat,
+# дубликаты и большинство по языкам — np.unique по составным ключам.
+#
+# Код возврата 1, если есть ошибки уровня error (с --strict — и warning).
+# Как pre-commit (проверяются языки изменённых файлов, перекрёстные проверки — по всему корпусу):
+#   python3 rf_data_scripts/16_lint_mappings.py --no-report $(git diff --cached --name-only -- data)
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+import alphabets
+import normalization
+from normalization import has_latin, has_letter
+from tolerant_json import load_json
+from vendor_files import C_KEYS, MAPPING_SUFFIXES, VAR_KEYS, parse_mapping, pick_first_present, read_csv_flex
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+OUT_CSV = Path("rf_summaries/mapping_lint.csv")
+MAPPING_GLOB = "data/*/*/mapping/*_key_mapping*"
+FREQ_GLOB = "data/{lang}/*/frequen*/*.csv"
+
+EXCLUDED_LANGS = {"lang"}
+# Ё и Ъ стадии отбрасывают (01, 03, 04) — в маппинге это утечка
+EXCLUDED_LETTERS = {"Ё", "Ъ"}
+RUSSIAN = set("АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ")
+
+LEVEL_ORDER = {"error": 0, "warning": 1, "info": 2}
+MAX_CP = 0x110000
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a)
+
+def _codes(s: str) -> str:
+    return " ".join(f"U+{ord(ch):04X}" for ch in s)
+
+def frequency_units(lang: str) -> Set[str]:
+    """Варианты с C_i > 0 из частот всех вендоров языка (normalization …variant, с collapse)."""
+    norm = normalization.for_language(lang)
+    out: Set[str] = set()
+    for p in sorted(glob.glob(FREQ_GLOB.format(lang=lang))):
+        try:
+            rows = read_csv_flex(Path(p))
+        except (OSError, UnicodeDecodeError) as e:
+            vprint(f"  ошибка частот: {p} {e}")
+            continue
+        for raw in rows:
+            row = {(k or "").strip().lower(): v for k, v in raw.items()}
+            v_key, c_key = pick_first_present(row, VAR_KEYS), pick_first_present(row, C_KEYS)
+            if not v_key or not c_key:
+                continue
+            try:
+                if float(str(row[c_key]).strip()) <= 0:
+                    continue
+            except ValueError:
+                continue
+            v = norm.variant(str(row[v_key]))
+            if v:
+                out.add(v)
+    return out
+
+def mapping_files() -> List[Path]:
+    return sorted(Path(p) for p in glob.glob(MAPPING_GLOB)
+                  if p.endswith(tuple(MAPPING_SUFFIXES)) and Path(p).parts[1] not in EXCLUDED_LANGS)
+
+class Entries:
+    """Записи маппингов в виде массивов; строки — через общий словарь id."""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.rows: List[Tuple[int, int, int, int, int, int]] = []   # file, lang, vendor, base, var, var_c
+        self.files: List[str] = []
+        self.langs: List[str] = []
+        self.vendors: List[str] = []
+
+    def sid(self, s: str) -> int:
+        i = self.vocab.get(s)
+        if i is None:
+            i = self.vocab[s] = len(self.vocab)
+        return i
+
+    @staticmethod
+    def _slot(table: List[str], s: str) -> int:
+        if not table or table[-1] != s:
+            table.append(s)
+        return len(table) - 1
+
+    def add(self, file: str, lang: str, vendor: str, base: str, var: str, var_c: str) -> None:
+        f = self._slot(self.files, file)
+        l = self._slot(self.langs, lang)          # файлы отсортированы по пути: язык и вендор идут подряд
+        g = self._slot(self.vendors, f"{lang}/{vendor}")
+        self.rows.append((f, l, g, self.sid(base), self.sid(var), self.sid(var_c)))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        a = np.array(self.rows, dtype=np.int64).reshape(-1, 6)
+        return dict(zip(("file", "lang", "vendor", "base", "var", "var_c"), a.T))
+
+def lint_entries(path: Path, ent: Entries, findings: List[dict]) -> None:
+    """Разбор файла и построчные проверки (латиница, нормализация, Ё/Ъ, база); записи → ent."""
+    lang, vendor = path.parts[1], path.parts[2]
+    norm = normalization.for_language(lang)
+
+    def report(level, code, base="", var="", msg=""):
+        findings.append({"file": str(path), "level": level, "code": code, "lang_code": lang,
+                         "base": base, "variant": var, "message": msg})
+
+    try:
+        if path.suffix == ".json":
+            _, recoveries = load_json(path)
+            if recoveries:
+                report("warning", "json_repaired", msg="; ".join(map(str, recoveries)))
+        items = parse_mapping(path, verbose=False)
+    except (OSError, ValueError) as e:
+        report("error", "bad_json", msg=str(e))
+        return
+
+    for base_raw, var_raw, _ in items:
+        base, var = norm.variant(base_raw, collapse=False), norm.variant(var_raw, collapse=False)
+        if not base or not var:
+            continue
+        for raw, fixed, what in ((base_raw, base, "база"), (var_raw, var, "вариант")):
+            if has_latin(fixed):
+                report("error", "latin", base, var, f"{what} {raw!r} ({_codes(raw)}) содержит латиницу")
+            elif has_latin(raw):
+                report("error", "latin_lookalike", base, var,
+                       f"{what} {raw!r} ({_codes(raw)}) → {fixed!r} ({_codes(fixed)})")
+            elif raw != fixed:
+                report("warning", "not_normalised", base, var, f"{what} {raw!r} → {fixed!r}")
+        if base in EXCLUDED_LETTERS or var in EXCLUDED_LETTERS:
+            report("warning", "excluded_letter", base, var, "Ё/Ъ отбрасываются стадиями 01, 03, 04")
+        if has_letter(base) and base not in RUSSIAN:
+            report("warning", "base_not_russian", base, var, f"база {base!r} ({_codes(base)})")
+        if var == base:
+            report("warning", "variant_is_base", base, var)
+        ent.add(str(path), lang, vendor, base, var, norm.variant(var) if has_letter(var) else "")
+
+def _flat_codepoints(ent: Entries, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Кодовые точки строк ids подряд и начала строк (для reduceat)."""
+    strings = list(ent.vocab)
+    texts = [strings[i] for i in ids.tolist()]
+    lens = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    cps = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    starts = np.concatenate(([0], np.cumsum(lens)[:-1])) if len(lens) else lens
+    return cps, starts
+
+def cross_check(ent: Entries, freq: Dict[str, Set[str]], findings: List[dict]) -> None:
+    """Перекрёстные проверки одним проходом по массивам записей."""
+    a = ent.arrays()
+    n = len(a["file"])
+    if not n:
+        return
+    strings = list(ent.vocab)
+    letter = np.array([has_letter(strings[i]) for i in a["var"].tolist()], dtype=np.bool_)
+
+    # --- частоты: вариант целиком или все его кодовые точки
+    lang_ids = {lang: i for i, lang in enumerate(ent.langs)}
+    with_freq = np.array([i for lang, i in lang_ids.items() if freq.get(lang)], dtype=np.int64)
+    V = len(ent.vocab) + sum(len(freq.get(lang, ())) for lang in ent.langs)
+    freq_keys, freq_cp = [], []
+    for lang, i in lang_ids.items():
+        for u in freq.get(lang, ()):
+            freq_keys.append(i * V + ent.sid(u))
+            freq_cp.extend(i * MAX_CP + ord(ch) for ch in u)
+    in_freq = np.isin(a["lang"] * V + a["var_c"], np.array(freq_keys, dtype=np.int64))
+    cps, starts = _flat_codepoints(ent, a["var"])
+    owner_lang = np.repeat(a["lang"], np.diff(np.append(starts, len(cps))))
+    cp_freq = np.isin(owner_lang * MAX_CP + cps, np.array(freq_cp, dtype=np.int64))
+    all_cp_freq = np.minimum.reduceat(cp_freq.astype(np.int8), starts).astype(np.bool_)
+    miss_freq = letter & np.isin(a["lang"], with_freq) & ~in_freq & ~all_cp_freq
+
+    # --- алфавит: все кодовые точки варианта в битовой карте языка
+    alpha_cp = []
+    for lang, i in lang_ids.items():
+        alpha_cp.append(i * MAX_CP + np.flatnonzero(alphabets.for_language(lang).bitmap))
+    cp_alpha = np.isin(owner_lang * MAX_CP + cps, np.concatenate(alpha_cp))
+    miss_alpha = letter & ~np.minimum.reduceat(cp_alpha.astype(np.int8), starts).astype(np.bool_)
+
+    # --- дубликаты у вендора: (вендор, вариант) → число баз; (вендор, вариант, база) → повторы
+    S = np.int64(len(ent.vocab))
+    gv = a["vendor"] * S + a["var"]
+    gvb, first, inv = np.unique(gv * S + a["base"], return_index=True, return_inverse=True)
+    uniq_gv, n_bases = np.unique(gvb // S, return_counts=True)
+    dup = np.isin(gv, uniq_gv[n_bases > 1])
+    first_of = first[inv]                               # первая запись той же тройки
+    repeated = first_of != np.arange(n)
+
+    # --- база большинства языков для варианта
+    vbl = np.unique((a["var"] * S + a["base"]) * len(ent.langs) + a["lang"])
+    vb, n_langs = np.unique(vbl // len(ent.langs), return_counts=True)
+    order = np.lexsort((-n_langs, vb // S))             # по варианту, внутри — больше языков первыми
+    vb, n_langs = vb[order], n_langs[order]
+    head = np.ones(len(vb), dtype=np.bool_)
+    head[1:] = (vb[1:] // S) != (vb[:-1] // S)
+    runner = np.zeros(len(vb), dtype=np.int64)          # второе место (для ничьих)
+    nxt = np.flatnonzero(head) + 1
+    ok = nxt < len(vb)
+    runner[np.flatnonzero(head)[ok]] = np.where(~head[nxt[ok]], n_langs[nxt[ok]], 0)
+    winners = head & (n_langs >= 2) & (n_langs > runner)
+    major = dict(zip((vb[winners] // S).tolist(), zip((vb[winners] % S).tolist(), n_langs[winners].tolist())))
+
+    def report(i, level, code, msg=""):
+        findings.append({"file": ent.files[a["file"][i]], "level": level, "code": code,
+                         "lang_code": ent.langs[a["lang"][i]], "base": strings[a["base"][i]],
+                         "variant": strings[a["var"][i]], "message": msg})
+
+    for i in np.flatnonzero(dup | repeated | miss_freq | miss_alpha).tolist():
+        var = strings[a["var"][i]]
+        if dup[i] and not repeated[i]:
+            bases = sorted({strings[b] for b in a["base"][gv == gv[i]].tolist()})
+            report(i, "error", "duplicate_variant", f"под базами {', '.join(bases)} у {ent.vendors[a['vendor'][i]]}")
+        if repeated[i]:
+            j = first_of[i]
+            where = "в том же файле" if a["file"][j] == a["file"][i] else f"уже в {ent.files[a['file'][j]]}"
+            report(i, "warning", "repeated_variant", where)
+        if miss_freq[i]:
+            missing = [ch for ch in var if ch not in "".join(freq[ent.langs[a["lang"][i]]])]
+            report(i, "warning", "not_in_frequencies",
+                   f"нет в частотах языка; кодовые точки вне частот: {_codes(''.join(missing))}" if missing
+                   else "нет в частотах языка")
+        if miss_alpha[i]:
+            alpha = alphabets.for_language(ent.langs[a["lang"][i]])
+            out = [ch for ch in var if not alpha.contains(np.array([ord(ch)]))[0]]
+            report(i, "warning", "not_in_alphabet", f"вне алфавита: {_codes(''.join(out))}")
+    for i in range(n):
+        m = major.get(int(a["var"][i]))
+        if m and letter[i] and m[0] != a["base"][i]:
+            report(i, "info", "base_disagrees", f"в {m[1]} языках — под базой {strings[m[0]]}")
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*", help="Изменённые файлы (pre-commit): отчёт только по их языкам")
+    ap.add_argument("--strict", action="store_true", help="Код возврата 1 и при warning")
+    ap.add_argument("--no-report", action="store_true", help=f"Не писать {OUT_CSV}")
+    args = ap.parse_args()
+
+    only: Optional[Set[str]] = None
+    if args.paths:
+        only = {Path(p).parts[1] for p in args.paths if len(Path(p).parts) > 2 and Path(p).parts[0] == "data"}
+        if not only:
+            print("OK: no data files to lint")
+            return 0
+
+    t0 = time.perf_counter()
+    findings: List[dict] = []
+    ent = Entries()
+    files = mapping_files()
+    for p in files:
+        lint_entries(p, ent, findings)
+    freq = {lang: frequency_units(lang) for lang in ent.langs}
+    cross_check(ent, freq, findings)
+
+    if only is not None:
+        findings = [r for r in findings if r["lang_code"] in only]
+    findings.sort(key=lambda r: (r["file"], LEVEL_ORDER[r["level"]], r["code"], r["base"], r["variant"]))
+    n = {lvl: sum(1 for r in findings if r["level"] == lvl) for lvl in LEVEL_ORDER}
+    for r in findings:
+        if r["level"] == "error":
+            vprint(f"[{r['lang_code']}] ERROR {r['file']}: {r['code']} {r['base']}→{r['variant']} {r['message']}")
+
+    if not args.no_report:
+        OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+        with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=["file", "level", "code", "lang_code", "base", "variant", "message"])
+            w.writeheader()
+            w.writerows(findings)
+        print(f"OK: wrote {OUT_CSV} (files={len(files)}, entries={len(ent.rows)}, "
+              f"errors={n['error']}, warnings={n['warning']}, info={n['info']})")
+    else:
+        print(f"OK: linted {len(files)} files (errors={n['error']}, warnings={n['warning']}, info={n['info']})")
+    print(f"   elapsed={time.perf_counter() - t0:.2f}s")
+    failed = n["error"] + (n["warning"] if args.strict else 0)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/alphabets.py
+#
+# Общий модуль: реестр алфавитов языков (нужен numpy).
+#
+# Алфавит языка — объединение по всем вендорам data/<lang>/<vendor>/:
+#   alphabet/<lang>_alphabet.txt — если есть: единицы через пробел или по строкам, # — комментарий;
+#   иначе выводится из данных вендора:
+#     frequencies/*.csv         — варианты с C_i > 0 (столбцы как в 04),
+#     mapping/*_key_mapping*    — базы и варианты (JSON и TXT, разбор vendor_files.parse_mapping).
+# Единицы приводятся правилами языка (normalization.for_language(lang).variant, без collapse),
+# в алфавит попадают только строки с буквой; Ё и Ъ остаются — фильтруют стадии.
+#
+# Скомпилированный алфавит (Alphabet.compile):
+#   units   — frozenset единиц (буквы и многобуквенные сочетания: КӀ, ДЖ, Аᵸ);
+#   bitmap  — np.bool_ по кодовым точкам (до максимальной встреченной): True для любой кодовой
+#             точки, входящей в какую-либо единицу; contains(cps) — векторная проверка массива;
+#   trie    — префиксное дерево единиц: longest_match / tokenize режут текст по самому длинному
+#             совпадению (КӀ раньше К).
+# Кэш: .cache/alphabets/<sha256>.json — хэш по содержимому исходных файлов, подписи правил
+# нормализации языка и ALPHABET_VERSION; при совпадении файлы не разбираются заново.
+#
+# Запуск (печать алфавита и класса символов для регулярки, как в hf_freq_analyze.md):
+#   python3 rf_data_scripts/alphabets.py kaz tyv
+
+import argparse
+import base64
+import glob
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+import normalization
+from vendor_files import C_KEYS, MAPPING_SUFFIXES, VAR_KEYS, parse_mapping, pick_first_present, read_csv_flex
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CACHE_DIR        = ROOT / ".cache/alphabets"
+ALPHABET_VERSION = 1   # менять при изменении правил сборки
+EXCLUDED_LANGS   = {"lang"}
+
+END = ""   # ключ конца единицы в узле trie (пустая строка не бывает символом)
+
+class Alphabet:
+    """Скомпилированный алфавит языка: множество, битовая карта кодовых точек, trie."""
+
+    def __init__(self, lang: str, units: Iterable[str], bitmap: np.ndarray, trie: dict, signature: str = ""):
+        self.lang = lang
+        self.units = frozenset(units)
+        self.bitmap = bitmap
+        self.trie = trie
+        self.signature = signature
+        self.max_len = max((len(u) for u in self.units), default=0)
+
+    @classmethod
+    def compile(cls, lang: str, units: Iterable[str], signature: str = "") -> "Alphabet":
+        units = sorted(set(units))
+        cps = sorted({ord(ch) for u in units for ch in u})
+        bitmap = np.zeros((cps[-1] + 1) if cps else 0, dtype=np.bool_)
+        bitmap[cps] = True
+        trie: dict = {}
+        for u in units:
+            node = trie
+            for ch in u:
+                node = node.setdefault(ch, {})
+            node[END] = True
+        return cls(lang, units, bitmap, trie, signature)
+
+    def to_json(self) -> dict:
+        return {"lang": self.lang, "units": sorted(self.units), "size": int(self.bitmap.size),
+                "bitmap": base64.b64encode(np.packbits(self.bitmap).tobytes()).decode("ascii"),
+                "trie": self.trie}
+
+    @classmethod
+    def from_json(cls, c: dict, signature: str = "") -> "Alphabet":
+        bits = np.unpackbits(np.frombuffer(base64.b64decode(c["bitmap"]), dtype=np.uint8))
+        return cls(c["lang"], c["units"], bits[:c["size"]].astype(np.bool_), c["trie"], signature)
+
+    def __contains__(self, unit: str) -> bool:
+        return unit in self.units
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def contains(self, cps: np.ndarray) -> np.ndarray:
+        """Векторно: входит ли каждая кодовая точка массива в какую-либо единицу алфавита."""
+        cps = np.asarray(cps)
+        out = np.zeros(cps.shape, dtype=np.bool_)
+        ok = cps < self.bitmap.size
+        out[ok] = self.bitmap[cps[ok]]
+        return out
+
+    def longest_match(self, text: str, i: int = 0) -> int:
+        """Длина самой длинной единицы алфавита, начинающейся в text[i]; 0 — нет такой."""
+        node, best = self.trie, 0
+        for j in range(i, min(len(text), i + self.max_len)):
+            node = node.get(text[j])
+            if node is None:
+                break
+            if END in node:
+                best = j - i + 1
+        return best
+
+    def tokenize(self, text: str) -> List[str]:
+        """Текст → единицы по самому длинному совпадению; символы вне алфавита — по одному."""
+        out: List[str] = []
+        i = 0
+        while i < len(text):
+            k = self.longest_match(text, i) or 1
+            out.append(text[i:i + k])
+            i += k
+        return out
+
+    def multigraphs(self) -> List[str]:
+        return sorted(u for u in self.units if len(u) > 1)
+
+    def regex_class(self) -> str:
+        """Класс символов для регулярки из однобуквенных единиц: [АӘБВ…]."""
+        return "[" + "".join(sorted(u for u in self.units if len(u) == 1)) + "]"
+
+def vendor_sources(lang: str) -> List[Path]:
+    """Файлы, из которых собирается алфавит языка (по вендорам, отсортированы)."""
+    out: List[Path] = []
+    for vendor_dir in sorted(p for p in (ROOT / "data" / lang).glob("*") if p.is_dir()):
+        declared = vendor_dir / "alphabet" / f"{lang}_alphabet.txt"
+        if declared.exists():
+            out.append(declared)
+            continue
+        out += sorted(Path(p) for p in glob.glob(str(vendor_dir / "frequen*" / "*.csv")))
+        out += sorted(Path(p) for p in glob.glob(str(vendor_dir / "mapping" / "*_key_mapping*"))
+                      if p.endswith(tuple(MAPPING_SUFFIXES)))
+    return out
+
+def _units_from(path: Path) -> List[str]:
+    if path.parent.name == "alphabet":
+        text = path.read_text(encoding="utf-8-sig")
+        return [w for line in text.splitlines() for w in line.split("#", 1)[0].split()]
+    if path.parent.name == "mapping":
+        return [u for base, var, _ in parse_mapping(path, verbose=False) for u in (base, var)]
+    units = []
+    for raw in read_csv_flex(path):
+        row = {(k or "").strip().lower(): v for k, v in raw.items()}
+        v_key, c_key = pick_first_present(row, VAR_KEYS), pick_first_present(row, C_KEYS)
+        if not v_key or not c_key:
+            continue
+        try:
+            if float(str(row[c_key]).strip()) > 0:
+                units.append(str(row[v_key]))
+        except ValueError:
+            continue
+    return units
+
+def _build(lang: str, sources: List[Path]) -> List[str]:
+    norm = normalization.for_language(lang)
+    units = set()
+    for p in sources:
+        try:
+            raw = _units_from(p)
+        except (OSError, ValueError) as e:
+            print(f"  ошибка алфавита: {p.relative_to(ROOT)} {e}")
+            continue
+        for u in raw:
+            u = norm.variant(u, collapse=False)
+            if u and normalization.has_letter(u):
+                units.add(u)
+    return sorted(units)
+
+@lru_cache(maxsize=None)
+def for_language(lang: str) -> Alphabet:
+    """Алфавит языка из кэша по хэшу содержимого источников (или собранный заново)."""
+    sources = vendor_sources(lang)
+    h = hashlib.sha256(f"v{ALPHABET_VERSION}\0{lang}\0{normalization.for_language(lang).signature}".encode("utf-8"))
+    for p in sources:
+        h.update(str(p.relative_to(ROOT)).encode("utf-8") + b"\0" + p.read_bytes() + b"\0")
+    signature = h.hexdigest()
+    cache = CACHE_DIR / f"{signature}.json"
+    try:
+        return Alphabet.from_json(json.loads(cache.read_text(encoding="utf-8")), signature)
+    except (OSError, ValueError, KeyError):
+        pass
+    alpha = Alphabet.compile(lang, _build(lang, sources), signature)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(alpha.to_json(), ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, cache)
+    return alpha
+
+def languages() -> List[str]:
+    return sorted(p.name for p in (ROOT / "data").iterdir()
+                  if p.is_dir() and not p.name.startswith(".") and p.name not in EXCLUDED_LANGS)
+
+def all_alphabets() -> Dict[str, Alphabet]:
+    """{lang: Alphabet} для языков с непустым алфавитом."""
+    out: Dict[str, Alphabet] = {}
+    for lang in languages():
+        a = for_language(lang)
+        if len(a):
+            out[lang] = a
+    return out
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("langs", nargs="*", help="Коды языков (по умолчанию — все)")
+    args = ap.parse_args()
+    for lang in args.langs or languages():
+        a = for_language(lang)
+        print(f"[{lang}] units={len(a)} multigraphs={len(a.multigraphs())}")
+        print(f"   {a.regex_class()}")
+        if a.multigraphs():
+            print(f"   {' '.join(a.multigraphs())}")
+
+if __name__ == "__main__":
+    main()
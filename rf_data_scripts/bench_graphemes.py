@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/bench_graphemes.py
+#
+# Сравнение сегментатора графем segmentation.graphemes (UAX #29) со старой эвристикой
+# «символ с combining()==0 начинает кластер» на корпусах raw/<lang>_mono_*.txt.
+#
+# Для каждого языка берётся самый большой корпус (первые --limit-mb МБ), текст после NFC
+# и upper() режется обоими способами. Печатается время, скорость и число кластеров,
+# в которых способы расходятся, с примерами (ZWJ, вариантные селекторы, ҈ и т. п.).
+#
+# Запуск:
+#   python3 rf_data_scripts/bench_graphemes.py
+#   python3 rf_data_scripts/bench_graphemes.py --langs tyv kbd --limit-mb 20
+
+import argparse
+import glob
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from segmentation import graphemes
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+RAW_GLOB = "data/{lang}/*/raw/{lang}_mono_*.txt"
+EXCLUDED_LANGS = {"lang"}
+EXAMPLES = 5
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--langs", nargs="*", default=None, help="Коды языков (по умолчанию — все с корпусами)")
+    ap.add_argument("--limit-mb", type=float, default=5.0, help="Сколько МБ корпуса читать на язык")
+    return ap.parse_args()
+
+def heuristic_graphemes(s: str) -> List[str]:
+    """Прежний сегментатор из 03/05: combining>0 прилипает к предыдущему символу."""
+    out: List[str] = []
+    cur = ""
+    for ch in s:
+        if cur and unicodedata.combining(ch) > 0:
+            cur += ch
+        else:
+            if cur: out.append(cur)
+            cur = ch
+    if cur: out.append(cur)
+    return out
+
+def largest_corpus(lang: str) -> Optional[Path]:
+    files = [Path(p) for p in glob.glob(RAW_GLOB.format(lang=lang))]
+    files = [p for p in files if p.stat().st_size > 0]
+    return max(files, key=lambda p: (p.stat().st_size, str(p))) if files else None
+
+def _codes(s: str) -> str:
+    return " ".join(f"U+{ord(ch):04X}" for ch in s)
+
+def main():
+    args = parse_args()
+    langs = args.langs or sorted({Path(p).parts[1] for p in glob.glob("data/*/*/raw/*_mono_*.txt")}
+                                 - EXCLUDED_LANGS)
+    limit = int(args.limit_mb * 1e6)
+    t_old = t_new = 0.0
+    n_chars = 0
+    diffs: Dict[str, int] = {}
+
+    for lang in langs:
+        corpus = largest_corpus(lang)
+        if corpus is None:
+            continue
+        with corpus.open("r", encoding="utf-8", errors="replace") as f:
+            text = unicodedata.normalize("NFC", f.read(limit)).upper()
+        n_chars += len(text)
+
+        t0 = time.perf_counter(); old = heuristic_graphemes(text); t_old += time.perf_counter() - t0
+        t0 = time.perf_counter(); new = graphemes(text); t_new += time.perf_counter() - t0
+
+        if old != new:
+            seen = set(old)
+            for g in new:
+                if g not in seen:
+                    diffs[g] = diffs.get(g, 0) + 1
+        print(f"[{lang}] {corpus.name}: chars={len(text)}, clusters old={len(old)} new={len(new)}")
+
+    if not n_chars:
+        print("ERR: no corpora found"); return
+    print(f"OK: {n_chars / 1e6:.2f} M chars")
+    print(f"   heuristic: {t_old:.2f}s ({n_chars / t_old / 1e6:.1f} M chars/s)")
+    print(f"   UAX #29:   {t_new:.2f}s ({n_chars / t_new / 1e6:.1f} M chars/s)")
+    print(f"   clusters only in UAX #29 segmentation: {len(diffs)} distinct, {sum(diffs.values())} total")
+    for g, k in sorted(diffs.items(), key=lambda kv: -kv[1])[:EXAMPLES]:
+        print(f"     {g!r} ({_codes(g)}) ×{k}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/decomposition.py
+#
+# Общий модуль: таблица разложения вариантов на атомные составляющие.
+#
+# Вариант (NFC, upper) → графемы UAX #29 (segmentation.graphemes) → составляющие с кратностями
+# в порядке первого появления: «ЛЛЪ» → Л×2, Ъ×1; «А̄ᵸ» → А̄×1, ᵸ×1; «Ӑ» → Ӑ×1.
+# Таблицу один раз строит 03 по вариантам всех маппингов и пишет в
+#   rf_summaries/variant_decomposition.csv — variant, grapheme_count, component, multiplicity
+#   (строка на составляющую; однографемные варианты — одна строка с самим вариантом).
+# Правила поверх таблицы — здесь, чтобы 03 и 05 не сегментировали строки каждый по-своему:
+#   is_atomic(v)       — одна графема: вариант идёт в variant_mapping_atomic.csv (03);
+#   rescued(v)         — составляющие из ATOMIC_RESCUE у последовательностей: ᵸ встречается только
+#                        внутри «Аᵸ», «Ӣᵸ», … и попадает в атомный свод под базой Н (03);
+#   symbol_weights(v)  — составляющие с кратностями для весов символов (05): последовательности
+#                        длиннее MAX_GRAPHEMES графем не учитываются.
+# Варианта нет в таблице (частоты без маппинга, например «ЛЛЪ») — раскладывается на месте
+# и добавляется в таблицу в памяти; такие варианты видны в added.
+
+import csv
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from segmentation import graphemes
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DECOMP_CSV    = ROOT / "rf_summaries/variant_decomposition.csv"
+MAX_GRAPHEMES = 4
+ATOMIC_RESCUE = {"ᵸ": "Н"}   # ᵸ → база Н
+
+Components = Tuple[Tuple[str, int], ...]
+
+def decompose(variant: str) -> Components:
+    """Графемы варианта с кратностями, в порядке первого появления."""
+    counts: Dict[str, int] = {}
+    for g in graphemes(variant):
+        counts[g] = counts.get(g, 0) + 1
+    return tuple(counts.items())
+
+class DecompositionTable:
+    """{вариант: ((составляющая, кратность), …)}; недостающие варианты раскладываются по запросу."""
+
+    def __init__(self, entries: Dict[str, Components] = None):
+        self.entries: Dict[str, Components] = dict(entries or {})
+        self.added: List[str] = []
+
+    @classmethod
+    def build(cls, variants) -> "DecompositionTable":
+        return cls({v: decompose(v) for v in sorted(set(variants)) if v})
+
+    @classmethod
+    def read(cls, path: Path = DECOMP_CSV) -> "DecompositionTable":
+        entries: Dict[str, List[Tuple[str, int]]] = {}
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for r in csv.DictReader(f):
+                    entries.setdefault(r["variant"], []).append((r["component"], int(r["multiplicity"])))
+        return cls({v: tuple(c) for v, c in entries.items()})
+
+    def write(self, path: Path = DECOMP_CSV) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["variant", "grapheme_count", "component", "multiplicity"])
+            for v in sorted(self.entries):
+                n = self.grapheme_count(v)
+                for comp, k in self.entries[v]:
+                    w.writerow([v, n, comp, k])
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def components(self, variant: str) -> Components:
+        comps = self.entries.get(variant)
+        if comps is None:
+            comps = self.entries[variant] = decompose(variant)
+            self.added.append(variant)
+        return comps
+
+    def grapheme_count(self, variant: str) -> int:
+        return sum(k for _, k in self.components(variant))
+
+    def is_atomic(self, variant: str) -> bool:
+        return self.grapheme_count(variant) == 1
+
+    def rescued(self, variant: str) -> List[Tuple[str, str]]:
+        """[(база, составляющая)] для составляющих из ATOMIC_RESCUE внутри последовательности."""
+        if self.is_atomic(variant):
+            return []
+        return [(ATOMIC_RESCUE[c], c) for c, _ in self.components(variant) if c in ATOMIC_RESCUE]
+
+    def symbol_weights(self, variant: str) -> Components:
+        """Составляющие с кратностями для весов символов; пусто, если графем больше MAX_GRAPHEMES."""
+        return self.components(variant) if self.grapheme_count(variant) <= MAX_GRAPHEMES else ()
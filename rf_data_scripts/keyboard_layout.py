@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/keyboard_layout.py
+#
+# Общий модуль: компиляция keyboard/<lang>_key_*.json в массивы координат
+# и векторная оценка стоимости набора (нужен numpy).
+#
+# Формат раскладки (см. data/lang/vendor/keyboard/README.md):
+#   { "rows": 4, "keys": [{"label", "row", "column"}, ...],
+#     "long_press": [{"key", "alternates": [...]}, ...] }
+#
+# Геометрия — как в iOS_keyboard.html: ряды центрируются (flex, justify-content: center),
+# клавиши в ряду идут подряд по возрастанию column, поэтому x = порядковый номер
+# в ряду − (число клавиш в ряду − 1) / 2, y = row − 1. Единица — ширина клавиши.
+#
+# Неполные раскладки (меньше MIN_FULL_KEYS клавиш, шаблонные файлы вендоров)
+# накладываются поверх базовой ЙЦУКЕН из data/lang/vendor/keyboard/rf_key_default.json:
+# клавиша файла занимает свою (row, column), вытесняя базовую клавишу с той же
+# позиции и ту же букву в другом месте.
+#
+# Набор символа: сначала ищем его целиком (тап или слот всплывающего меню),
+# затем по графемам (UAX #29, модуль segmentation), затем по кодовым точкам
+# (буква + combining из меню «◌́»).
+#
+# Альтернативы берутся из "long_press" и из поля "alternates" у самой клавиши.
+#
+# Время набора: KeyGeometry из CSS/JS iOS_keyboard.html, TimingModel — матрица Фиттса
+# между центрами клавиш и штраф long-press (удержание + выбор в меню).
+#
+# validate_layout — проверка схемы, дубликатов позиций, недостающих букв алфавита и
+# недостижимых вариантов маппинга. compile_cached — компиляция с кэшем в .cache/layouts/
+# по хэшу файла (и базы, и доп. long-press): повторная загрузка — чтение одного JSON,
+# файл с ошибками схемы падает сразу (ValueError).
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from segmentation import graphemes
+
+ROOT = Path(__file__).resolve().parent.parent
+
+BASE_LAYOUT    = ROOT / "data/lang/vendor/keyboard/rf_key_default.json"
+UNIFIED_LAYOUT = ROOT / "data/lang/vendor/keyboard/rf_key_default_wise.json"
+IOS_HTML       = ROOT / "data/lang/vendor/keyboard/iOS_keyboard.html"
+
+CACHE_DIR      = ROOT / ".cache/layouts"
+CACHE_VERSION  = 1   # менять при изменении логики компиляции
+
+MIN_FULL_KEYS = 20
+DOTTED_CIRCLE = "◌"  # ◌ — подложка для combining-знаков в меню, при вводе убирается
+
+# модель стоимости в «тапах»
+TAP_COST        = 1.0   # одно нажатие
+LONG_PRESS_COST = 1.0   # доплата за удержание (330 мс в iOS_keyboard.html ≈ ещё один тап)
+SLOT_COST       = 0.25  # каждый следующий слот всплывающего меню
+TRAVEL_COST     = 0.1   # за одну ширину клавиши перемещения пальца
+
+# время (мс): закон Фиттса MT = a + b·log2(D/W + 1), константы — Soukoreff & MacKenzie (1995)
+FITTS_A_MS = 83.0
+FITTS_B_MS = 127.0
+GLYPH_WIDTH = 0.6   # ширина символа в долях font-size (для min-width и всплывающего меню)
+
+Stroke = Tuple[int, int]  # (индекс клавиши, слот: 0 — тап, 1.. — long-press)
+
+def norm_label(s: str) -> str:
+    s = unicodedata.normalize("NFC", (s or "").replace(DOTTED_CIRCLE, "").strip())
+    return s.upper()
+
+def load_layout(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        obj = json.load(f)
+    if not isinstance(obj, dict):
+        raise ValueError(f"{path}: ожидали JSON-объект раскладки")
+    return obj
+
+def _valid_keys(obj: dict) -> List[Tuple[str, int, int]]:
+    out = []
+    for k in obj.get("keys") or []:
+        if not isinstance(k, dict): continue
+        label = norm_label(str(k.get("label", "")))
+        try:
+            row, col = int(k.get("row")), int(k.get("column"))
+        except (TypeError, ValueError):
+            continue
+        if label:
+            out.append((label, row, col))
+    return out
+
+class CompiledLayout:
+    """
+    Раскладка в виде массивов:
+      labels[K], xy[K, 2]        — подписи и центры клавиш
+      popups[k]                  — альтернативы long-press клавиши k (по слотам)
+      reach[символ] → (k, slot)  — как набрать символ одним действием
+    """
+
+    def __init__(self, name: str, keys: List[Tuple[str, int, int]],
+                 long_press: Dict[str, List[str]]):
+        self.name = name
+        keys = sorted(keys, key=lambda t: (t[1], t[2]))
+        self.labels = [k[0] for k in keys]
+        self.rows = np.array([k[1] for k in keys], dtype=np.int64)
+        self.cols = np.array([k[2] for k in keys], dtype=np.int64)
+
+        xy = np.zeros((len(keys), 2))
+        for r in sorted(set(self.rows.tolist())):
+            idx = np.flatnonzero(self.rows == r)          # уже по возрастанию column
+            xy[idx, 0] = np.arange(len(idx)) - (len(idx) - 1) / 2.0
+            xy[idx, 1] = r - 1
+        self.xy = xy
+
+        self.key_index: Dict[str, int] = {}
+        for i, lab in enumerate(self.labels):
+            self.key_index.setdefault(lab, i)
+
+        self.popups: Dict[int, List[str]] = {}
+        self.reach: Dict[str, Stroke] = {lab: (i, 0) for lab, i in self.key_index.items()}
+        for base, alts in long_press.items():
+            k = self.key_index.get(base)
+            if k is None: continue
+            slots = self.popups.setdefault(k, [])
+            for a in alts:
+                if a and a not in slots:
+                    slots.append(a)
+                    self.reach.setdefault(a, (k, len(slots)))
+
+    @property
+    def n_keys(self) -> int:
+        return len(self.labels)
+
+    def index(self) -> Dict[str, Tuple[int, int, int]]:
+        """символ → (row, column, slot) для всего, что набирается одним действием."""
+        return {ch: (int(self.rows[k]), int(self.cols[k]), slot) for ch, (k, slot) in self.reach.items()}
+
+    def distances(self) -> np.ndarray:
+        """Матрица евклидовых расстояний между центрами клавиш, K × K."""
+        d = self.xy[:, None, :] - self.xy[None, :, :]
+        return np.sqrt((d ** 2).sum(axis=2))
+
+    def strokes(self, text: str) -> Optional[List[Stroke]]:
+        """Последовательность действий для символа/варианта или None, если не набирается."""
+        hit = self.reach.get(text)
+        if hit is not None:
+            return [hit]
+        parts = graphemes(text)
+        if len(parts) == 1:
+            parts = list(unicodedata.normalize("NFD", text))
+            if len(parts) == 1:
+                return None
+            parts = [unicodedata.normalize("NFC", p) for p in parts]
+        out: List[Stroke] = []
+        for p in parts:
+            sub = self.strokes(p)
+            if sub is None:
+                return None
+            out.extend(sub)
+        return out
+
+def compile_layout(obj: dict, name: str = "",
+                   extra_long_press: Optional[Dict[str, Iterable[str]]] = None,
+                   base: Optional[dict] = None) -> CompiledLayout:
+    """
+    Собирает CompiledLayout из JSON-объекта раскладки.
+    extra_long_press — дополнительные альтернативы (например, из mapping/<lang>_key_mapping.json),
+    дописываются в конец меню своей базовой клавиши.
+    """
+    keys = _valid_keys(obj)
+    if len(keys) < MIN_FULL_KEYS:
+        if base is None:
+            base = load_layout(BASE_LAYOUT)
+        merged = {(r, c): lab for lab, r, c in _valid_keys(base)}
+        for lab, r, c in keys:
+            for pos in [p for p, l in merged.items() if l == lab]:
+                del merged[pos]
+            merged[(r, c)] = lab
+        keys = [(lab, r, c) for (r, c), lab in merged.items()]
+
+    long_press: Dict[str, List[str]] = {}
+    for k in obj.get("keys") or []:
+        if isinstance(k, dict) and isinstance(k.get("alternates"), list):
+            lab = norm_label(str(k.get("label", "")))
+            alts = [norm_label(a) for a in k["alternates"] if isinstance(a, str)]
+            if lab:
+                long_press.setdefault(lab, []).extend(a for a in alts if a)
+    for lp in obj.get("long_press") or []:
+        if not isinstance(lp, dict): continue
+        k = norm_label(str(lp.get("key", "")))
+        alts = [norm_label(str(a)) for a in (lp.get("alternates") or []) if isinstance(a, str)]
+        if k:
+            long_press.setdefault(k, []).extend(a for a in alts if a)
+    for k, alts in (extra_long_press or {}).items():
+        k = norm_label(k)
+        long_press.setdefault(k, []).extend(a for a in (norm_label(x) for x in alts) if a)
+
+    return CompiledLayout(name or str(obj.get("layout_name", "")), keys, long_press)
+
+# ----------------------------- геометрия и время -----------------------------
+
+class KeyGeometry:
+    """Размеры iOS-клавиатуры в px (как их рисует iOS_keyboard.html)."""
+
+    def __init__(self, key_w: float, key_h: float, pitch_x: float, pitch_y: float,
+                 hold_ms: float, item_w: float, popup_pad: float):
+        self.key_w, self.key_h = key_w, key_h          # внешний размер клавиши (без margin)
+        self.pitch_x, self.pitch_y = pitch_x, pitch_y  # шаг между центрами соседних клавиш/рядов
+        self.hold_ms = hold_ms                         # задержка long-press (setTimeout)
+        self.item_w = item_w                           # ширина пункта всплывающего меню
+        self.popup_pad = popup_pad
+
+def _css_rules(html: str) -> Dict[str, Dict[str, str]]:
+    rules: Dict[str, Dict[str, str]] = {}
+    for sel, body in re.findall(r"([^{}]+)\{([^{}]*)\}", html):
+        props = dict((k.strip(), v.strip()) for k, v in
+                     (d.split(":", 1) for d in body.split(";") if ":" in d))
+        for one in sel.split(","):
+            rules.setdefault(one.strip(), {}).update(props)
+    return rules
+
+def _box(value: str) -> Tuple[float, float, float, float]:
+    """CSS-сокращение margin/padding → (top, right, bottom, left) в px."""
+    v = [float(x) for x in re.findall(r"-?[\d.]+", value or "0")] or [0.0]
+    if len(v) == 1: v = v * 4
+    elif len(v) == 2: v = v * 2
+    elif len(v) == 3: v = v + [v[1]]
+    return v[0], v[1], v[2], v[3]
+
+def _px(value: Optional[str], default: float) -> float:
+    m = re.search(r"-?[\d.]+", value or "")
+    return float(m.group()) if m else default
+
+@lru_cache(maxsize=None)
+def load_geometry(path: Path = IOS_HTML) -> KeyGeometry:
+    """
+    Клавиша: content-box, ширина = max(min-width, символ) + padding, высота = строка + padding;
+    шаг = размер + margin клавиши (+ margin ряда по вертикали).
+    Меню: пункт = символ + padding span. Задержка удержания — из setTimeout(…, N).
+    """
+    html = Path(path).read_text(encoding="utf-8")
+    css = _css_rules(html)
+    key, row, span = css.get(".key", {}), css.get(".row", {}), css.get(".popup span", {})
+    font = _px(key.get("font-size"), 20.0)
+    pt, pr, pb, pl = _box(key.get("padding", "16px 12px"))
+    mt, mr, mb, ml = _box(key.get("margin", "2px"))
+    rt, _, rb, _ = _box(row.get("margin", "6px 0"))
+    key_w = max(_px(key.get("min-width"), 36.0), GLYPH_WIDTH * font) + pl + pr
+    key_h = 1.2 * font + pt + pb                        # line-height: normal ≈ 1.2
+    sp_t, sp_r, sp_b, sp_l = _box(span.get("padding", "6px 10px"))
+    item_w = GLYPH_WIDTH * _px(span.get("font-size"), 18.0) + sp_l + sp_r
+    hold = re.search(r"\},\s*(\d+)\s*\)", html)
+    return KeyGeometry(
+        key_w=key_w, key_h=key_h,
+        pitch_x=key_w + ml + mr,
+        pitch_y=key_h + mt + mb + max(rt, rb),          # вертикальные margin рядов схлопываются
+        hold_ms=float(hold.group(1)) if hold else 330.0,
+        item_w=item_w,
+        popup_pad=_box(css.get(".popup", {}).get("padding", "6px"))[3],
+    )
+
+def fitts_ms(distance: np.ndarray, width: float) -> np.ndarray:
+    return FITTS_A_MS + FITTS_B_MS * np.log2(np.asarray(distance) / width + 1.0)
+
+class TimingModel:
+    """
+    Попарная матрица времени T[K, K] (мс): переход с клавиши i и нажатие клавиши j
+    (T[i, i] = a — повтор). Long-press: удержание hold_ms и, для слота > 1,
+    движение по меню от центра клавиши к пункту (слот 1 выбран сразу, как в iOS_keyboard.html).
+    """
+
+    def __init__(self, layout: CompiledLayout, geom: Optional[KeyGeometry] = None):
+        g = geom or load_geometry()
+        self.layout, self.geom = layout, g
+        px = layout.xy * np.array([g.pitch_x, g.pitch_y])
+        d = np.sqrt(((px[:, None, :] - px[None, :, :]) ** 2).sum(axis=2))
+        self.T = fitts_ms(d, g.key_w)
+
+    def longpress_ms(self, k: int, slot: int) -> float:
+        if slot <= 0:
+            return 0.0
+        if slot == 1:
+            return self.geom.hold_ms
+        g = self.geom
+        n = len(self.layout.popups.get(k, [])) or slot
+        popup_w = n * g.item_w + 2 * g.popup_pad
+        dx = abs(-popup_w / 2 + g.popup_pad + (slot - 0.5) * g.item_w)
+        return g.hold_ms + float(fitts_ms(dx, g.item_w))
+
+    def strokes_ms(self, seq: List[Stroke]) -> float:
+        """Время внутри символа: переходы между его нажатиями и long-press (без первого перехода)."""
+        return (sum(float(self.T[a[0], b[0]]) for a, b in zip(seq, seq[1:]))
+                + sum(self.longpress_ms(k, s) for k, s in seq))
+
+# ----------------------------- проверка и кэш -----------------------------
+
+Issue = Tuple[str, str, str]  # (level: error | warning | info, code, сообщение)
+
+SCHEMA_TYPES = {"version": str, "layout_name": str, "vendor": str, "rows": int,
+                "keys": list, "long_press": list}
+
+def _schema_issues(obj) -> List[Issue]:
+    if not isinstance(obj, dict):
+        return [("error", "not_object", "раскладка должна быть JSON-объектом")]
+    if not obj:
+        return [("warning", "empty", "пустой шаблон {}")]
+    out: List[Issue] = []
+    if "keys" not in obj:
+        out.append(("error", "missing_field", "нет поля keys"))
+    for field, typ in SCHEMA_TYPES.items():
+        if field in obj and not isinstance(obj[field], typ):
+            out.append(("error", "bad_type", f"{field}: ожидали {typ.__name__}"))
+    for i, k in enumerate(obj.get("keys") if isinstance(obj.get("keys"), list) else []):
+        if not isinstance(k, dict):
+            out.append(("error", "bad_key", f"keys[{i}]: не объект")); continue
+        if not isinstance(k.get("label"), str) or not norm_label(k["label"]):
+            out.append(("error", "bad_key", f"keys[{i}]: пустой label"))
+        for f in ("row", "column"):
+            if not isinstance(k.get(f), int) or isinstance(k.get(f), bool) or k[f] < 0:
+                out.append(("error", "bad_key", f"keys[{i}]: {f} должен быть целым ≥ 0"))
+        if "alternates" in k and not isinstance(k["alternates"], list):
+            out.append(("error", "bad_type", f"keys[{i}].alternates: ожидали list"))
+    for i, lp in enumerate(obj.get("long_press") if isinstance(obj.get("long_press"), list) else []):
+        if not isinstance(lp, dict) or not isinstance(lp.get("key"), str) \
+                or not isinstance(lp.get("alternates"), list):
+            out.append(("error", "bad_long_press", f"long_press[{i}]: ожидали {{key, alternates: [...]}}"))
+    return out
+
+def validate_layout(obj, alphabet: Iterable[str] = (),
+                    mapping: Optional[Dict[str, Iterable[str]]] = None,
+                    base: Optional[dict] = None) -> List[Issue]:
+    """
+    Ошибки схемы и позиций — error; недостающие буквы алфавита и недостижимые
+    варианты маппинга (с учётом наложения на базу и доп. long-press) — warning.
+    У неполной раскладки буквы, которые набираются на одной базе, но вытеснены клавишами
+    шаблона при наложении, — info overlay_displaced (следствие наложения, не дефект файла).
+    """
+    issues = _schema_issues(obj)
+    if any(level == "error" for level, _, _ in issues):
+        return issues
+
+    seen_pos: Dict[Tuple[int, int], str] = {}
+    seen_lab: Dict[str, Tuple[int, int]] = {}
+    rows = obj.get("rows")
+    for lab, r, c in _valid_keys(obj):
+        if (r, c) in seen_pos:
+            issues.append(("error", "duplicate_position",
+                           f"{lab} и {seen_pos[(r, c)]} на одной позиции row={r}, column={c}"))
+        else:
+            seen_pos[(r, c)] = lab
+        if lab in seen_lab:
+            issues.append(("warning", "duplicate_label", f"{lab} встречается дважды"))
+        seen_lab.setdefault(lab, (r, c))
+        if isinstance(rows, int) and r > rows:
+            issues.append(("warning", "row_out_of_range", f"{lab}: row={r} больше rows={rows}"))
+
+    layout = compile_layout(obj, extra_long_press=mapping, base=base)
+    for lp in obj.get("long_press") or []:
+        k = norm_label(lp["key"])
+        if k and k not in layout.key_index:
+            issues.append(("warning", "unknown_long_press_key", f"long_press для отсутствующей клавиши {k}"))
+    # неполная раскладка: что набирается на одной базе, но потеряно при наложении — info
+    base_only = None
+    if len(_valid_keys(obj)) < MIN_FULL_KEYS:
+        base_only = compile_layout(base if base is not None else load_layout(BASE_LAYOUT),
+                                   extra_long_press=mapping)
+    displaced = lambda ch: base_only is not None and base_only.strokes(ch) is not None
+
+    missing = [ch for ch in dict.fromkeys(norm_label(a) for a in alphabet) if ch and layout.strokes(ch) is None]
+    lost = [ch for ch in missing if displaced(ch)]
+    if lost:
+        issues.append(("info", "overlay_displaced",
+                       "буквы базовой раскладки вытеснены клавишами шаблона: " + " ".join(lost)))
+    missing = [ch for ch in missing if ch not in lost]
+    if missing:
+        issues.append(("warning", "missing_letters", "не набираются буквы алфавита: " + " ".join(missing)))
+    for k, alts in (mapping or {}).items():
+        k = norm_label(k)
+        alts = [a for a in (norm_label(x) for x in alts) if a]
+        if k not in layout.key_index:
+            level, code = ("info", "overlay_displaced") if displaced(k) else ("warning", "unreachable_variant")
+            issues.append((level, code, f"база {k} отсутствует в раскладке: " + " ".join(alts)))
+            continue
+        bad = [a for a in alts if layout.strokes(a) is None]
+        lost = [a for a in bad if displaced(a)]
+        if lost:
+            issues.append(("info", "overlay_displaced", f"{k}: вытеснены клавишами шаблона " + " ".join(lost)))
+        bad = [a for a in bad if a not in lost]
+        if bad:
+            issues.append(("warning", "unreachable_variant", f"{k}: не набираются " + " ".join(bad)))
+    return issues
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def compile_cached(path: Path, name: str = "",
+                   extra_long_press: Optional[Dict[str, Iterable[str]]] = None,
+                   base_path: Path = BASE_LAYOUT) -> CompiledLayout:
+    """
+    compile_layout с кэшем по хэшу: ключ — файл раскладки, файл базы, доп. long-press
+    и CACHE_VERSION. Ошибки схемы → ValueError (кэш не пишется).
+    """
+    extra = {norm_label(k): [norm_label(a) for a in v] for k, v in (extra_long_press or {}).items()}
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}\0{name}\0".encode("utf-8"))
+    h.update(Path(path).read_bytes())
+    h.update(b"\0" + file_hash(base_path).encode("ascii"))
+    h.update(b"\0" + json.dumps(extra, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    cache = CACHE_DIR / f"{h.hexdigest()}.json"
+
+    if cache.exists():
+        try:
+            c = json.loads(cache.read_text(encoding="utf-8"))
+            return CompiledLayout(c["name"], [tuple(k) for k in c["keys"]], c["long_press"])
+        except (ValueError, KeyError, TypeError):
+            pass  # битый кэш — перекомпилируем
+
+    obj = load_layout(path) if Path(path).stat().st_size else {}
+    errors = [msg for level, _, msg in _schema_issues(obj) if level == "error"]
+    if errors:
+        raise ValueError(f"{path}: " + "; ".join(errors))
+    base = load_layout(base_path)
+    layout = compile_layout(obj, name, extra_long_press=extra, base=base)
+
+    long_press = {layout.labels[k]: alts for k, alts in layout.popups.items()}
+    compiled = {
+        "name": layout.name,
+        "source": str(path),
+        "keys": [[lab, int(r), int(c)] for lab, r, c in zip(layout.labels, layout.rows, layout.cols)],
+        "long_press": long_press,
+        "index": {ch: list(v) for ch, v in layout.index().items()},
+    }
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(compiled, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, cache)
+    return layout
+
+class CostTable:
+    """
+    Стоимость набора каждого варианта алфавита на раскладке, в виде векторов длины V:
+      events[v]      — число нажатий
+      lp_overhead[v] — доплата за long-press и слоты
+      intra[v]       — перемещение внутри варианта (для последовательностей)
+      first[v], last[v] — первая и последняя клавиша (для перемещений между буквами)
+      ok[v]          — набирается ли вариант вообще
+      time_within[v] — время (мс) внутри варианта по TimingModel; между буквами — timing.T
+    """
+
+    def __init__(self, layout: CompiledLayout, alphabet: List[str],
+                 timing: Optional[TimingModel] = None):
+        D = layout.distances()
+        self.timing = timing or TimingModel(layout)
+        V = len(alphabet)
+        self.layout = layout
+        self.alphabet = alphabet
+        self.D = D
+        self.events = np.zeros(V)
+        self.lp_overhead = np.zeros(V)
+        self.longpresses = np.zeros(V)
+        self.intra = np.zeros(V)
+        self.first = np.zeros(V, dtype=np.int64)
+        self.last = np.zeros(V, dtype=np.int64)
+        self.ok = np.zeros(V, dtype=bool)
+        self.time_within = np.zeros(V)
+        for j, var in enumerate(alphabet):
+            seq = layout.strokes(var)
+            if not seq: continue
+            self.ok[j] = True
+            self.events[j] = len(seq)
+            self.longpresses[j] = sum(1 for _, s in seq if s > 0)
+            self.lp_overhead[j] = sum(LONG_PRESS_COST + SLOT_COST * (s - 1) for _, s in seq if s > 0)
+            self.intra[j] = sum(D[a[0], b[0]] for a, b in zip(seq, seq[1:]))
+            self.first[j], self.last[j] = seq[0][0], seq[-1][0]
+            self.time_within[j] = self.timing.strokes_ms(seq)
+
+    def score(self, P: np.ndarray, bigrams: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        P[L, V] — частоты вариантов (строки — языки). Без биграмм перемещение между
+        буквами оценивается в предположении независимости: p_lastᵀ · D · p_first.
+        bigrams[V, V] (для одной строки P) — совместные частоты соседних вариантов.
+        Все величины — на одну букву текста, нормированы на набираемую часть.
+        time_ms — та же схема с матрицей времени: lookup-and-sum по биграммам.
+        """
+        P = np.atleast_2d(P)
+        Pok = P * self.ok
+        coverage = Pok.sum(axis=1)
+        Q = Pok / np.where(coverage > 0, coverage, 1.0)[:, None]
+
+        K = self.layout.n_keys
+        Fk = np.zeros((len(self.alphabet), K)); Fk[np.arange(len(self.alphabet)), self.first] = self.ok
+        Lk = np.zeros((len(self.alphabet), K)); Lk[np.arange(len(self.alphabet)), self.last] = self.ok
+        T = self.timing.T
+        if bigrams is not None:
+            B = bigrams * np.outer(self.ok, self.ok)
+            B = B / (B.sum() or 1.0)
+            between = np.array([(B * (Lk @ self.D @ Fk.T)).sum()])
+            between_ms = np.array([(B * (Lk @ T @ Fk.T)).sum()])
+        else:
+            between = np.einsum("lk,km,lm->l", Q @ Lk, self.D, Q @ Fk)
+            between_ms = np.einsum("lk,km,lm->l", Q @ Lk, T, Q @ Fk)
+
+        keystrokes = Q @ self.events
+        lp = Q @ self.lp_overhead
+        travel = Q @ self.intra + between
+        return {
+            "coverage": coverage,
+            "keystrokes": keystrokes,
+            "longpress_rate": Q @ self.longpresses,
+            "longpress_overhead": lp,
+            "travel": travel,
+            "cost": TAP_COST * keystrokes + lp + TRAVEL_COST * travel,
+            "time_ms": Q @ self.time_within + between_ms,
+        }
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/normalization.py
+#
+# Общий модуль: декларативная нормализация текста и вариантов по правилам
+# data/normalization_rules.json (наборы rule_sets; языку — список наборов в languages, иначе default).
+#
+# Порядок: NFC → upper() → chars → cyrillic_context → sequences → (только варианты) homoglyphs
+#          → collapse_variants.
+#   chars       — посимвольные замены; применяются цепочкой str.replace по ключам, которые есть
+#                 в тексте: на кириллице это ~1 ГБ/с против ~10 Мсимв/с у str.translate со словарём
+#                 (таблица мала, а translate уходит в медленный путь на каждом не-ASCII символе).
+#                 Поэтому значение не может содержать ключ (проверяется при компиляции);
+#   cyrillic_context — замены символа только рядом с кириллической буквой (слева или справа):
+#                 латинская I вместо палочки («КIЭ» → «КӀЭ»), но «IPHONE», «WINDOWS», «KI» не трогаем;
+#                 регулярка с просмотром назад/вперёд, запускается, только если символ есть в тексте;
+#   sequences   — многосимвольные замены («К1» → «КӀ»): автомат — один regex из ключей
+#                 (длинные первыми, самое левое и длинное совпадение), замена по словарю;
+#                 запускается, только если в тексте есть последний символ какого-либо ключа;
+#   homoglyphs  — латинские двойники → кириллица (str.translate: варианты короткие), только
+#                 в вариантах маппингов и частот и только если после замены в варианте не остаётся
+#                 латиницы («C’» → «С’», одиночная «I» → «Ӏ»); латинские слова корпуса — законный
+#                 текст, их не трогаем (поэтому латиница не может быть ключом chars);
+#   collapse_variants — вариант частот, содержащий символ, сводится к нему (ᵸ: Аᵸ → ᵸ, бывший
+#                 canonicalize_variant из 04); 03 хранит последовательности и передаёт collapse=False.
+# Если в тексте нет ни одного ключа, цена нормализации — NFC, upper() и несколько поисков подстроки.
+#
+# Правила компилируются один раз на язык (for_language); Normalizer.signature — хэш правил
+# языка, входит в подписи кэшей корпусных счётчиков (13).
+# Применяется одинаково: 03 (маппинги), 04 (частоты), 12 и 13 (счёт по корпусам).
+
+import hashlib
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from tolerant_json import load_json
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RULES_PATH    = ROOT / "data/normalization_rules.json"
+RULES_VERSION = 2   # менять при изменении семантики правил
+CYRILLIC      = "[\u0400-\u052F\u1C80-\u1C8F\u2DE0-\u2DFF\uA640-\uA69F]"   # блоки кириллицы
+
+def _nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", s).upper()
+
+def _is_latin(ch: str) -> bool:
+    return unicodedata.name(ch, "").startswith("LATIN")
+
+def has_letter(s: str) -> bool:
+    """Есть ли в строке буква (категория L*)."""
+    return any(unicodedata.category(ch).startswith("L") for ch in s)
+
+def has_latin(s: str) -> bool:
+    """Есть ли в строке латиница (имя Unicode LATIN …)."""
+    return any(_is_latin(ch) for ch in s)
+
+class Normalizer:
+    """Скомпилированные правила одного языка: text() — для корпусов, variant() — для вариантов."""
+
+    def __init__(self, chars: Dict[str, str], sequences: Dict[str, str],
+                 homoglyphs: Dict[str, str], collapse: List[str], context: Dict[str, str] = None):
+        self.chars = sorted(self._char_rules(chars, "chars").items())
+        for src, dst in self.chars:
+            if any(k in dst for k, _ in self.chars):
+                raise ValueError(f"{RULES_PATH.name}: значение chars содержит ключ: {dst!r}")
+            if _is_latin(src):
+                raise ValueError(f"{RULES_PATH.name}: латиница {src!r} в chars испортит латинские слова "
+                                 f"корпуса — её место в homoglyphs или cyrillic_context")
+        self.context = sorted(self._char_rules(context or {}, "cyrillic_context").items())
+        self._ctx_re = {src: re.compile(f"(?<={CYRILLIC}){re.escape(src)}|{re.escape(src)}(?={CYRILLIC})")
+                        for src, _ in self.context}
+        self.sequences = {self._apply_chars(_nfc_upper(k)): _nfc_upper(v) for k, v in sequences.items()}
+        self.homoglyphs = str.maketrans(self._char_rules(homoglyphs, "homoglyphs"))
+        self.collapse = [_nfc_upper(c) for c in collapse]
+
+        keys = sorted(self.sequences, key=lambda k: (-len(k), k))
+        self._seq_re = re.compile("|".join(map(re.escape, keys))) if keys else None
+        self._seq_tails = sorted({k[-1] for k in keys})
+
+        spec = [RULES_VERSION, self.chars, self.context, sorted(self.sequences.items()),
+                sorted(self.homoglyphs.items()), self.collapse]
+        self.signature = hashlib.sha256(json.dumps(spec, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _char_rules(rules: Dict[str, str], section: str) -> Dict[str, str]:
+        out = {}
+        for k, v in rules.items():
+            key = _nfc_upper(k)
+            if len(key) != 1:
+                raise ValueError(f"{RULES_PATH.name}: ключ {section} должен быть одним символом: {k!r}")
+            out[key] = _nfc_upper(v)
+        return out
+
+    def _apply_chars(self, s: str) -> str:
+        for src, dst in self.chars:
+            if src in s:
+                s = s.replace(src, dst)
+        return s
+
+    def text(self, s: str) -> str:
+        """NFC, upper() и замены chars/cyrillic_context/sequences."""
+        s = self._apply_chars(_nfc_upper(s))
+        for src, dst in self.context:
+            if src in s:
+                s = self._ctx_re[src].sub(dst, s)
+        if self._seq_re is not None and any(c in s for c in self._seq_tails):
+            s = self._seq_re.sub(lambda m: self.sequences[m.group()], s)
+        return s
+
+    def variant(self, s: str, collapse: bool = True) -> str:
+        """Вариант маппинга или строки частот: text() + homoglyphs (+ collapse_variants)."""
+        v = self.text((s or "").strip())
+        if self.homoglyphs and has_latin(v):
+            w = v.translate(self.homoglyphs)
+            if not has_latin(w):
+                v = w
+        if collapse:
+            for c in self.collapse:
+                if c in v:
+                    return c
+        return v
+
+@lru_cache(maxsize=None)
+def _rules() -> dict:
+    if not RULES_PATH.exists():
+        return {}
+    obj, _ = load_json(RULES_PATH)
+    if not isinstance(obj, dict):
+        raise ValueError(f"{RULES_PATH.name}: ожидали объект")
+    return obj
+
+def rule_sets(lang: str) -> List[str]:
+    rules = _rules()
+    return list(rules.get("languages", {}).get(lang, rules.get("default", [])))
+
+@lru_cache(maxsize=None)
+def for_language(lang: str) -> Normalizer:
+    """Скомпилированные правила языка (наборы из languages[lang] или default, по порядку)."""
+    rules = _rules()
+    merged: Tuple[Dict[str, str], ...] = ({}, {}, {}, {})
+    for name in rule_sets(lang):
+        rs = rules.get("rule_sets", {}).get(name)
+        if rs is None:
+            raise ValueError(f"{RULES_PATH.name}: неизвестный набор правил '{name}' для языка {lang}")
+        for part, section in zip(merged, ("chars", "sequences", "homoglyphs", "cyrillic_context")):
+            part.update(rs.get(section, {}))
+    chars, sequences, homoglyphs, context = merged
+    return Normalizer(chars, sequences, homoglyphs, rules.get("collapse_variants", []), context)
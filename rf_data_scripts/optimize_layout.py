@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/optimize_layout.py
+#
+# Локальный поиск раскладки: перестановка клавиш keyboard/<lang>_key_default.json
+# по частотам языка (нужен numpy). Альтернативы long-press едут вместе со своей клавишей.
+#
+# Цель (меньше — лучше), в «тапах» на букву, как в keyboard_layout:
+#   f(p) = TRAVEL_COST · Σ_ij a_ij · D[p(i), p(j)]  +  CENTRE_COST · Σ_i u_i · c[p(i)]
+#     a_ij — поток переходов между клавишами i и j (биграммы или независимость букв,
+#            плюс переходы внутри последовательностей КЪ/ДЖ), симметризованный;
+#     u_i  — доля нажатий клавиши i; c — расстояние позиции от центра клавиатуры
+#            («частые буквы — в центр», keyboard/README.md); D — расстояния между позициями.
+#
+# Это квадратичная задача о назначениях, поэтому изменение цели при обмене двух клавиш
+# хранится в матрице Δ (Taillard, 1991): оценка кандидата — O(1) чтение Δ[r, s],
+# после принятого обмена Δ обновляется за O(n²) одной векторной операцией.
+#
+# Методы:
+#   --method anneal   имитация отжига (геометрическое охлаждение T0 → T1)
+#   --method tabu     робастный табу-поиск: на каждом шаге лучший нетабуированный обмен
+#   --method tempering  параллельный отжиг: цепочки при разных T в отдельных процессах,
+#                     обмен состояниями через shared_memory, контрольная точка (--resume)
+#
+# Закреплённые клавиши (--pin "ЙЦУКЕН", --pin-russian) не двигаются.
+# Результат — JSON в той же схеме (version, layout_name, vendor, rows, keys, long_press).
+#
+# Запуск:
+#   python3 rf_data_scripts/optimize_layout.py tyv --iters 2000000 --pin-russian
+#   python3 rf_data_scripts/optimize_layout.py tyv --method tempering --chains 16 --rounds 500 --resume
+
+import argparse
+import copy
+import csv
+import json
+import multiprocessing as mp
+import os
+import time
+import unicodedata
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from keyboard_layout import BASE_LAYOUT, TRAVEL_COST, CompiledLayout, compile_layout, load_layout
+from segmentation import graphemes
+import vendors
+from vendor_files import load_mapping
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+FREQ_CSV = Path("rf_summaries/frequencies_by_language.csv")
+OUT_DIR  = Path("rf_results/layouts")
+
+CENTRE_COST = 0.05  # за одну ширину клавиши от центра, на нажатие
+RUSSIAN = "АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ"
+RNG_CHUNK = 65536   # случайные числа генерируются блоками
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("lang", help="Код языка (data/<lang>/...)")
+    ap.add_argument("--layout", default=None, help="Путь к раскладке (по умолчанию keyboard/<lang>_key_default.json)")
+    ap.add_argument("--method", choices=["anneal", "tabu", "tempering"], default="anneal")
+    ap.add_argument("--iters", type=int, default=1_000_000, help="Число кандидатов-обменов (anneal) или шагов (tabu)")
+    ap.add_argument("--t0", type=float, default=0.01, help="Начальная температура отжига")
+    ap.add_argument("--t1", type=float, default=None, help="Конечная температура отжига (1e-5; tempering — самая холодная цепочка, t0/100)")
+    ap.add_argument("--chains", type=int, default=8, help="tempering: число цепочек (температур)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="tempering: число процессов")
+    ap.add_argument("--rounds", type=int, default=200, help="tempering: раундов обмена")
+    ap.add_argument("--sweep", type=int, default=5000, help="tempering: кандидатов на цепочку за раунд")
+    ap.add_argument("--checkpoint", default=None, help="tempering: контрольная точка (по умолчанию rf_results/layouts/<lang>_tempering.json)")
+    ap.add_argument("--checkpoint-every", type=int, default=10, help="tempering: сохранять каждые N раундов (0 — нет)")
+    ap.add_argument("--resume", action="store_true", help="tempering: продолжить из контрольной точки")
+    ap.add_argument("--pin", default="", help="Буквы, которые нельзя двигать (например, ЙЦУКЕН)")
+    ap.add_argument("--pin-russian", action="store_true", help="Закрепить все буквы русского алфавита")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default=None, help="Куда записать JSON (по умолчанию rf_results/layouts/<lang>_key_optimized.json)")
+    return ap.parse_args()
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+def language_frequencies(lang: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for r in _read_csv_flex(FREQ_CSV):
+        if (r.get("lang_code") or "").strip() != lang: continue
+        var, c = nfc_upper(r.get("variant", "")), _to_float(r.get("C_i"))
+        if var and c > 0:
+            out[var] = out.get(var, 0.0) + c
+    return out
+
+def language_bigrams(lang: str) -> Dict[tuple, float]:
+    out: Dict[tuple, float] = {}
+    rows = [r for path in vendors.vendor_paths(lang, "frequencies/*bigram*.csv") for r in _read_csv_flex(path)]
+    for r in rows:
+        row = {(k or "").strip().lower(): v for k, v in r.items()}
+        pair = graphemes(nfc_upper(row.get("bigram") or row.get("pair") or ""))
+        c = _to_float(row.get("frequency") or row.get("count"))
+        if len(pair) == 2 and c > 0:
+            out[(pair[0], pair[1])] = out.get((pair[0], pair[1]), 0.0) + c
+    return out
+
+class SwapProblem:
+    """
+    КЗН с симметричными a (потоки) и b (расстояния), нулевой диагональю и линейной частью u·c.
+    p[i] — позиция клавиши i. Δ[r, s] — изменение цели при обмене позиций клавиш r и s.
+    """
+
+    def __init__(self, a: np.ndarray, b: np.ndarray, u: np.ndarray, c: np.ndarray,
+                 p: Optional[np.ndarray] = None):
+        self.a, self.b, self.u, self.c = a, b, u, c
+        self.n = len(u)
+        self.p = np.arange(self.n) if p is None else p.copy()
+        self.Bp = b[np.ix_(self.p, self.p)]      # Bp[i, j] = b[p(i), p(j)]
+        self.value = self.objective()
+        self.delta = self._full_delta()
+
+    def objective(self, p: Optional[np.ndarray] = None) -> float:
+        p = self.p if p is None else p
+        return float((self.a * self.b[np.ix_(p, p)]).sum() + self.u @ self.c[p])
+
+    def _full_delta(self) -> np.ndarray:
+        a, Bp = self.a, self.Bp
+        X = Bp @ a                                 # X[r, s] = Σ_k Bp[r, k] a[k, s]
+        d = np.einsum("ij,ij->i", a, Bp)           # d[r] = Σ_k a[r, k] Bp[r, k]
+        quad = 2.0 * (X + X.T - d[:, None] - d[None, :]) + 4.0 * a * Bp
+        cp = self.c[self.p]
+        lin = (self.u[:, None] - self.u[None, :]) * (cp[None, :] - cp[:, None])
+        delta = quad + lin
+        np.fill_diagonal(delta, 0.0)
+        return delta
+
+    def _rows_delta(self, rows: List[int]) -> np.ndarray:
+        """Точный пересчёт строк Δ для клавиш rows, O(n) на строку."""
+        a, Bp = self.a, self.Bp
+        cp = self.c[self.p]
+        d = np.einsum("ij,ij->i", a, Bp)
+        ar, Br = a[rows], Bp[rows]
+        quad = 2.0 * (Br @ a + ar @ Bp - d[rows, None] - d[None, :]) + 4.0 * ar * Br
+        out = quad + (self.u[rows, None] - self.u[None, :]) * (cp[None, :] - cp[rows, None])
+        out[np.arange(len(rows)), rows] = 0.0
+        return out
+
+    def apply(self, r: int, s: int) -> None:
+        """Обмен позиций клавиш r и s с O(n²) обновлением Δ (Taillard)."""
+        self.value += self.delta[r, s]
+        self.p[[r, s]] = self.p[[s, r]]
+        Bp = self.Bp
+        Bp[[r, s], :] = Bp[[s, r], :]
+        Bp[:, [r, s]] = Bp[:, [s, r]]
+        # пары, не затрагивающие r и s: O(1) поправка на каждую
+        alpha = self.a[:, r] - self.a[:, s]
+        beta = Bp[:, r] - Bp[:, s]
+        self.delta -= 2.0 * (alpha[:, None] - alpha[None, :]) * (beta[:, None] - beta[None, :])
+        # строки/столбцы r и s — пересчитываем точно
+        fresh = self._rows_delta([r, s])
+        self.delta[[r, s], :] = fresh
+        self.delta[:, [r, s]] = fresh.T
+
+def build_problem(layout: CompiledLayout, freqs: Dict[str, float],
+                  bigrams: Dict[tuple, float]) -> SwapProblem:
+    K = layout.n_keys
+    total = sum(freqs.values()) or 1.0
+    u = np.zeros(K)
+    A = np.zeros((K, K))
+    first = np.zeros(K)
+    last = np.zeros(K)
+    first_of: Dict[str, int] = {}
+    last_of: Dict[str, int] = {}
+    for var, cnt in freqs.items():
+        seq = layout.strokes(var)
+        if not seq: continue
+        q = cnt / total
+        for k, _ in seq:
+            u[k] += q
+        for (k1, _), (k2, _) in zip(seq, seq[1:]):
+            A[k1, k2] += q
+        first[seq[0][0]] += q; last[seq[-1][0]] += q
+        first_of[var], last_of[var] = seq[0][0], seq[-1][0]
+
+    if bigrams:
+        btot = sum(bigrams.values())
+        for (x, y), c in bigrams.items():
+            if x in last_of and y in first_of:
+                A[last_of[x], first_of[y]] += c / btot
+    else:
+        A += np.outer(last, first) / (first.sum() or 1.0)
+
+    a = TRAVEL_COST * (A + A.T) / 2.0
+    np.fill_diagonal(a, 0.0)
+    b = layout.distances()
+    centre = layout.xy.mean(axis=0)
+    c = CENTRE_COST * np.sqrt(((layout.xy - centre) ** 2).sum(axis=1))
+    return SwapProblem(a, b, u, c)
+
+def anneal(prob: SwapProblem, free: np.ndarray, iters: int, t0: float, t1: float,
+           rng: np.random.Generator) -> np.ndarray:
+    best_p, best_v = prob.p.copy(), prob.value
+    m = len(free)
+    if m < 2:
+        return best_p
+    cool = (t1 / t0) ** (1.0 / max(1, iters))
+    T = t0
+    delta = prob.delta
+    done = 0
+    while done < iters:
+        n = min(RNG_CHUNK, iters - done)
+        i = rng.integers(0, m, size=n)
+        j = rng.integers(0, m - 1, size=n)
+        j += j >= i                                    # второй индекс ≠ первому
+        rs, ss = free[i].tolist(), free[j].tolist()
+        logu = np.log(rng.random(n)).tolist()
+        for t in range(n):
+            r, s = rs[t], ss[t]
+            d = delta.item(r, s)
+            if d <= 0.0 or logu[t] < -d / T:
+                prob.apply(r, s)
+                delta = prob.delta
+                if prob.value < best_v - 1e-12:
+                    best_v, best_p = prob.value, prob.p.copy()
+            T *= cool
+        done += n
+    return best_p
+
+def tabu(prob: SwapProblem, free: np.ndarray, iters: int, rng: np.random.Generator) -> np.ndarray:
+    best_p, best_v = prob.p.copy(), prob.value
+    m = len(free)
+    if m < 2:
+        return best_p
+    mask = np.zeros((prob.n, prob.n), dtype=bool)
+    mask[np.ix_(free, free)] = True
+    np.fill_diagonal(mask, False)
+    mask = np.triu(mask)
+    tabu_until = np.zeros((prob.n, prob.n), dtype=np.int64)  # [клавиша, позиция] → шаг
+    for it in range(1, iters + 1):
+        d = prob.delta
+        p = prob.p
+        # обмен r↔s табуирован, если обе клавиши недавно покидали новые позиции
+        forbidden = (tabu_until[np.arange(prob.n)[:, None], p[None, :]] > it) & \
+                    (tabu_until[np.arange(prob.n)[None, :], p[:, None]] > it)
+        aspir = prob.value + d < best_v - 1e-12
+        cand = np.where(mask & (~forbidden | aspir), d, np.inf)
+        r, s = np.unravel_index(np.argmin(cand), cand.shape)
+        if not np.isfinite(cand[r, s]):
+            continue
+        tenure = int(rng.integers(int(0.9 * m), int(1.1 * m) + 2))
+        tabu_until[r, p[r]] = it + tenure
+        tabu_until[s, p[s]] = it + tenure
+        prob.apply(int(r), int(s))
+        if prob.value < best_v - 1e-12:
+            best_v, best_p = prob.value, prob.p.copy()
+    return best_p
+
+# ----------------------------- параллельный отжиг (parallel tempering) -----------------------------
+#
+# C цепочек на лестнице температур t0 (горячая) … t1 (холодная) в W процессах.
+# Состояния лежат в одном блоке shared_memory: perms[C, n], values[C], best_perms[C, n], best_values[C].
+# Раунд: каждый процесс прогоняет --sweep кандидатов по своим цепочкам при постоянной T,
+# затем главный процесс меняет состояния соседних температур (критерий Метрополиса).
+# Случайность зависит только от (seed, раунд, цепочка) — результат не зависит от числа
+# процессов и от того, продолжен ли поиск из контрольной точки.
+# drift — максимум по раундам и цепочкам |objective() − инкрементальное значение| в конце раунда
+# (после раунда значение цепочки заменяется точным, поэтому погрешность не копится между раундами).
+
+def _shared_views(buf, C: int, n: int):
+    perms = np.ndarray((C, n), dtype=np.int64, buffer=buf, offset=0)
+    values = np.ndarray((C,), dtype=np.float64, buffer=buf, offset=C * n * 8)
+    best_perms = np.ndarray((C, n), dtype=np.int64, buffer=buf, offset=C * n * 8 + C * 8)
+    best_values = np.ndarray((C,), dtype=np.float64, buffer=buf, offset=2 * C * n * 8 + C * 8)
+    return perms, values, best_perms, best_values
+
+def _chain_worker(shm_name: str, C: int, arrays: tuple, free: np.ndarray, temps: List[float],
+                  slots: List[int], seed: int, inbox, outbox) -> None:
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        perms, values, best_perms, best_values = _shared_views(shm.buf, C, len(arrays[2]))
+        while True:
+            msg = inbox.get()
+            if msg is None:
+                break
+            rnd, sweep = msg
+            drift = 0.0
+            for k in slots:
+                prob = SwapProblem(*arrays, p=perms[k])
+                best = anneal(prob, free, sweep, temps[k], temps[k], np.random.default_rng([seed, rnd, k]))
+                perms[k] = prob.p
+                values[k] = prob.objective()          # точное значение, без накопленной погрешности
+                drift = max(drift, abs(values[k] - prob.value))   # погрешность инкрементов за раунд
+                bv = prob.objective(best)
+                if bv < best_values[k]:
+                    best_perms[k], best_values[k] = best, bv
+            outbox.put((rnd, drift))
+        del perms, values, best_perms, best_values
+    finally:
+        shm.close()
+
+def _exchange(perms: np.ndarray, values: np.ndarray, temps: List[float], rnd: int, seed: int) -> int:
+    """Обмен состояниями соседних температур; чётные/нечётные пары чередуются по раундам."""
+    rng = np.random.default_rng([seed, rnd])
+    swapped = 0
+    for k in range(rnd % 2, len(temps) - 1, 2):
+        x = (1.0 / temps[k] - 1.0 / temps[k + 1]) * (values[k] - values[k + 1])
+        if x >= 0.0 or rng.random() < np.exp(x):
+            perms[[k, k + 1]] = perms[[k + 1, k]]
+            values[[k, k + 1]] = values[[k + 1, k]]
+            swapped += 1
+    return swapped
+
+def _load_checkpoint(path: Path, labels: List[str], C: int, seed: int) -> Optional[dict]:
+    if not path.exists():
+        return None
+    ck = json.loads(path.read_text(encoding="utf-8"))
+    if ck.get("labels") != labels or len(ck.get("perms") or []) != C or ck.get("seed") != seed:
+        raise ValueError(f"{path}: контрольная точка от другой раскладки/числа цепочек/seed")
+    return ck
+
+def _save_checkpoint(path: Path, labels: List[str], seed: int, rnd: int, temps: List[float],
+                     perms, values, best_perms, best_values) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({
+        "labels": labels, "seed": seed, "round": rnd, "temps": temps,
+        "perms": perms.tolist(), "values": values.tolist(),
+        "best_perms": best_perms.tolist(), "best_values": best_values.tolist(),
+    }, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+def tempering(prob: SwapProblem, free: np.ndarray, labels: List[str], chains: int, workers: int,
+              rounds: int, sweep: int, t0: float, t1: float, seed: int,
+              checkpoint: Path, every: int, resume: bool) -> Tuple[np.ndarray, int, float]:
+    C, n = max(2, chains), prob.n
+    temps = [float(t) for t in np.geomspace(t1, t0, C)]   # 0 — самая холодная
+    workers = max(1, min(workers, C))
+
+    shm = shared_memory.SharedMemory(create=True, size=2 * C * n * 8 + 2 * C * 8)
+    perms, values, best_perms, best_values = _shared_views(shm.buf, C, n)
+    ck = _load_checkpoint(checkpoint, labels, C, seed) if resume else None
+    if ck:
+        perms[:], values[:] = ck["perms"], ck["values"]
+        best_perms[:], best_values[:] = ck["best_perms"], ck["best_values"]
+        start = int(ck["round"])
+        print(f"   resume: {checkpoint} (round {start}, best={best_values.min():.6f})")
+    else:
+        perms[:], values[:] = prob.p, prob.value
+        best_perms[:], best_values[:] = prob.p, prob.value
+        start = 0
+
+    ctx = mp.get_context()
+    inboxes = [ctx.Queue() for _ in range(workers)]
+    outbox = ctx.Queue()
+    arrays = (prob.a, prob.b, prob.u, prob.c)
+    procs = [ctx.Process(target=_chain_worker,
+                         args=(shm.name, C, arrays, free, temps, list(range(w, C, workers)),
+                               seed, inboxes[w], outbox), daemon=True)
+             for w in range(workers)]
+    try:
+        for pr in procs:
+            pr.start()
+        swapped, drift = 0, 0.0
+        for rnd in range(start, rounds):
+            for q in inboxes:
+                q.put((rnd, sweep))
+            for _ in procs:
+                drift = max(drift, outbox.get()[1])
+            swapped += _exchange(perms, values, temps, rnd, seed)
+            if every and ((rnd + 1) % every == 0 or rnd + 1 == rounds):
+                _save_checkpoint(checkpoint, labels, seed, rnd + 1, temps,
+                                 perms, values, best_perms, best_values)
+        for q in inboxes:
+            q.put(None)
+        for pr in procs:
+            pr.join()
+        done = max(0, rounds - start)
+        print(f"   tempering: chains={C} workers={workers} rounds={done} "
+              f"exchanges={swapped}/{done * (C // 2)} T=[{temps[0]:.1e}…{temps[-1]:.1e}]")
+        best_p = best_perms[int(np.argmin(best_values))].copy()
+    finally:
+        for pr in procs:
+            if pr.is_alive():
+                pr.terminate()
+        del perms, values, best_perms, best_values
+        shm.close()
+        shm.unlink()
+    prob.__init__(prob.a, prob.b, prob.u, prob.c, best_p)
+    return best_p, done * C * sweep, drift
+
+def layout_json(obj: dict, layout: CompiledLayout, p: np.ndarray, suffix: str) -> dict:
+    """Тот же JSON, но клавиша i стоит на бывшей позиции p[i]."""
+    out = copy.deepcopy(obj)
+    out["keys"] = [
+        {"label": layout.labels[i], "row": int(layout.rows[p[i]]), "column": int(layout.cols[p[i]])}
+        for i in sorted(range(layout.n_keys), key=lambda i: (layout.rows[p[i]], layout.cols[p[i]]))
+    ]
+    out["rows"] = max(int(obj.get("rows") or 0), int(layout.rows.max()))
+    out["layout_name"] = f"{obj.get('layout_name') or layout.name} ({suffix})"
+    return out
+
+def prepare(lang: str, layout_path: Optional[str]):
+    path = Path(layout_path) if layout_path else vendors.vendor_file(lang, f"keyboard/{lang}_key_default.json")
+    path = path or BASE_LAYOUT.relative_to(ROOT)
+    obj = load_layout(path)
+    extra = load_mapping(vendors.layout_mapping(lang, path))
+    layout = compile_layout(obj, lang, extra_long_press=extra)
+    freqs = language_frequencies(lang)
+    return path, obj, layout, freqs
+
+def free_keys(layout: CompiledLayout, pin: str, pin_russian: bool) -> np.ndarray:
+    pinned = set(nfc_upper(pin)) | (set(RUSSIAN) if pin_russian else set())
+    return np.array([i for i, lab in enumerate(layout.labels) if lab not in pinned], dtype=np.int64)
+
+def main():
+    args = parse_args()
+    if not FREQ_CSV.exists():
+        print(f"ERR: not found {FREQ_CSV}"); return
+    path, obj, layout, freqs = prepare(args.lang, args.layout)
+    if not freqs:
+        print(f"ERR: no frequencies for '{args.lang}' in {FREQ_CSV}"); return
+
+    prob = build_problem(layout, freqs, language_bigrams(args.lang))
+    free = free_keys(layout, args.pin, args.pin_russian)
+    start = prob.value
+    rng = np.random.default_rng(args.seed)
+
+    t0 = time.perf_counter()
+    if args.method == "anneal":
+        best_p = anneal(prob, free, args.iters, args.t0, args.t1 or 1e-5, rng)
+    elif args.method == "tabu":
+        best_p = tabu(prob, free, args.iters, rng)
+    else:
+        ckpt = Path(args.checkpoint) if args.checkpoint else OUT_DIR / f"{args.lang}_tempering.json"
+        best_p, args.iters, drift = tempering(prob, free, layout.labels, args.chains, args.workers,
+                                       args.rounds, args.sweep, args.t0, args.t1 or args.t0 / 100,
+                                       args.seed, ckpt, args.checkpoint_every, args.resume)
+    elapsed = time.perf_counter() - t0
+
+    if args.method != "tempering":
+        drift = abs(prob.objective() - prob.value)
+    final = SwapProblem(prob.a, prob.b, prob.u, prob.c, best_p)
+
+    out_path = Path(args.out) if args.out else OUT_DIR / f"{args.lang}_key_optimized.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(layout_json(obj, layout, best_p, "optimized"),
+                                   ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    rate = args.iters / elapsed if elapsed > 0 else float("inf")
+    unit = "steps" if args.method == "tabu" else "candidates"
+    print(f"[{args.lang}] layout={path} keys={layout.n_keys} free={len(free)}")
+    print(f"   objective: {start:.6f} → {final.value:.6f} ({(final.value / start - 1) * 100:+.2f}%)")
+    print(f"   {args.method}: {args.iters} {unit} in {elapsed:.2f}s ({rate * 60 / 1e6:.1f}M/min), drift={drift:.2e}")
+    print(f"OK: wrote {out_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/segmentation.py
+#
+# Общий модуль: разбиение строки на расширенные графемные кластеры по UAX #29
+# (правила GB3–GB13, GB999) для версии Unicode из unicodedata текущего Python.
+#
+# Свойство Grapheme_Cluster_Break хранится таблицей: один байт на кодовую точку
+# (bytearray 0x110000), строится из unicodedata.category и коротких списков ниже
+# (Prepend, Other_Grapheme_Extend, исключения SpacingMark, Extended_Pictographic) и
+# кэшируется в .cache/graphemes/gcb-<версия Unicode>-v<GCB_VERSION>.bin.
+#
+# Быстрый путь: строка из одних «простых» символов (печатный ASCII и кириллица без
+# combining — GCB=Other, плюс LF и TAB; между ними всегда граница) разбивается на
+# символы сразу, по SIMPLE_RE.fullmatch. В смешанном тексте автомат правил проходит только
+# по «сложным» участкам (COMPLEX_RE) с соседним простым символом слева (и справа после Prepend).
+#
+# graphemes(s)        — список кластеров (без нормализации: NFC делает вызывающий);
+# grapheme_count(s)   — их число;
+# complex_clusters(t) — только кластеры длиннее одной кодовой точки (для счётчиков корпусов:
+#                       одиночные символы дешевле считать по кодовым точкам).
+
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Iterator, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CACHE_DIR   = ROOT / ".cache/graphemes"
+GCB_VERSION = 1   # менять при изменении таблицы свойств
+
+# значения Grapheme_Cluster_Break (EXT_PICT — Other с Extended_Pictographic=Yes)
+(OTHER, CR, LF, CONTROL, EXTEND, ZWJ, RI, PREPEND, SPACINGMARK,
+ L, V, T, LV, LVT, EXT_PICT) = range(15)
+
+PREPEND_RANGES = [(0x0600, 0x0605), (0x06DD, 0x06DD), (0x070F, 0x070F), (0x0890, 0x0891),
+                  (0x08E2, 0x08E2), (0x0D4E, 0x0D4E), (0x110BD, 0x110BD), (0x110CD, 0x110CD),
+                  (0x111C2, 0x111C3), (0x1193F, 0x1193F), (0x11941, 0x11941), (0x11A3A, 0x11A3A),
+                  (0x11A84, 0x11A89), (0x11D46, 0x11D46)]
+# Other_Grapheme_Extend (Mc и др., которые считаются Extend), модификаторы эмодзи, теги
+EXTEND_RANGES = [(0x09BE, 0x09BE), (0x09D7, 0x09D7), (0x0B3E, 0x0B3E), (0x0B57, 0x0B57),
+                 (0x0BBE, 0x0BBE), (0x0BD7, 0x0BD7), (0x0CC2, 0x0CC2), (0x0CD5, 0x0CD6),
+                 (0x0D3E, 0x0D3E), (0x0D57, 0x0D57), (0x0DCF, 0x0DCF), (0x0DDF, 0x0DDF),
+                 (0x1B35, 0x1B35), (0x200C, 0x200C), (0x302E, 0x302F), (0xFF9E, 0xFF9F),
+                 (0x1133E, 0x1133E), (0x11357, 0x11357), (0x114B0, 0x114B0), (0x114BD, 0x114BD),
+                 (0x115AF, 0x115AF), (0x11930, 0x11930), (0x1D165, 0x1D165), (0x1D16E, 0x1D172),
+                 (0x1F3FB, 0x1F3FF), (0xE0020, 0xE007F)]
+# Mc, которые НЕ SpacingMark, и не-Mc, которые SpacingMark (ТХАЙ/ЛАОС SARA AM)
+NOT_SPACINGMARK = [(0x102B, 0x102C), (0x1038, 0x1038), (0x1062, 0x1064), (0x1067, 0x106D),
+                   (0x1083, 0x1083), (0x1087, 0x108C), (0x108F, 0x108F), (0x109A, 0x109C),
+                   (0x1A61, 0x1A61), (0x1A63, 0x1A64), (0xAA7B, 0xAA7B), (0xAA7D, 0xAA7D),
+                   (0x11720, 0x11721)]
+EXTRA_SPACINGMARK = [(0x0E33, 0x0E33), (0x0EB3, 0x0EB3)]
+EXT_PICT_RANGES = [
+    (0x00A9, 0x00A9), (0x00AE, 0x00AE), (0x203C, 0x203C), (0x2049, 0x2049), (0x2122, 0x2122),
+    (0x2139, 0x2139), (0x2194, 0x2199), (0x21A9, 0x21AA), (0x231A, 0x231B), (0x2328, 0x2328),
+    (0x2388, 0x2388), (0x23CF, 0x23CF), (0x23E9, 0x23F3), (0x23F8, 0x23FA), (0x24C2, 0x24C2),
+    (0x25AA, 0x25AB), (0x25B6, 0x25B6), (0x25C0, 0x25C0), (0x25FB, 0x25FE), (0x2600, 0x2605),
+    (0x2607, 0x2612), (0x2614, 0x2685), (0x2690, 0x2705), (0x2708, 0x2712), (0x2714, 0x2714),
+    (0x2716, 0x2716), (0x271D, 0x271D), (0x2721, 0x2721), (0x2728, 0x2728), (0x2733, 0x2734),
+    (0x2744, 0x2744), (0x2747, 0x2747), (0x274C, 0x274C), (0x274E, 0x274E), (0x2753, 0x2755),
+    (0x2757, 0x2757), (0x2763, 0x2767), (0x2795, 0x2797), (0x27A1, 0x27A1), (0x27B0, 0x27B0),
+    (0x27BF, 0x27BF), (0x2934, 0x2935), (0x2B05, 0x2B07), (0x2B1B, 0x2B1C), (0x2B50, 0x2B50),
+    (0x2B55, 0x2B55), (0x3030, 0x3030), (0x303D, 0x303D), (0x3297, 0x3297), (0x3299, 0x3299),
+    (0x1F000, 0x1F0FF), (0x1F10D, 0x1F10F), (0x1F12F, 0x1F12F), (0x1F16C, 0x1F171),
+    (0x1F17E, 0x1F17F), (0x1F18E, 0x1F18E), (0x1F191, 0x1F19A), (0x1F1AD, 0x1F1E5),
+    (0x1F201, 0x1F20F), (0x1F21A, 0x1F21A), (0x1F22F, 0x1F22F), (0x1F232, 0x1F23A),
+    (0x1F23C, 0x1F23F), (0x1F249, 0x1F3FA), (0x1F400, 0x1F53D), (0x1F546, 0x1F64F),
+    (0x1F680, 0x1F6FF), (0x1F774, 0x1F77F), (0x1F7D5, 0x1F7FF), (0x1F80C, 0x1F80F),
+    (0x1F848, 0x1F84F), (0x1F85A, 0x1F85F), (0x1F888, 0x1F88F), (0x1F8AE, 0x1F8FF),
+    (0x1F90C, 0x1F93A), (0x1F93C, 0x1F945), (0x1F947, 0x1FAFF), (0x1FC00, 0x1FFFD)]
+
+# за пределами этих областей назначенных символов с GCB ≠ Other нет
+SCAN_LIMITS = [(0, 0x32000), (0xE0000, 0xE1000)]
+
+SIMPLE = "\t\n -~Ѐ-҂Ҋ-ԯ"
+SIMPLE_RE  = re.compile(f"[{SIMPLE}]*")
+COMPLEX_RE = re.compile(f"[^{SIMPLE}]+")
+
+def _in(cp: int, ranges) -> bool:
+    return any(a <= cp <= b for a, b in ranges)
+
+def _property(cp: int) -> int:
+    if cp == 0x0D: return CR
+    if cp == 0x0A: return LF
+    if cp == 0x200D: return ZWJ
+    if _in(cp, PREPEND_RANGES): return PREPEND
+    if 0x1F1E6 <= cp <= 0x1F1FF: return RI
+    cat = unicodedata.category(chr(cp))
+    if cat in ("Mn", "Me") or _in(cp, EXTEND_RANGES): return EXTEND
+    if cat in ("Cc", "Cf", "Zl", "Zp", "Cs"): return CONTROL
+    if cat == "Cn" and (0xFFF0 <= cp <= 0xFFF8 or 0xE0000 <= cp <= 0xE0FFF or 0x2065 == cp):
+        return CONTROL
+    if 0x1100 <= cp <= 0x115F or 0xA960 <= cp <= 0xA97C: return L
+    if 0x1160 <= cp <= 0x11A7 or 0xD7B0 <= cp <= 0xD7C6: return V
+    if 0x11A8 <= cp <= 0x11FF or 0xD7CB <= cp <= 0xD7FB: return T
+    if 0xAC00 <= cp <= 0xD7A3: return LV if (cp - 0xAC00) % 28 == 0 else LVT
+    if (cat == "Mc" and not _in(cp, NOT_SPACINGMARK)) or _in(cp, EXTRA_SPACINGMARK):
+        return SPACINGMARK
+    if _in(cp, EXT_PICT_RANGES): return EXT_PICT
+    return OTHER
+
+def _build_table() -> bytearray:
+    table = bytearray(0x110000)
+    for lo, hi in SCAN_LIMITS:
+        for cp in range(lo, hi):
+            table[cp] = _property(cp)
+    return table
+
+def _load_table() -> bytearray:
+    path = CACHE_DIR / f"gcb-{unicodedata.unidata_version}-v{GCB_VERSION}.bin"
+    try:
+        data = path.read_bytes()
+        if len(data) == 0x110000:
+            return bytearray(data)
+    except OSError:
+        pass
+    table = _build_table()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(bytes(table))
+    os.replace(tmp, path)
+    return table
+
+GCB = _load_table()
+
+def _segment(s: str) -> List[str]:
+    """Автомат правил UAX #29 по всей строке."""
+    if len(s) == 2 and GCB[ord(s[1])] == EXTEND and GCB[ord(s[0])] not in (CR, LF, CONTROL):
+        return [s]                                                      # буква + знак
+    out: List[str] = []
+    start = 0
+    prev = -1
+    ri = 0            # число RI подряд до текущего символа
+    emoji = False     # перед текущим символом — ExtPict Extend*
+    emoji_zwj = False # перед текущим символом — ExtPict Extend* ZWJ
+    for i, ch in enumerate(s):
+        c = GCB[ord(ch)]
+        if prev < 0:
+            brk = False
+        elif prev == CR and c == LF:                                     # GB3
+            brk = False
+        elif prev in (CR, LF, CONTROL) or c in (CR, LF, CONTROL):       # GB4, GB5
+            brk = True
+        elif prev == L and c in (L, V, LV, LVT):                        # GB6
+            brk = False
+        elif prev in (LV, V) and c in (V, T):                           # GB7
+            brk = False
+        elif prev in (LVT, T) and c == T:                               # GB8
+            brk = False
+        elif c in (EXTEND, ZWJ, SPACINGMARK) or prev == PREPEND:        # GB9, GB9a, GB9b
+            brk = False
+        elif emoji_zwj and c == EXT_PICT:                               # GB11
+            brk = False
+        elif prev == RI and c == RI:                                    # GB12, GB13
+            brk = ri % 2 == 0
+        else:                                                           # GB999
+            brk = True
+        if brk:
+            out.append(s[start:i])
+            start = i
+        emoji_zwj = emoji and c == ZWJ
+        emoji = c == EXT_PICT or (emoji and c == EXTEND)
+        ri = ri + 1 if c == RI else 0
+        prev = c
+    if start < len(s):
+        out.append(s[start:])
+    return out
+
+def _spans(s: str) -> Iterator[tuple]:
+    """
+    (a, b, кластеры s[a:b]) для сложных участков: участок COMPLEX_RE плюс простой
+    символ слева (база для Extend), а после Prepend и CR — и простой символ справа
+    (GB9b, GB3). В остальных случаях перед простым символом граница есть всегда, поэтому
+    вне участков каждый символ — свой кластер, а участки разбираются независимо.
+    """
+    n = len(s)
+    region = None
+    for m in COMPLEX_RE.finditer(s):
+        a = max(m.start() - 1, 0)
+        b = m.end() + (m.end() < n and GCB[ord(s[m.end() - 1])] in (PREPEND, CR))
+        if region is not None and a < region[1]:
+            region = (region[0], b)
+            continue
+        if region is not None:
+            yield region[0], region[1], _segment(s[region[0]:region[1]])
+        region = (a, b)
+    if region is not None:
+        yield region[0], region[1], _segment(s[region[0]:region[1]])
+
+def graphemes(s: str) -> List[str]:
+    if SIMPLE_RE.fullmatch(s):
+        return list(s)
+    out: List[str] = []
+    pos = 0
+    for a, b, cl in _spans(s):
+        out.extend(s[pos:a])
+        out.extend(cl)
+        pos = b
+    out.extend(s[pos:])
+    return out
+
+def grapheme_count(s: str) -> int:
+    if SIMPLE_RE.fullmatch(s):
+        return len(s)
+    return len(graphemes(s))
+
+def complex_clusters(text: str) -> Iterator[str]:
+    """Кластеры из нескольких кодовых точек (одиночные символы не выдаются)."""
+    for _, _, cl in _spans(text):
+        for c in cl:
+            if len(c) > 1:
+                yield c
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/serve_summaries.py
+#
+# Локальный read-only HTTP/JSON сервис поверх результатов пайплайна (только stdlib).
+# Все CSV загружаются в память и раскладываются в индексы по base_letter, variant,
+# языку и коду символа, так что запрос — это поиск в dict.
+#
+# Области (scope):
+#   rf     → rf_summaries/     (speakers_rf.csv, rf_*_popularity_weighted.csv, ...)
+#   global → world_summaries/  (speakers_global.csv, global_*_popularity_weighted.csv, ...)
+#
+# Запросы (GET, параметр ?scope=rf|global, по умолчанию rf):
+#   /health                              — состояние и время загрузки
+#   /base/<буква>                        — приоритеты long-press для базовой буквы (Г)
+#   /variant/<вариант>                   — базы, языки и частоты варианта (Ӕ)
+#   /lang/<код>                          — носители, частоты и спец-буквы языка (oss)
+#   /codepoint/<U+04D4 | 0x4D4 | 04D4 | Ӕ> — варианты, содержащие этот код (400 — не код или вне 0..10FFFF)
+#   /top?kind=symbol|letter&n=10         — топ-N по взвешенной популярности
+#
+# Горячая перезагрузка: фоновый поток раз в --poll секунд сравнивает (mtime, size)
+# входных файлов. Новая подпись должна продержаться один период опроса (файлы дописаны),
+# затем строится НОВЫЙ индекс целиком; после сборки подпись снимается ещё раз, и ссылка
+# подменяется одной операцией присваивания, только если за время сборки файлы не менялись.
+# Если сборка упала или файлы изменились посреди неё — остаётся старый индекс, повтор на
+# следующем опросе. Файл, оборванный и больше не меняющийся (упавший писатель), так не поймать.
+#
+# Запуск:
+#   python3 rf_data_scripts/serve_summaries.py --port 8765
+#   curl 'http://127.0.0.1:8765/base/Г'
+
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+SCOPES: Dict[str, Dict[str, Path]] = {
+    "rf": {
+        "speakers":    Path("rf_summaries/speakers_rf.csv"),
+        "frequencies": Path("rf_summaries/frequencies_by_language.csv"),
+        "letters":     Path("rf_summaries/rf_letter_popularity_weighted.csv"),
+        "symbols":     Path("rf_summaries/rf_symbol_popularity_weighted.csv"),
+        "mapping":     Path("rf_summaries/variant_mapping.csv"),
+        "stats":       Path("rf_summaries/variant_mapping_stats.csv"),
+        "apple":       Path("rf_summaries/variant_mapping_priorities_apple.csv"),
+    },
+    "global": {
+        "speakers":    Path("world_summaries/speakers_global.csv"),
+        "frequencies": Path("world_summaries/frequencies_by_language.csv"),
+        "letters":     Path("world_summaries/global_letter_popularity_weighted.csv"),
+        "symbols":     Path("world_summaries/global_symbol_popularity_weighted.csv"),
+        "mapping":     Path("world_summaries/variant_mapping.csv"),
+        "stats":       Path("world_summaries/variant_mapping_stats.csv"),
+        "apple":       Path("world_summaries/variant_mapping_priorities_apple.csv"),
+    },
+}
+DEFAULT_SCOPE = "rf"
+MAX_TOP = 1000
+
+VERBOSE = True
+
+def vprint(*a):
+    if VERBOSE: print(*a, flush=True)
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1", help="Адрес (по умолчанию только localhost)")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--poll", type=float, default=2.0, help="Период проверки файлов, сек (0 — без перезагрузки)")
+    return ap.parse_args()
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def _sniff_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+def _read_csv_flex(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        head = f.read(4096); delim = _sniff_delimiter(head); f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
+
+def _to_float(x) -> float:
+    try:
+        return float(str(x).strip().replace(" ", ""))
+    except Exception:
+        return 0.0
+
+def _codes(s: str) -> List[str]:
+    return [f"U+{ord(ch):04X}" for ch in s]
+
+def _split_langs(s: str) -> List[str]:
+    return [lg.strip() for lg in (s or "").split(",") if lg.strip()]
+
+def files_signature() -> Tuple:
+    """(путь, mtime_ns, size) всех входов — меняется при любой перезаписи файла."""
+    sig = []
+    for scope in sorted(SCOPES):
+        for key in sorted(SCOPES[scope]):
+            p = SCOPES[scope][key]
+            try:
+                st = p.stat()
+                sig.append((str(p), st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append((str(p), None, None))
+    return tuple(sig)
+
+def _build_scope(paths: Dict[str, Path]) -> dict:
+    speakers = {r["lang_code"].strip(): int(_to_float(r.get("population")))
+                for r in _read_csv_flex(paths["speakers"]) if (r.get("lang_code") or "").strip()}
+
+    # язык → частоты; вариант → частоты по языкам
+    by_lang: Dict[str, dict] = {}
+    freq_by_variant: Dict[str, Dict[str, float]] = {}
+    for r in _read_csv_flex(paths["frequencies"]):
+        lang = (r.get("lang_code") or "").strip()
+        var = nfc_upper(r.get("variant", ""))
+        if not lang or not var: continue
+        fi = _to_float(r.get("f_i"))
+        d = by_lang.setdefault(lang, {"lang_code": lang, "vendor": r.get("vendor", ""),
+                                      "population": speakers.get(lang), "letters": [],
+                                      "special_letters": []})
+        d["letters"].append({"variant": var, "f_i": fi})
+        freq_by_variant.setdefault(var, {})[lang] = fi
+    for lang, pop in speakers.items():
+        by_lang.setdefault(lang, {"lang_code": lang, "vendor": "", "population": pop,
+                                  "letters": [], "special_letters": []})
+    for d in by_lang.values():
+        d["letters"].sort(key=lambda x: -x["f_i"])
+
+    # полный маппинг: вариант → базы и языки
+    by_variant: Dict[str, dict] = {}
+    for r in _read_csv_flex(paths["mapping"]):
+        base = nfc_upper(r.get("base_letter", ""))
+        var = nfc_upper(r.get("variant", ""))
+        if not base or not var: continue
+        langs = _split_langs(r.get("source_languages"))
+        d = by_variant.setdefault(var, {"variant": var, "codes": _codes(var), "bases": [],
+                                        "languages": [], "frequencies": {}})
+        if base not in d["bases"]: d["bases"].append(base)
+        d["languages"] = sorted(set(d["languages"]) | set(langs))
+        for lg in langs:
+            if lg in by_lang and var not in by_lang[lg]["special_letters"]:
+                by_lang[lg]["special_letters"].append(var)
+    for var, freqs in freq_by_variant.items():
+        if var in by_variant:
+            by_variant[var]["frequencies"] = dict(sorted(freqs.items()))
+
+    # приоритеты по базовой букве (порядок строк в stats — уже по рангу)
+    by_base: Dict[str, dict] = {}
+    for r in _read_csv_flex(paths["stats"]):
+        base = nfc_upper(r.get("base_letter", ""))
+        var = nfc_upper(r.get("variant", ""))
+        if not base or not var: continue
+        d = by_base.setdefault(base, {"base_letter": base, "codes": _codes(base),
+                                      "priorities": [], "apple": None})
+        sp = r.get("rf_speakers") or r.get("total_speakers") or "0"
+        d["priorities"].append({
+            "rank": len(d["priorities"]) + 1,
+            "variant": var,
+            "codes": _codes(var),
+            "source_languages": _split_langs(r.get("source_languages")),
+            "speakers": int(_to_float(sp)),
+            "relative_freq_in_group": r.get("relative_freq_in_group", ""),
+        })
+    for r in _read_csv_flex(paths["apple"]):
+        base = nfc_upper((r.get("base_letter") or "").split(" (")[0])
+        if base in by_base:
+            by_base[base]["apple"] = r.get("priorities", "")
+
+    # топ-листы уже отсортированы по rank в исходных файлах
+    top: Dict[str, List[dict]] = {}
+    for kind, key, col in (("letter", "letters", "variant"), ("symbol", "symbols", "symbol")):
+        top[kind] = [{
+            "rank": int(_to_float(r.get("rank"))),
+            kind: nfc_upper(r.get(col, "")),
+            "weighted_population": _to_float(r.get("weighted_population")),
+            "share": _to_float(r.get("share")),
+            "langs_count": int(_to_float(r.get("langs_count"))),
+        } for r in _read_csv_flex(paths[key])]
+
+    return {"base": by_base, "variant": by_variant, "lang": by_lang, "top": top}
+
+class SummaryIndex:
+    """Неизменяемый снимок всех индексов; пересобирается целиком при изменении файлов."""
+
+    def __init__(self):
+        self.signature = files_signature()
+        self.scopes = {scope: _build_scope(paths) for scope, paths in SCOPES.items()}
+        # код символа → варианты (во всех областях)
+        by_cp: Dict[str, set] = {}
+        for sc in self.scopes.values():
+            for var in list(sc["variant"]) + list(sc["base"]):
+                for code in _codes(var):
+                    by_cp.setdefault(code, set()).add(var)
+            for row in sc["top"]["symbol"]:
+                for code in _codes(row["symbol"]):
+                    by_cp.setdefault(code, set()).add(row["symbol"])
+        self.by_codepoint = {k: sorted(v) for k, v in by_cp.items()}
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+class IndexHolder:
+    """Держит текущий SummaryIndex; подмена ссылки атомарна для читающих потоков."""
+
+    def __init__(self):
+        self.current = SummaryIndex()
+        self.pending = self.current.signature   # подпись с прошлого опроса
+
+    def maybe_reload(self) -> bool:
+        sig = files_signature()
+        if sig == self.current.signature:
+            self.pending = sig
+            return False
+        if sig != self.pending:                 # файлы ещё меняются — ждём следующего опроса
+            self.pending = sig
+            return False
+        try:
+            fresh = SummaryIndex()
+        except Exception as e:
+            vprint(f"WARN: reload failed, keeping previous index: {e}")
+            return False
+        if files_signature() != fresh.signature:
+            vprint("WARN: inputs changed during reload, keeping previous index")
+            return False
+        self.current = fresh
+        vprint(f"OK: reloaded index at {fresh.loaded_at}")
+        return True
+
+    def watch(self, period: float) -> None:
+        while True:
+            time.sleep(period)
+            self.maybe_reload()
+
+def _normalize_codepoint(s: str) -> Optional[str]:
+    """
+    «U+04D4» / «0x4D4» / «04D4» (без префикса — от 2 hex-цифр) → «U+04D4»;
+    один символ («Ӕ», «A») — его собственный код. None — не код или вне 0..10FFFF.
+    """
+    s = s.strip()
+    if len(s) == 1:
+        up = s.upper()                       # «ß».upper() == «SS» — тогда сам символ
+        return f"U+{ord(up if len(up) == 1 else s):04X}"
+    s = s.upper()
+    for prefix in ("U+", "0X"):
+        if s.startswith(prefix):
+            s = s[len(prefix):]
+            break
+    if not s or len(s) > 6 or any(ch not in "0123456789ABCDEF" for ch in s):
+        return None
+    cp = int(s, 16)
+    return f"U+{cp:04X}" if cp <= 0x10FFFF else None
+
+def make_handler(holder: IndexHolder):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "rf-summaries/1.0"
+
+        def _send(self, code: int, payload) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *a):
+            pass
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [unquote(p) for p in url.path.split("/") if p]
+            qs = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            idx = holder.current          # один снимок на весь запрос
+            scope = qs.get("scope", DEFAULT_SCOPE)
+            if scope not in idx.scopes:
+                return self._send(400, {"error": f"unknown scope '{scope}'", "scopes": sorted(idx.scopes)})
+            sc = idx.scopes[scope]
+
+            if not parts or parts == ["health"]:
+                return self._send(200, {"status": "ok", "loaded_at": idx.loaded_at,
+                                        "scopes": {s: {k: len(v) for k, v in d.items() if k != "top"}
+                                                   for s, d in idx.scopes.items()}})
+            kind, arg = parts[0], (parts[1] if len(parts) > 1 else "")
+
+            if kind == "base" and arg:
+                hit = sc["base"].get(nfc_upper(arg))
+                return self._send(200, hit) if hit else self._send(404, {"error": f"no base '{arg}'"})
+            if kind == "variant" and arg:
+                hit = sc["variant"].get(nfc_upper(arg))
+                return self._send(200, hit) if hit else self._send(404, {"error": f"no variant '{arg}'"})
+            if kind == "lang" and arg:
+                hit = sc["lang"].get(arg.strip().lower())
+                return self._send(200, hit) if hit else self._send(404, {"error": f"no language '{arg}'"})
+            if kind == "codepoint" and arg:
+                code = _normalize_codepoint(arg)
+                if code is None:
+                    return self._send(400, {"error": f"bad code point '{arg}'"})
+                return self._send(200, {"codepoint": code, "variants": idx.by_codepoint.get(code, [])})
+            if kind == "top":
+                what = qs.get("kind", "symbol")
+                if what not in sc["top"]:
+                    return self._send(400, {"error": f"unknown kind '{what}'", "kinds": sorted(sc["top"])})
+                try:
+                    n = max(1, min(MAX_TOP, int(qs.get("n", "10"))))
+                except ValueError:
+                    return self._send(400, {"error": "n must be an integer"})
+                return self._send(200, {"scope": scope, "kind": what, "items": sc["top"][what][:n]})
+
+            return self._send(404, {"error": "unknown endpoint",
+                                    "endpoints": ["/health", "/base/<letter>", "/variant/<variant>",
+                                                  "/lang/<code>", "/codepoint/<U+XXXX>", "/top?kind=&n="]})
+
+    return Handler
+
+def main():
+    args = parse_args()
+    holder = IndexHolder()
+    idx = holder.current
+    for scope, sc in idx.scopes.items():
+        vprint(f"[{scope}] bases={len(sc['base'])} variants={len(sc['variant'])} langs={len(sc['lang'])}")
+
+    if args.poll > 0:
+        threading.Thread(target=holder.watch, args=(args.poll,), daemon=True).start()
+
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(holder))
+    print(f"OK: serving on http://{args.host}:{args.port} (poll={args.poll:g}s)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/suggest_base_keys.py
+#
+# Подсказка базовой (русской) клавиши для новых букв: Ӕ → А, Ҕ → Г, ᵸ → Н.
+# Раньше выбиралось вручную (а 03 отдельно обрабатывает ᵸ).
+#
+# Индекс строится один раз при создании BaseKeySuggester:
+#   • скелеты — для всех букв кириллических, латинских и модифицирующих блоков Unicode:
+#       nfd       — NFD без диакритики даёт русскую букву (Ӧ → О, Ӣ → И);
+#       name      — «главное» слово имени символа — имя русской буквы
+#                   (CYRILLIC CAPITAL LETTER GHE WITH MIDDLE HOOK → Г, MODIFIER LETTER CYRILLIC EN → Н,
+#                   у лигатур — первая часть: CYRILLIC CAPITAL LIGATURE A IE → А);
+#       confusable — латинский двойник русской буквы, как в Unicode confusables (H → Н, Ḱ → К);
+#   • совместная встречаемость — все маппинги всех вендоров (variant_index): на какие базы
+#     этот вариант уже положен в других языках (mapping), и на какие базы положены варианты
+#     с тем же скелетом (family: для нового Ӧ̄ голосуют Ӧ, О̄, …).
+# Для последовательностей (ГӀ, ДӘ) скелет берётся по первой графеме.
+#
+# Уверенность базы — noisy-OR по свидетельствам: 1 − Π(1 − w·s), s — доля голосов (или 1).
+#
+# Вход:
+#   rf_summaries/frequencies_by_language.csv     — алфавиты языков (буквы из частот)
+#   data/<lang>/<vendor>/mapping/*_key_mapping*  — через variant_index
+# Выход (без аргументов):
+#   rf_results/base_key_suggestions.csv — lang_code, letter, rank, base, confidence, evidence
+#     для букв языка, которых нет ни среди русских, ни в маппинге этого языка.
+#
+# Запуск:
+#   python3 rf_data_scripts/suggest_base_keys.py
+#   python3 rf_data_scripts/suggest_base_keys.py Ӕ Ҕ ᵸ
+#   python3 rf_data_scripts/suggest_base_keys.py --evaluate     # leave-one-language-out по маппингам
+
+import argparse
+import csv
+import os
+import time
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from normalization import has_letter
+from segmentation import graphemes
+from variant_index import VariantIndex
+
+ROOT = Path(__file__).resolve().parent.parent
+os.chdir(ROOT)
+
+FREQ_CSV = Path("rf_summaries/frequencies_by_language.csv")
+OUT_CSV  = Path("rf_results/base_key_suggestions.csv")
+
+RUSSIAN = "АБВГДЕЖЗИЙКЛМНОПРСТУФХЦЧШЩЫЬЭЮЯ"   # без Ё и Ъ (Ъ → Ь, как в 03)
+EXCLUDED_LANGS = {"lang", "ru", "rus"}
+TOP_K = 3
+
+# вес свидетельства
+WEIGHTS = {"mapping": 0.9, "nfd": 0.85, "name": 0.7, "confusable": 0.6, "family": 0.5}
+
+# латинские двойники русских букв (подмножество Unicode confusables)
+CONFUSABLES = {"A": "А", "B": "В", "C": "С", "E": "Е", "H": "Н", "K": "К", "M": "М",
+               "O": "О", "P": "Р", "T": "Т", "X": "Х", "Y": "У"}
+
+# блоки, для которых скелеты считаются заранее
+SKELETON_RANGES = [(0x0041, 0x024F), (0x02B0, 0x02FF), (0x0400, 0x052F), (0x1C80, 0x1C8F),
+                   (0x1D00, 0x1DBF), (0x1E00, 0x1EFF), (0x2DE0, 0x2DFF), (0xA640, 0xA69F),
+                   (0xA720, 0xA7FF), (0x1E030, 0x1E08F)]
+
+SCRIPT_WORDS = {"CYRILLIC", "LATIN", "CAPITAL", "SMALL"}
+
+def _russian_names() -> Dict[str, str]:
+    """'GHE' → 'Г', 'SOFT SIGN' → 'Ь', … по именам заглавных русских букв."""
+    prefix = "CYRILLIC CAPITAL LETTER "
+    names = {unicodedata.name(ch)[len(prefix):]: ch for ch in RUSSIAN}
+    names["HARD SIGN"] = "Ь"
+    return names
+
+RU_BY_NAME = _russian_names()
+
+def _strip_marks(ch: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFD", ch) if not unicodedata.combining(c))
+
+def _name_skeleton(ch: str) -> Tuple[Optional[str], Optional[str]]:
+    """(русская буква, вид свидетельства) по имени символа; (None, None) — не найдено."""
+    name = unicodedata.name(ch, "")
+    for kind in ("LIGATURE", "LETTER"):
+        _, sep, rest = name.partition(f" {kind} ")
+        if sep:
+            break
+    else:
+        return None, None
+    words = [w for w in rest.split(" WITH ")[0].split() if w not in SCRIPT_WORDS]
+    if not words:
+        return None, None
+    latin = "LATIN" in name.split()
+    if latin:
+        # латиница: только однобуквенное имя и его двойник
+        ru = CONFUSABLES.get(words[0] if kind == "LIGATURE" else words[-1])
+        return (ru, "confusable") if ru else (None, None)
+    phrase = " ".join(words)
+    if phrase in RU_BY_NAME:
+        return RU_BY_NAME[phrase], "name"
+    order = words if kind == "LIGATURE" else reversed(words)
+    for w in order:
+        if w in RU_BY_NAME:
+            return RU_BY_NAME[w], "name"
+    return None, None
+
+@lru_cache(maxsize=None)
+def skeleton(ch: str) -> Tuple[Optional[str], Optional[str]]:
+    """Скелет одного символа (буквы с диакритикой): (русская буква, nfd | name | confusable)."""
+    up = unicodedata.normalize("NFC", ch).upper()
+    base = _strip_marks(up)
+    if base in RUSSIAN:
+        return base, "nfd"
+    if base == "Ъ":
+        return "Ь", "nfd"
+    for c in (up, base):
+        if len(c) == 1:
+            ru, kind = _name_skeleton(c)
+            if ru:
+                return ru, kind
+    return None, None
+
+def letter_skeleton(letter: str) -> Tuple[Optional[str], Optional[str]]:
+    """Скелет буквы или последовательности — по первой графеме."""
+    gs = graphemes(letter)
+    return skeleton(gs[0]) if gs else (None, None)
+
+class BaseKeySuggester:
+    """Индекс скелетов и совместной встречаемости маппингов; suggest() — ранжирование баз."""
+
+    def __init__(self, index: Optional[VariantIndex] = None):
+        index = index or VariantIndex().refresh()
+        # вариант → база → языки, где вариант положен на эту базу
+        self.votes: Dict[str, Dict[str, Set[str]]] = {}
+        # скелет → варианты с этим скелетом
+        self.family: Dict[str, Set[str]] = {}
+        for var in index.prefix(""):
+            for p in index.lookup(var):
+                base = "Ь" if p.base == "Ъ" else p.base
+                if p.lang not in EXCLUDED_LANGS and base in RUSSIAN:
+                    self.votes.setdefault(var, {}).setdefault(base, set()).add(p.lang)
+            sk, _ = letter_skeleton(var)
+            if sk:
+                self.family.setdefault(sk, set()).add(var)
+        for lo, hi in SKELETON_RANGES:
+            for cp in range(lo, hi + 1):
+                if unicodedata.category(chr(cp)).startswith("L"):
+                    skeleton(chr(cp))
+
+    def _shares(self, variants, exclude_lang: Optional[str]) -> Dict[str, float]:
+        """Доли языков, положивших варианты на каждую базу (без exclude_lang)."""
+        counts: Dict[str, int] = {}
+        for var in variants:
+            for base, langs in self.votes.get(var, {}).items():
+                k = len(langs - {exclude_lang})
+                if k:
+                    counts[base] = counts.get(base, 0) + k
+        total = sum(counts.values())
+        return {b: k / total for b, k in counts.items()} if total else {}
+
+    def suggest(self, letter: str, exclude_lang: Optional[str] = None,
+                top_k: int = TOP_K) -> List[Tuple[str, float, str]]:
+        """[(база, уверенность 0..1, свидетельства)] по убыванию уверенности."""
+        letter = unicodedata.normalize("NFC", letter.strip()).upper()
+        evidence: Dict[str, List[Tuple[str, float]]] = {}
+
+        for base, s in self._shares([letter], exclude_lang).items():
+            evidence.setdefault(base, []).append(("mapping", s))
+        sk, kind = letter_skeleton(letter)
+        if sk:
+            evidence.setdefault(sk, []).append((kind, 1.0))
+            family = self.family.get(sk, set()) - {letter}
+            for base, s in self._shares(family, exclude_lang).items():
+                evidence.setdefault(base, []).append(("family", s))
+
+        ranked = []
+        for base, ev in evidence.items():
+            miss = 1.0
+            for kind, s in ev:
+                miss *= 1.0 - WEIGHTS[kind] * s
+            ranked.append((base, 1.0 - miss, " ".join(f"{k}:{s:.2f}" for k, s in ev)))
+        ranked.sort(key=lambda r: (-r[1], r[0]))
+        return ranked[:top_k]
+
+    def evaluate(self) -> Tuple[int, int, List[Tuple[str, str, str, str]]]:
+        """Leave-one-language-out: (верных top-1, всего, ошибки [(lang, variant, base, top1)])."""
+        ok = total = 0
+        errors = []
+        for var, by_base in sorted(self.votes.items()):
+            for base, langs in by_base.items():
+                for lang in sorted(langs):
+                    ranked = self.suggest(var, exclude_lang=lang, top_k=1)
+                    top = ranked[0][0] if ranked else ""
+                    total += 1
+                    if top == base:
+                        ok += 1
+                    else:
+                        errors.append((lang, var, base, top))
+        return ok, total, errors
+
+def language_alphabets() -> Dict[str, List[str]]:
+    """{lang: буквы из frequencies_by_language.csv} (без знаков и цифр)."""
+    out: Dict[str, List[str]] = {}
+    with FREQ_CSV.open(encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            lang, var = r["lang_code"], r["variant"]
+            if lang not in EXCLUDED_LANGS and has_letter(var):
+                out.setdefault(lang, []).append(var)
+    return out
+
+def parse_args():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("letters", nargs="*", help="Буквы для подсказки (по умолчанию — все несведённые буквы всех языков)")
+    ap.add_argument("--evaluate", action="store_true", help="Проверить на существующих маппингах (leave-one-language-out)")
+    ap.add_argument("--top", type=int, default=TOP_K, help="Сколько баз выводить")
+    return ap.parse_args()
+
+def main():
+    args = parse_args()
+    t0 = time.perf_counter()
+    sug = BaseKeySuggester()
+    print(f"OK: index built in {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"(variants={len(sug.votes)}, skeletons={skeleton.cache_info().currsize})")
+
+    if args.evaluate:
+        ok, total, errors = sug.evaluate()
+        print(f"   leave-one-language-out top-1: {ok}/{total} ({ok / max(total, 1):.1%})")
+        for lang, var, base, top in errors:
+            print(f"     {lang:6} {var:4} {base} ← подсказано {top or '—'}")
+        return
+
+    if args.letters:
+        for letter in args.letters:
+            ranked = sug.suggest(letter, top_k=args.top)
+            print(f"{letter}: " + ("; ".join(f"{b} {c:.2f} ({ev})" for b, c, ev in ranked) or "—"))
+        return
+
+    t0 = time.perf_counter()
+    mapped: Dict[str, Set[str]] = {}
+    for var, by_base in sug.votes.items():
+        for langs in by_base.values():
+            for lang in langs:
+                mapped.setdefault(lang, set()).add(var)
+    rows = []
+    n_letters = 0
+    for lang, letters in sorted(language_alphabets().items()):
+        for letter in letters:
+            if letter in RUSSIAN or letter in mapped.get(lang, set()):
+                continue
+            n_letters += 1
+            for rank, (base, conf, ev) in enumerate(sug.suggest(letter, exclude_lang=lang, top_k=args.top), 1):
+                rows.append({"lang_code": lang, "letter": letter, "rank": rank, "base": base,
+                             "confidence": f"{conf:.3f}", "evidence": ev})
+    OUT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=["lang_code", "letter", "rank", "base", "confidence", "evidence"])
+        w.writeheader()
+        w.writerows(rows)
+    print(f"OK: wrote {OUT_CSV} (letters={n_letters}, rows={len(rows)}) "
+          f"in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/tolerant_json.py
+#
+# Общий модуль: терпимое чтение JSON-файлов маппингов и раскладок.
+#
+# Сначала — обычный json.loads (быстрый путь). Если он падает, текст один раз проходит
+# лексер, который исправляет то, что встречается в файлах вендоров:
+#   • BOM в начале файла;
+#   • комментарии // … и /* … */;
+#   • висячие запятые перед ] и } (например, mapping/tyv_key_mapping_extension.json).
+# Исправленные места заменяются пробелами (переводы строк сохраняются), поэтому
+# строка/столбец ошибки последующего json.loads совпадают с исходным файлом.
+# Каждое исправление возвращается как Recovery(line, column, kind) — вызывающий
+# скрипт печатает их, чтобы «починенные» файлы не проходили незаметно.
+#
+# load_json кэширует результат по sha256 содержимого в памяти процесса: один и тот же файл
+# (маппинг, который читают несколько шагов одного скрипта) разбирается один раз. Дискового
+# кэша нет — его чтение стоило бы столько же, сколько json.loads самого файла.
+# Ошибки, которые не исправить, поднимаются как json.JSONDecodeError (ValueError).
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Tuple
+
+BOM = "﻿"
+
+class Recovery(NamedTuple):
+    line: int
+    column: int
+    kind: str       # bom | line_comment | block_comment | trailing_comma
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.column} {self.kind}"
+
+# строка целиком, комментарии, запятая; всё остальное копируется как есть
+TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"?|//[^\n]*|/\*.*?(?:\*/|\Z)|,', re.S)
+SKIP_RE  = re.compile(r'(?:\s+|//[^\n]*|/\*.*?(?:\*/|\Z))*', re.S)
+
+def _position(text: str, offset: int) -> Tuple[int, int]:
+    line = text.count("\n", 0, offset) + 1
+    return line, offset - (text.rfind("\n", 0, offset) + 1) + 1
+
+def _blank(s: str) -> str:
+    return re.sub(r"[^\n]", " ", s)
+
+def repair(text: str) -> Tuple[str, List[Recovery]]:
+    """Однопроходное исправление: (текст той же длины, список исправлений)."""
+    fixes: List[Tuple[int, str]] = []
+    out: List[str] = []
+    pos = 0
+    if text.startswith(BOM):
+        fixes.append((0, "bom"))
+        out.append(" ")
+        pos = 1
+    for m in TOKEN_RE.finditer(text, pos):
+        out.append(text[pos:m.start()])
+        tok = m.group()
+        if tok.startswith("//"):
+            fixes.append((m.start(), "line_comment")); out.append(_blank(tok))
+        elif tok.startswith("/*"):
+            fixes.append((m.start(), "block_comment")); out.append(_blank(tok))
+        elif tok == ",":
+            nxt = SKIP_RE.match(text, m.end()).end()
+            if nxt < len(text) and text[nxt] in "]}":
+                fixes.append((m.start(), "trailing_comma")); out.append(" ")
+            else:
+                out.append(tok)
+        else:
+            out.append(tok)
+        pos = m.end()
+    out.append(text[pos:])
+    return "".join(out), [Recovery(*_position(text, off), kind) for off, kind in fixes]
+
+def loads(text: str) -> Tuple[Any, List[Recovery]]:
+    """(объект, исправления); без исправлений — один вызов json.loads."""
+    try:
+        return json.loads(text), []
+    except ValueError:
+        fixed, recoveries = repair(text)
+        if not recoveries:
+            raise
+        return json.loads(fixed), recoveries
+
+_memo: Dict[str, Tuple[Any, List[Recovery]]] = {}
+
+def load_json(path: Path) -> Tuple[Any, List[Recovery]]:
+    """Чтение файла с кэшем в памяти процесса по хэшу содержимого."""
+    data = Path(path).read_bytes()
+    key = hashlib.sha256(data).hexdigest()
+    if key not in _memo:
+        _memo[key] = loads(data.decode("utf-8"))
+    return _memo[key]
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/variant_index.py
+#
+# Инвертированный индекс вариантов по всем маппингам всех вендоров
+# (в отличие от 03, где для языка берётся PREFERRED_VENDOR).
+#
+# Вход:
+#   data/<lang>/<vendor>/mapping/<lang>_key_mapping.json, *_key_mapping_ext.json,
+#   *_key_mapping_extension.json, *_key_mapping.txt        — как в 03_aggregate_mappings
+#
+# Хранилище: .cache/variant_index/index.json — записи каждого файла с подписью
+# (mtime_ns, size). При открытии перечитываются только изменившиеся файлы,
+# удалённые выбрасываются (refresh); индекс в памяти строится лениво, при первом запросе.
+#
+# Запись (Posting): lang, vendor, base, position (1.. — место во всплывающем меню), file.
+# Ключи: вариант (NFC, upper), кодовая точка («U+0494»), NFD-разложение варианта.
+# Запросы — словари и bisect по отсортированным ключам (микросекунды):
+#   lookup(«Ҕ»), lookup(«U+0494»), prefix(«Г»), decomposition(«О»), base_variants(«Г»).
+# Ничего не фильтруется (Ё, Ъ, знаки остаются): индекс отвечает, что вендоры прислали.
+#
+# Запуск:
+#   python3 rf_data_scripts/variant_index.py Ҕ
+#   python3 rf_data_scripts/variant_index.py --prefix Г --decomposition О --base Н
+
+import argparse
+import bisect
+import glob
+import json
+import os
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from vendor_files import MAPPING_SUFFIXES, nfc_upper, parse_mapping
+
+ROOT = Path(__file__).resolve().parent.parent
+
+INDEX_PATH    = ROOT / ".cache/variant_index/index.json"
+INDEX_VERSION = 1   # менять при изменении формата записей
+MAPPING_GLOB  = "data/*/*/mapping/*_key_mapping*"
+EXCLUDED_LANGS = {"lang"}
+
+class Posting(NamedTuple):
+    lang: str
+    vendor: str
+    base: str
+    position: int
+    file: str
+
+def code_key(ch: str) -> str:
+    return f"U+{ord(ch):04X}"
+
+def _mapping_files() -> List[Path]:
+    paths = (Path(p) for p in glob.glob(str(ROOT / MAPPING_GLOB)) if p.endswith(tuple(MAPPING_SUFFIXES)))
+    return sorted(p for p in paths if p.relative_to(ROOT).parts[1] not in EXCLUDED_LANGS)
+
+class VariantIndex:
+    """Лениво загружаемый инвертированный индекс; refresh() — инкрементальное обновление."""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self._files: Optional[Dict[str, dict]] = None
+        self._by_variant: Dict[str, List[Posting]] = {}
+        self._by_code: Dict[str, List[str]] = {}
+        self._by_base: Dict[str, List[str]] = {}
+        self._keys: List[str] = []                 # отсортированные варианты (prefix)
+        self._nfd_keys: List[str] = []             # отсортированные NFD вариантов
+        self._nfd_vars: List[str] = []             # и сами варианты в том же порядке
+        self.stats = {"parsed": 0, "removed": 0, "reused": 0}
+
+    # ---------- хранилище ----------
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            obj = json.loads(self.path.read_text(encoding="utf-8"))
+            if obj.get("version") == INDEX_VERSION:
+                return obj["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return {}
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "files": self._files},
+                                  ensure_ascii=False) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> "VariantIndex":
+        """Перечитать изменившиеся файлы маппингов, убрать удалённые, пересобрать индекс."""
+        files = self._load() if self._files is None else self._files
+        current = {str(p.relative_to(ROOT)): p for p in _mapping_files()}
+        changed = False
+        for rel in list(files):
+            if rel not in current:
+                del files[rel]; self.stats["removed"] += 1; changed = True
+        for rel, p in current.items():
+            st = p.stat()
+            sig = [st.st_mtime_ns, st.st_size]
+            if files.get(rel, {}).get("sig") == sig:
+                self.stats["reused"] += 1
+                continue
+            try:
+                entries = parse_mapping(p)
+            except (OSError, ValueError) as e:
+                print(f"  ошибка маппинга: {rel} {e}")
+                entries = []
+            files[rel] = {"sig": sig, "entries": entries}
+            self.stats["parsed"] += 1; changed = True
+        self._files = files
+        if changed:
+            self._save()
+        self._build()
+        return self
+
+    def _ensure(self) -> None:
+        if self._files is None:
+            self.refresh()
+
+    def _build(self) -> None:
+        by_variant: Dict[str, List[Posting]] = {}
+        by_base: Dict[str, set] = {}
+        for rel, rec in self._files.items():
+            parts = Path(rel).parts
+            lang, vendor = parts[1], parts[2]
+            for base, var, pos in rec["entries"]:
+                by_variant.setdefault(var, []).append(Posting(lang, vendor, base, pos, rel))
+                by_base.setdefault(base, set()).add(var)
+        by_code: Dict[str, set] = {}
+        for var in by_variant:
+            for ch in var:
+                by_code.setdefault(code_key(ch), set()).add(var)
+        self._by_variant = {v: sorted(ps) for v, ps in by_variant.items()}
+        self._by_base = {b: sorted(vs) for b, vs in by_base.items()}
+        self._by_code = {c: sorted(vs) for c, vs in by_code.items()}
+        self._keys = sorted(by_variant)
+        nfd = sorted((unicodedata.normalize("NFD", v), v) for v in by_variant)
+        self._nfd_keys = [k for k, _ in nfd]
+        self._nfd_vars = [v for _, v in nfd]
+
+    # ---------- запросы ----------
+
+    def lookup(self, key: str) -> List[Posting]:
+        """Вариант («Ҕ») или кодовая точка («U+0494»): все записи с ним."""
+        self._ensure()
+        if key.upper().startswith("U+"):
+            return [p for v in self._by_code.get(key.upper(), []) for p in self._by_variant[v]]
+        return self._by_variant.get(nfc_upper(key), [])
+
+    @staticmethod
+    def _range(keys: List[str], prefix: str) -> range:
+        """Индексы ключей с началом prefix в отсортированном списке."""
+        return range(bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + "\U0010FFFF"))
+
+    def prefix(self, prefix: str) -> List[str]:
+        """Варианты, начинающиеся с prefix (в NFC)."""
+        self._ensure()
+        return [self._keys[i] for i in self._range(self._keys, nfc_upper(prefix))]
+
+    def decomposition(self, prefix: str) -> List[str]:
+        """Варианты, чьё NFD-разложение начинается с NFD(prefix): «О» → О, Ӧ, О̄, …"""
+        self._ensure()
+        key = unicodedata.normalize("NFD", nfc_upper(prefix))
+        return [self._nfd_vars[i] for i in self._range(self._nfd_keys, key)]
+
+    def base_variants(self, base: str) -> List[str]:
+        self._ensure()
+        return self._by_base.get(nfc_upper(base), [])
+
+    def __len__(self) -> int:
+        self._ensure()
+        return sum(len(ps) for ps in self._by_variant.values())
+
+def _print_postings(key: str, postings: List[Posting]) -> None:
+    print(f"{key}: {len(postings)} записей")
+    for p in postings:
+        print(f"   {p.lang:10} {p.vendor:28} {p.base} #{p.position}  {p.file}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("variants", nargs="*", help="Варианты или кодовые точки (U+0494)")
+    ap.add_argument("--prefix", default=None, help="Варианты с этим началом")
+    ap.add_argument("--decomposition", default=None, help="Варианты, чьё NFD начинается с этой строки")
+    ap.add_argument("--base", default=None, help="Варианты под этой базовой клавишей")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    idx = VariantIndex().refresh()
+    t_load = time.perf_counter() - t0
+    print(f"OK: {idx.path.relative_to(ROOT)} (postings={len(idx)}, files parsed={idx.stats['parsed']}, "
+          f"reused={idx.stats['reused']}, removed={idx.stats['removed']}) in {t_load * 1000:.1f} ms")
+
+    t0 = time.perf_counter()
+    for v in args.variants:
+        _print_postings(v, idx.lookup(v))
+    if args.prefix is not None:
+        print(f"prefix {args.prefix}: {' '.join(idx.prefix(args.prefix))}")
+    if args.decomposition is not None:
+        print(f"decomposition {args.decomposition}: {' '.join(idx.decomposition(args.decomposition))}")
+    if args.base is not None:
+        print(f"base {args.base}: {' '.join(idx.base_variants(args.base))}")
+    print(f"   queries={(time.perf_counter() - t0) * 1e6:.0f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/vendor_files.py
+#
+# Общий модуль: чтение файлов вендоров data/<lang>/<vendor>/.
+#
+# Маппинги (mapping/):
+#   MAPPING_SUFFIXES    — суффикс имени файла → формат (mapping | extension | txt; provenance в 03);
+#   parse_mapping(path) — [(база, вариант, позиция)] из JSON (tolerant_json) или TXT
+#                         («О | Ӧ, Ө, О̄» по строке на базу, # — комментарий); строки — NFC, upper;
+#   load_mapping(path)  — JSON → {база: [варианты]} как в файле (для long-press раскладок);
+#   mapping_paths(dir, lang) / load_mappings(paths) — все маппинги вендора (основной, _ext,
+#                         _extension, .txt) в порядке MAPPING_SUFFIXES, слитые в один {база: [варианты]}
+#                         (для экспорта и проверки раскладок: 11, 14).
+# Исправления лексера печатаются, как в 03 («JSON исправлен: <файл>:<строка>:<столбец> <вид>»),
+# строки TXT без «|» — «ошибка TXT»; parse_mapping(…, verbose=False) молчит (16 сообщает сам).
+#
+# Частоты (frequencies/*.csv): VAR_KEYS / C_KEYS — допустимые имена столбцов варианта и C_i,
+# pick_first_present — первый непустой из них, read_csv_flex — CSV с ; или , (по первым 4 КБ).
+
+import csv
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tolerant_json import load_json
+
+MAPPING_SUFFIXES: Dict[str, str] = {
+    "_key_mapping.json": "mapping",
+    "_key_mapping_ext.json": "extension",
+    "_key_mapping_extension.json": "extension",
+    "_key_mapping.txt": "txt",
+}
+
+VAR_KEYS = ["variant", "letter", "symbol", "char"]
+C_KEYS   = ["c_i", "c", "count", "freq", "frequency"]
+
+def nfc_upper(s: str) -> str:
+    return unicodedata.normalize("NFC", (s or "").strip()).upper()
+
+def mapping_kind(path) -> Optional[str]:
+    """Формат маппинга по имени файла; None — не маппинг."""
+    name = Path(path).name
+    for suffix, kind in MAPPING_SUFFIXES.items():
+        if name.endswith(suffix):
+            return kind
+    return None
+
+def parse_mapping(path: Path, verbose: bool = True) -> List[Tuple[str, str, int]]:
+    """[(base, variant, position)] из JSON- или TXT-маппинга; ValueError — JSON не разобрать."""
+    out: List[Tuple[str, str, int]] = []
+    items = []
+    if path.suffix == ".txt":
+        with path.open(encoding="utf-8-sig") as f:
+            for lineno, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                base, sep, rest = line.partition("|")
+                if sep:
+                    items.append((base, rest.split(",")))
+                elif verbose:
+                    print(f"  ошибка TXT: {path}:{lineno} нет «|»: {line}")
+    else:
+        obj, recoveries = load_json(path)
+        if verbose:
+            for r in recoveries:
+                print(f"  JSON исправлен: {path}:{r}")
+        items = list(obj.items()) if isinstance(obj, dict) else []
+    for base, alts in items:
+        if not isinstance(alts, list):
+            continue
+        pos = 0
+        for v in alts:
+            if isinstance(v, str) and nfc_upper(v):
+                pos += 1
+                out.append((nfc_upper(base), nfc_upper(v), pos))
+    return out
+
+def load_mapping(path: Optional[Path]) -> Dict[str, List[str]]:
+    """JSON-маппинг → {база: [варианты]}; {} — нет файла, не разбирается или не объект."""
+    if path is None or not Path(path).exists():
+        return {}
+    try:
+        obj, recoveries = load_json(Path(path))
+    except (OSError, ValueError) as e:
+        print(f"  ошибка JSON: {path} {e}")
+        return {}
+    for r in recoveries:
+        print(f"  JSON исправлен: {path}:{r}")
+    if not isinstance(obj, dict):
+        return {}
+    return {k: [v for v in vs if isinstance(v, str)] for k, vs in obj.items() if isinstance(vs, list)}
+
+def mapping_paths(mapping_dir: Path, lang: str) -> List[Path]:
+    """Существующие маппинги языка в папке mapping/ вендора, в порядке MAPPING_SUFFIXES."""
+    return [p for p in (Path(mapping_dir) / f"{lang}{suffix}" for suffix in MAPPING_SUFFIXES) if p.exists()]
+
+def load_mappings(paths: List[Path]) -> Dict[str, List[str]]:
+    """Маппинги (JSON и TXT) → один {база: [варианты]}: варианты следующих файлов дописываются в конец."""
+    merged: Dict[str, List[str]] = {}
+    for path in paths:
+        if mapping_kind(path) == "txt":
+            try:
+                mapping: Dict[str, List[str]] = {}
+                for base, variant, _ in parse_mapping(Path(path)):
+                    mapping.setdefault(base, []).append(variant)
+            except OSError as e:
+                print(f"  ошибка TXT: {path} {e}")
+                continue
+        else:
+            mapping = load_mapping(path)
+        for base, alts in mapping.items():
+            have = merged.setdefault(base, [])
+            have.extend(a for a in alts if a not in have)
+    return merged
+
+def pick_first_present(row: dict, keys: List[str]) -> Optional[str]:
+    for k in keys:
+        if k in row and str(row[k]).strip() != "":
+            return k
+    return None
+
+def read_csv_flex(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8-sig") as f:
+        head = f.read(4096)
+        delim = ";" if head.count(";") > head.count(",") else ","
+        f.seek(0)
+        return list(csv.DictReader(f, delimiter=delim))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# rf_data_scripts/vendors.py
+#
+# Общий модуль: сведение данных нескольких вендоров одного языка
+# (раньше 01/02/04 брали первого по имени вендора или PREFERRED_VENDOR, 09/12/13/optimize_layout —
+# первого по имени).
+#
+#   vendor_names(lang)            — все data/<lang>/<vendor>/ по имени
+#   merge_counts(per_vendor)      — частоты: C_i и M_i суммируются по вендорам, т. е.
+#                                   f_i = Σ C_i / Σ M — среднее f_i вендоров с весом M_v / ΣM
+#                                   (размер корпуса). На вход — уже агрегированные векторы
+#                                   счётчиков вендоров, стоимость линейна по числу вендоров.
+#   pick_population(lang, records) — численность по политике (POPULATION_POLICY):
+#       latest    — запись с максимальным годом среди всех вендоров (в году — максимум),
+#                   как если бы их population.csv были одним файлом;
+#       preferred — значение PREFERRED_VENDOR, иначе latest;
+#       first     — первый по имени вендор (прежнее поведение);
+#       mean      — среднее значений вендоров за последний год.
+#   mapping_disagreements(per_vendor) — варианты, которые вендоры кладут на разные базы
+#                                       или которых у кого-то из вендоров нет.
+#   vendor_paths(lang, pattern)   — файлы всех вендоров (биграммы в 09 и optimize_layout суммируются,
+#                                   как частоты в merge_counts);
+#   vendor_file(lang, pattern)    — файл одного вендора для того, что не сводится: раскладку двух
+#                                   вендоров не объединить, поэтому 09/12/13/optimize_layout берут
+#                                   раскладку PREFERRED_VENDOR (если она у него есть), иначе первого
+#                                   по имени вендора;
+#   layout_mapping(lang, layout)  — маппинг того же вендора, что и раскладка (его long-press
+#                                   рассчитан на его клавиши), иначе vendor_file.
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DATA_DIR = ROOT / "data"
+
+PREFERRED_VENDOR: Dict[str, str] = {
+    "abk": "Tamaz_Kharchlaa",
+}
+
+POPULATION_POLICY = "latest"
+POPULATION_POLICIES = ("latest", "preferred", "first", "mean")
+# политика для отдельных языков: {"abk": "preferred"}
+POPULATION_POLICY_BY_LANG: Dict[str, str] = {}
+
+# (год или None, численность)
+PopulationRecord = Tuple[Optional[int], int]
+
+def vendor_names(lang: str) -> List[str]:
+    lang_dir = DATA_DIR / lang
+    if not lang_dir.is_dir():
+        return []
+    return sorted(p.name for p in lang_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+def vendor_paths(lang: str, pattern: str) -> List[Path]:
+    """data/<lang>/<vendor>/<pattern> всех вендоров — пути от корня репозитория, по вендору."""
+    return [p.relative_to(ROOT) for v in vendor_names(lang) for p in sorted((DATA_DIR / lang / v).glob(pattern))]
+
+def vendor_file(lang: str, pattern: str) -> Optional[Path]:
+    """Файл одного вендора: PREFERRED_VENDOR, если у него такой есть, иначе первый по имени."""
+    hits = vendor_paths(lang, pattern)
+    pref = PREFERRED_VENDOR.get(lang)
+    for p in hits:
+        if p.parts[2] == pref:
+            return p
+    return hits[0] if hits else None
+
+def layout_mapping(lang: str, layout: Optional[Path]) -> Optional[Path]:
+    """mapping/<lang>_key_mapping.json вендора раскладки layout, иначе vendor_file."""
+    if layout is not None:
+        parts = Path(layout).parts
+        if len(parts) > 3 and parts[0] == "data" and parts[1] == lang:
+            own = Path(*parts[:3]) / "mapping" / f"{lang}_key_mapping.json"
+            if (ROOT / own).exists():
+                return own
+    return vendor_file(lang, f"mapping/{lang}_key_mapping.json")
+
+def merge_counts(per_vendor: Dict[str, Tuple[Dict[str, float], float]]
+                 ) -> Tuple[Dict[str, float], float, Dict[str, float]]:
+    """{vendor: (C, M)} → (ΣC по вариантам, ΣM, {vendor: M_v / ΣM})."""
+    C: Dict[str, float] = {}
+    M = 0.0
+    for counts, m in per_vendor.values():
+        M += m
+        for variant, c in counts.items():
+            C[variant] = C.get(variant, 0.0) + c
+    weights = {v: (m / M if M > 0 else 0.0) for v, (_, m) in per_vendor.items()}
+    return C, M, weights
+
+def population_policy(lang: str) -> str:
+    policy = POPULATION_POLICY_BY_LANG.get(lang, POPULATION_POLICY)
+    if policy not in POPULATION_POLICIES:
+        raise ValueError(f"Unknown population policy '{policy}' for language {lang}")
+    return policy
+
+def pick_population(lang: str, records: Dict[str, PopulationRecord]) -> Tuple[Optional[int], List[str]]:
+    """{vendor: (year, value)} → (численность, вендоры с этим значением) по политике языка."""
+    if not records:
+        return None, []
+    policy = population_policy(lang)
+
+    def _key(rec: PopulationRecord) -> Tuple[int, int]:
+        year, value = rec
+        return (year if year is not None else -1, value)
+
+    pref = PREFERRED_VENDOR.get(lang)
+    if policy == "first":
+        value = records[min(records)][1]
+    elif policy == "preferred" and pref in records:
+        value = records[pref][1]
+    elif policy == "mean":
+        last = max(_key(r)[0] for r in records.values())
+        vals = [r[1] for r in records.values() if _key(r)[0] == last]
+        value = round(sum(vals) / len(vals))
+    else:
+        value = max(records.values(), key=_key)[1]
+    return value, sorted(v for v, (_, val) in records.items() if val == value)
+
+def mapping_disagreements(per_vendor: Dict[str, Dict[str, Set[str]]]) -> List[Tuple[str, Dict[str, str]]]:
+    """{vendor: {variant: {base, …}}} → [(variant, {vendor: "база" или ""})] — только расхождения."""
+    if len(per_vendor) < 2:
+        return []
+    out: List[Tuple[str, Dict[str, str]]] = []
+    variants = sorted(set().union(*per_vendor.values()))
+    for var in variants:
+        bases = {v: ", ".join(sorted(m.get(var, ()))) for v, m in sorted(per_vendor.items())}
+        if len(set(bases.values())) > 1:
+            out.append((var, bases))
+    return out
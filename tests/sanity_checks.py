@@ -10,6 +10,7 @@ Sanity checks for RF-only keyboard statistics pipeline.
 
 import csv
 import os
+import sqlite3
 from collections import defaultdict
 from decimal import Decimal
 
@@ -174,6 +175,41 @@ def test_required_outputs_exist():
     print("✓ All required outputs exist")
 
 
+# ----------------------------
+# 6. SQLITE EXPORT
+# ----------------------------
+
+def test_sqlite_export_matches_csv():
+    path = f"{SUMMARIES}/summaries.sqlite"
+    if not os.path.exists(path):
+        return
+
+    con = sqlite3.connect(path)
+    try:
+        n_db, pop_db = con.execute(
+            "SELECT COUNT(*), SUM(population) FROM speakers WHERE scope = 'rf'"
+        ).fetchone()
+        n_freq = con.execute("SELECT COUNT(*) FROM frequencies WHERE scope = 'rf'").fetchone()[0]
+        prov_db = dict(con.execute(
+            "SELECT base_letter || '|' || variant, provenance FROM mappings WHERE scope = 'rf'"
+        ).fetchall())
+    finally:
+        con.close()
+
+    speakers = read_csv(f"{SUMMARIES}/speakers_rf.csv")
+    assert n_db == len(speakers), f"SQLite speakers rows: {n_db} != {len(speakers)}"
+    assert pop_db == sum(int(float(r["population"])) for r in speakers), "SQLite population sum mismatch"
+
+    freqs = read_csv(f"{SUMMARIES}/frequencies_by_language.csv")
+    assert n_freq == len(freqs), f"SQLite frequencies rows: {n_freq} != {len(freqs)}"
+
+    for r in read_csv(f"{SUMMARIES}/variant_mapping.csv"):
+        key = f"{r['base_letter']}|{r['variant']}"
+        assert set(r["provenance"].split(",")) <= set((prov_db.get(key) or "").split(",")), \
+            f"SQLite provenance for {key}: {prov_db.get(key)!r} lacks {r['provenance']!r}"
+    print("✓ SQLite export matches CSV summaries")
+
+
 # ----------------------------
 # RUN ALL
 # ----------------------------
@@ -189,5 +225,6 @@ if __name__ == "__main__":
     test_no_global_artifacts()
     test_mapping_group_percentages()
     test_required_outputs_exist()
+    test_sqlite_export_matches_csv()
 
     print("\n✅ All sanity checks passed")
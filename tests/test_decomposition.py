@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for rf_data_scripts/decomposition.py (разложение вариантов на составляющие).
+
+Запуск:
+    python tests/test_decomposition.py
+
+Падаем с AssertionError, если что-то не так.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rf_data_scripts"))
+
+from decomposition import MAX_GRAPHEMES, DecompositionTable, decompose  # noqa: E402
+
+
+# ----------------------------
+# 1. DECOMPOSE
+# ----------------------------
+
+def test_decompose_multiplicities():
+    assert decompose("ЛЛЪ") == (("Л", 2), ("Ъ", 1))
+    assert decompose("Ӑ") == (("Ӑ", 1),)
+    assert decompose("А\u0304ᵸ") == (("А\u0304", 1), ("ᵸ", 1))   # А + U+0304 — одна графема
+    print("✓ Components with multiplicities, in order of first appearance")
+
+
+# ----------------------------
+# 2. TABLE RULES
+# ----------------------------
+
+def test_atomic_and_rescued():
+    table = DecompositionTable.build(["Аᵸ", "Ӣᵸ", "ᵸ", "Ӑ", "А\u0304"])
+    assert table.is_atomic("Ӑ") and table.is_atomic("А\u0304")
+    assert not table.is_atomic("Аᵸ")
+    assert table.rescued("Аᵸ") == [("Н", "ᵸ")]
+    assert table.rescued("Ӣᵸ") == [("Н", "ᵸ")]
+    assert table.rescued("ᵸ") == []                # одиночный ᵸ — уже атомный
+    assert table.added == []
+    print("✓ is_atomic and rescued (Аᵸ → ᵸ under Н)")
+
+
+def test_symbol_weights_limit():
+    table = DecompositionTable()
+    assert table.symbol_weights("ЛЛЪ") == (("Л", 2), ("Ъ", 1))
+    long_seq = "ДЖЬЫ" + "Ъ"
+    assert table.grapheme_count(long_seq) == MAX_GRAPHEMES + 1
+    assert table.symbol_weights(long_seq) == ()
+    assert table.added == ["ЛЛЪ", long_seq]        # недостающие варианты разложены на месте
+    print(f"✓ symbol_weights is empty beyond {MAX_GRAPHEMES} graphemes")
+
+
+# ----------------------------
+# 3. CSV ROUND TRIP
+# ----------------------------
+
+def test_csv_round_trip():
+    table = DecompositionTable.build(["ЛЛЪ", "Аᵸ", "Ӕ"])
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "variant_decomposition.csv"
+        table.write(path)
+        header = path.read_text(encoding="utf-8").splitlines()[0]
+        assert header == "variant,grapheme_count,component,multiplicity"
+        again = DecompositionTable.read(path)
+    assert again.entries == table.entries
+    assert DecompositionTable.read(Path(d) / "missing.csv").entries == {}
+    print("✓ write / read round trip")
+
+
+# ----------------------------
+# RUN ALL
+# ----------------------------
+
+if __name__ == "__main__":
+    print("Running decomposition tests...\n")
+
+    test_decompose_multiplicities()
+    test_atomic_and_rescued()
+    test_symbol_weights_limit()
+    test_csv_round_trip()
+
+    print("\n✅ All decomposition tests passed")
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for hungarian() from rf_data_scripts/10_solve_longpress_assignment.py
+(сравнение с перебором на маленьких прямоугольных матрицах).
+
+Запуск:
+    python tests/test_hungarian.py
+
+Падаем с AssertionError, если что-то не так.
+"""
+
+import importlib.util
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPTS = Path(__file__).resolve().parent.parent / "rf_data_scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+# имя модуля начинается с цифры — грузим по пути
+_spec = importlib.util.spec_from_file_location("solve_longpress", SCRIPTS / "10_solve_longpress_assignment.py")
+solve = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(solve)
+
+hungarian, INFEASIBLE = solve.hungarian, solve.INFEASIBLE
+
+
+def brute_force(cost: np.ndarray) -> float:
+    """Минимум по всем инъективным назначениям строк в столбцы."""
+    n, m = cost.shape
+    rows = np.arange(n)
+    return min(cost[rows, list(cols)].sum() for cols in itertools.permutations(range(m), n))
+
+
+def check(cost: np.ndarray):
+    n, m = cost.shape
+    col = hungarian(cost)
+    assert col.shape == (n,)
+    assert len(set(col.tolist())) == n and col.min() >= 0 and col.max() < m, col
+    got = cost[np.arange(n), col].sum()
+    want = brute_force(cost)
+    assert np.isclose(got, want, rtol=1e-9), (cost, col, got, want)
+
+
+# ----------------------------
+# 1. RANDOM RECTANGULAR
+# ----------------------------
+
+def test_random_rectangular():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(1, 6))
+        m = int(rng.integers(n, 7))
+        check(rng.random((n, m)) * 10)
+    # целые веса — много равных по стоимости решений
+    for _ in range(100):
+        n = int(rng.integers(1, 5))
+        m = int(rng.integers(n, 6))
+        check(rng.integers(0, 4, (n, m)).astype(float))
+    print("✓ Optimal cost equals brute force on random n × m (n ≤ m)")
+
+
+# ----------------------------
+# 2. INFEASIBLE CELLS
+# ----------------------------
+
+def test_infeasible_cells():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        n = int(rng.integers(1, 6))
+        m = int(rng.integers(n, 7))
+        cost = rng.random((n, m)) * 10
+        cost[rng.random((n, m)) < 0.5] = INFEASIBLE
+        col = hungarian(cost)
+        got = cost[np.arange(n), col]
+        want = brute_force(cost)
+        if want < INFEASIBLE:
+            # допустимое назначение есть — алгоритм должен найти его и оптимальное
+            assert (got < INFEASIBLE).all(), (cost, col)
+            assert np.isclose(got.sum(), want, rtol=1e-9), (cost, col, got.sum(), want)
+        else:
+            # запрещённых клеток не меньше, чем в лучшем переборе
+            assert got.sum() >= INFEASIBLE
+            assert len(set(col.tolist())) == n
+    print("✓ INFEASIBLE cells are avoided whenever a feasible assignment exists")
+
+
+def test_more_rows_rejected():
+    try:
+        hungarian(np.zeros((3, 2)))
+    except ValueError:
+        print("✓ n > m raises ValueError")
+        return
+    raise AssertionError("n > m must raise ValueError")
+
+
+# ----------------------------
+# RUN ALL
+# ----------------------------
+
+if __name__ == "__main__":
+    print("Running hungarian tests...\n")
+
+    test_random_rectangular()
+    test_infeasible_cells()
+    test_more_rows_rejected()
+
+    print("\n✅ All hungarian tests passed")
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for rf_data_scripts/normalization.py (правила data/normalization_rules.json).
+
+Запуск:
+    python tests/test_normalization.py
+
+Падаем с AssertionError, если что-то не так.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rf_data_scripts"))
+
+import normalization  # noqa: E402
+
+
+# ----------------------------
+# 1. LATIN WORDS IN CORPUS TEXT
+# ----------------------------
+
+def test_latin_words_untouched():
+    kbd = normalization.for_language("kbd")
+    assert kbd.text("iPhone и Windows KI") == "IPHONE И WINDOWS KI"
+    assert kbd.text("I") == "I"
+    print("✓ Latin words in corpus text are left alone")
+
+
+def test_latin_i_next_to_cyrillic():
+    kbd = normalization.for_language("kbd")
+    assert kbd.text("кIэ лIы дыкI") == "КӀЭ ЛӀЫ ДЫКӀ"
+    assert kbd.text("Windows кIэ") == "WINDOWS КӀЭ"
+    # у языков без палочки латинская I остаётся
+    assert normalization.for_language("tyv").text("кI") == "КI"
+    print("✓ Latin I next to Cyrillic letters becomes palochka")
+
+
+# ----------------------------
+# 2. VARIANTS
+# ----------------------------
+
+def test_variant_lookalikes():
+    kbd = normalization.for_language("kbd")
+    assert kbd.variant("I") == "Ӏ"
+    assert kbd.variant("KI") == "КӀ"
+    assert kbd.variant("К1") == "КӀ"
+    assert kbd.variant("І") == "Ӏ"
+    assert normalization.for_language("tyv").variant("C’") == "С’"
+    # латиница осталась бы — вариант не трогаем
+    assert normalization.for_language("tyv").variant("Q’") == "Q’"
+    print("✓ Variant look-alikes are replaced only when no Latin remains")
+
+
+def test_collapse_variants():
+    akv = normalization.for_language("akv")
+    assert akv.variant("Аᴴ") == "ᵸ"
+    assert akv.variant("Аᴴ", collapse=False) == "Аᵸ"
+    print("✓ collapse_variants")
+
+
+def test_latin_chars_rule_rejected():
+    try:
+        normalization.Normalizer({"I": "Ӏ"}, {}, {}, [])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Latin key in chars must be rejected")
+    print("✓ Latin keys in chars are rejected")
+
+
+# ----------------------------
+# RUN ALL
+# ----------------------------
+
+if __name__ == "__main__":
+    print("Running normalization tests...\n")
+
+    test_latin_words_untouched()
+    test_latin_i_next_to_cyrillic()
+    test_variant_lookalikes()
+    test_collapse_variants()
+    test_latin_chars_rule_rejected()
+
+    print("\n✅ All normalization tests passed")
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for rf_data_scripts/optimize_layout.py (матрица Δ обменов, Taillard).
+
+Запуск:
+    python tests/test_optimize_layout.py
+
+Падаем с AssertionError, если что-то не так.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rf_data_scripts"))
+
+from optimize_layout import SwapProblem  # noqa: E402
+
+N = 9
+
+
+def random_problem(seed: int) -> SwapProblem:
+    """Небольшая КЗН: симметричные a и b с нулевой диагональю, линейная часть u·c."""
+    rng = np.random.default_rng(seed)
+    a = rng.random((N, N))
+    a = a + a.T
+    b = rng.random((N, N))
+    b = b + b.T
+    np.fill_diagonal(a, 0.0)
+    np.fill_diagonal(b, 0.0)
+    return SwapProblem(a, b, rng.random(N), rng.random(N), p=rng.permutation(N))
+
+
+def swapped(p: np.ndarray, r: int, s: int) -> np.ndarray:
+    q = p.copy()
+    q[[r, s]] = q[[s, r]]
+    return q
+
+
+def assert_delta_exact(prob: SwapProblem):
+    base = prob.objective()
+    for r in range(N):
+        for s in range(N):
+            want = prob.objective(swapped(prob.p, r, s)) - base
+            assert np.isclose(prob.delta[r, s], want), (r, s, prob.delta[r, s], want)
+
+
+# ----------------------------
+# 1. FULL DELTA
+# ----------------------------
+
+def test_full_delta():
+    for seed in range(5):
+        prob = random_problem(seed)
+        assert np.isclose(prob.value, prob.objective())
+        assert_delta_exact(prob)
+        assert np.allclose(prob.delta, prob.delta.T)
+    print("✓ Δ[r, s] equals the objective difference of the swap")
+
+
+# ----------------------------
+# 2. INCREMENTAL UPDATE
+# ----------------------------
+
+def test_apply_keeps_delta():
+    rng = np.random.default_rng(42)
+    prob = random_problem(42)
+    for _ in range(30):
+        r, s = rng.choice(N, size=2, replace=False)
+        prob.apply(int(r), int(s))
+        assert np.isclose(prob.value, prob.objective())
+        assert np.allclose(prob.Bp, prob.b[np.ix_(prob.p, prob.p)])
+    assert_delta_exact(prob)
+    print("✓ apply() keeps value and Δ exact after a series of swaps")
+
+
+# ----------------------------
+# RUN ALL
+# ----------------------------
+
+if __name__ == "__main__":
+    print("Running optimize_layout tests...\n")
+
+    test_full_delta()
+    test_apply_keeps_delta()
+
+    print("\n✅ All optimize_layout tests passed")
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for rf_data_scripts/segmentation.py (графемные кластеры UAX #29).
+
+Образцы — из GraphemeBreakTest.txt: CR LF, combining, Prepend/SpacingMark,
+emoji ZWJ, флаги (regional indicators), слоги хангыля.
+
+Запуск:
+    python tests/test_segmentation.py
+
+Падаем с AssertionError, если что-то не так.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rf_data_scripts"))
+
+from segmentation import complex_clusters, grapheme_count, graphemes  # noqa: E402
+
+
+def check(s, expected):
+    got = graphemes(s)
+    assert got == expected, f"graphemes({s!r}) = {got!r}, expected {expected!r}"
+    assert grapheme_count(s) == len(expected), f"grapheme_count({s!r}) = {grapheme_count(s)}"
+
+
+# ----------------------------
+# 1. CONTROLS
+# ----------------------------
+
+def test_crlf():
+    check("\r\n", ["\r\n"])                        # GB3
+    check("\n\r", ["\n", "\r"])                    # GB4/GB5
+    check("А\u0308\n", ["А\u0308", "\n"])          # GB4: после кластера — разрыв перед LF
+    print("✓ CR LF and controls")
+
+
+# ----------------------------
+# 2. COMBINING MARKS
+# ----------------------------
+
+def test_combining_marks():
+    check("А\u0304", ["А\u0304"])                  # А + U+0304 — одна графема (NFC-формы нет)
+    check("А\u0304Ӕ", ["А\u0304", "Ӕ"])
+    check("a\u0308b", ["a\u0308", "b"])            # GB9
+    check("\u0308", ["\u0308"])                    # висячий знак — сам по себе
+    check("ЛЛЪ", ["Л", "Л", "Ъ"])                  # быстрый путь: кириллица без знаков
+    print("✓ Combining marks (А + U+0304 is one grapheme)")
+
+
+def test_prepend_and_spacing_mark():
+    check("\u0600a", ["\u0600a"])                  # GB9b: Prepend ×
+    check("क\u093F", ["क\u093F"])                  # GB9a: × SpacingMark
+    print("✓ Prepend and SpacingMark")
+
+
+# ----------------------------
+# 3. EMOJI
+# ----------------------------
+
+def test_emoji_zwj():
+    family = "\U0001F468\u200D\U0001F469\u200D\U0001F467"
+    check(family, [family])                        # GB11
+    check("\U0001F44D\U0001F3FD", ["\U0001F44D\U0001F3FD"])  # модификатор цвета кожи (Extend)
+    check("a\u200D\U0001F469", ["a\u200D", "\U0001F469"])  # ZWJ не после пиктограммы
+    print("✓ Emoji ZWJ sequences")
+
+
+def test_regional_indicators():
+    ru, de = "\U0001F1F7\U0001F1FA", "\U0001F1E9\U0001F1EA"
+    check(ru + de, [ru, de])                       # GB12/GB13: попарно
+    check(ru + "\U0001F1E9", [ru, "\U0001F1E9"])
+    print("✓ Regional indicators pair up")
+
+
+# ----------------------------
+# 4. HANGUL
+# ----------------------------
+
+def test_hangul():
+    check("\u1100\u1161\u11A8", ["\u1100\u1161\u11A8"])  # L V T (GB6/GB7)
+    check("가\u11A8", ["가\u11A8"])                  # LV T (GB7)
+    check("\u1100가", ["\u1100가"])                  # L LV (GB6)
+    check("한국", ["한", "국"])                        # два слога LVT
+    print("✓ Hangul syllables")
+
+
+# ----------------------------
+# 5. COMPLEX CLUSTERS
+# ----------------------------
+
+def test_complex_clusters():
+    text = "ГӀАЛГӀАЙ А\u0304Ӕ \r\n\U0001F1F7\U0001F1FA"
+    assert list(complex_clusters(text)) == ["А\u0304", "\r\n", "\U0001F1F7\U0001F1FA"]
+    print("✓ complex_clusters yields only multi-code-point clusters")
+
+
+# ----------------------------
+# RUN ALL
+# ----------------------------
+
+if __name__ == "__main__":
+    print("Running segmentation tests...\n")
+
+    test_crlf()
+    test_combining_marks()
+    test_prepend_and_spacing_mark()
+    test_emoji_zwj()
+    test_regional_indicators()
+    test_hangul()
+    test_complex_clusters()
+
+    print("\n✅ All segmentation tests passed")
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for rf_data_scripts/tolerant_json.py (терпимое чтение JSON вендоров).
+
+Запуск:
+    python tests/test_tolerant_json.py
+
+Падаем с AssertionError, если что-то не так.
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rf_data_scripts"))
+
+from tolerant_json import Recovery, load_json, loads, repair  # noqa: E402
+
+
+def kinds(recoveries):
+    return [r.kind for r in recoveries]
+
+
+# ----------------------------
+# 1. FAST PATH
+# ----------------------------
+
+def test_valid_json_untouched():
+    obj, recoveries = loads('{"Г": ["Ғ", "Ҕ"], "url": "http://x/*y*/,"}')
+    assert obj == {"Г": ["Ғ", "Ҕ"], "url": "http://x/*y*/,"}
+    assert recoveries == []
+    print("✓ Valid JSON parses with no recoveries")
+
+
+# ----------------------------
+# 2. REPAIRS
+# ----------------------------
+
+def test_bom():
+    obj, recoveries = loads('\ufeff{"А": ["Ӑ"]}')
+    assert obj == {"А": ["Ӑ"]}
+    assert recoveries == [Recovery(1, 1, "bom")]
+    print("✓ BOM")
+
+
+def test_comments():
+    text = '{\n  "А": ["Ӑ"], // кабардинский\n  /* блок\n     на две строки */ "О": ["Ӧ"]\n}'
+    obj, recoveries = loads(text)
+    assert obj == {"А": ["Ӑ"], "О": ["Ӧ"]}
+    assert recoveries == [Recovery(2, 15, "line_comment"), Recovery(3, 3, "block_comment")]
+    # комментарий внутри строки — часть значения
+    assert loads('{"a": "// не комментарий"}') == ({"a": "// не комментарий"}, [])
+    print("✓ // and /* */ comments")
+
+
+def test_trailing_commas():
+    obj, recoveries = loads('{\n  "Н": ["Ң", "Ӈ",],\n  "К": ["Қ"], /* x */\n}')
+    assert obj == {"Н": ["Ң", "Ӈ"], "К": ["Қ"]}
+    assert recoveries == [Recovery(2, 17, "trailing_comma"), Recovery(3, 13, "trailing_comma"),
+                          Recovery(3, 15, "block_comment")]
+    print("✓ Trailing commas (positions are 1-based line:column of the source)")
+
+
+def test_repair_keeps_positions():
+    text = '{\n  "a": 1, // c\n  "b": [1,],  /* x\n y */\n}'
+    fixed, _ = repair(text)
+    assert len(fixed) == len(text) and fixed.count("\n") == text.count("\n")
+    assert json.loads(fixed) == {"a": 1, "b": [1]}
+    print("✓ Repaired text keeps length and line breaks")
+
+
+# ----------------------------
+# 3. UNRECOVERABLE INPUT
+# ----------------------------
+
+def test_unrecoverable_raises():
+    for text in ('{"a": }', '{"a": 1 "b": 2}', '["unterminated', '{"a": 1,, }'):
+        try:
+            loads(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"{text!r} must raise ValueError")
+    print("✓ Unrecoverable input raises ValueError")
+
+
+# ----------------------------
+# 4. FILES
+# ----------------------------
+
+def test_load_json_file():
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "xx_key_mapping.json"
+        path.write_bytes('\ufeff{"Г": ["Ғ",]}'.encode("utf-8"))
+        first = load_json(path)
+        assert first == ({"Г": ["Ғ"]}, [Recovery(1, 1, "bom"), Recovery(1, 12, "trailing_comma")])
+        assert load_json(path) == first            # повтор — из кэша в памяти, тот же результат
+    print("✓ load_json reads files and caches by content")
+
+
+# ----------------------------
+# RUN ALL
+# ----------------------------
+
+if __name__ == "__main__":
+    print("Running tolerant_json tests...\n")
+
+    test_valid_json_untouched()
+    test_bom()
+    test_comments()
+    test_trailing_commas()
+    test_repair_keeps_positions()
+    test_unrecoverable_raises()
+    test_load_json_file()
+
+    print("\n✅ All tolerant_json tests passed")